@@ -1,22 +1,32 @@
 import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 from django import forms
 from django.apps import apps
 from django.core.exceptions import ImproperlyConfigured
 from django.core.validators import EmailValidator
+from django.db import transaction
 from django.template import TemplateDoesNotExist
 from django.template.loader import render_to_string
 from django.utils.html import strip_tags
+from django.utils.timezone import now
 from django.utils.translation import gettext_lazy as _
 from djangocms_text.fields import HTMLFormField
 from entangled.forms import EntangledModelFormMixin
 
-from . import models
-from .entry_model import FormEntry
+from . import models, uploads, webhooks
+from .entry_model import FormEntry, WebhookDelivery
 from .helpers import get_option, insert_fields
-from .settings import MAIL_TEMPLATE_SETS
+from .settings import ACTION_WORKERS, MAIL_ATTACHMENTS_MAX_SIZE, MAIL_TEMPLATE_SETS
+
+# Phases in which actions run (see FormAction.phase)
+IN_TRANSACTION = "transaction"
+ON_COMMIT = "on_commit"
 
 _action_registry = {}
+_executor = None
+_executor_lock = threading.Lock()
 
 
 def get_registered_actions():
@@ -60,6 +70,18 @@ def get_hash(action_class):
     return hashlib.sha1(action_class.__name__.encode("utf-8")).hexdigest()
 
 
+def get_executor():
+    """Returns the thread pool shared by all forms to run independent actions"""
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=ACTION_WORKERS, thread_name_prefix="form_builder_action"
+            )
+        return _executor
+
+
 class ActionMixin:
     """Adds action form elements to Form plugin admin"""
 
@@ -95,10 +117,25 @@ class FormAction(EntangledModelFormMixin):
         css = {"all": ("djangocms_form_builder/css/actions_form.css",)}
 
     verbose_name = None
+    # Independent actions neither change the form nor depend on other actions'
+    # side effects. They may run concurrently with other actions in a worker thread.
+    # Worker threads use their own database connections: in the IN_TRANSACTION
+    # phase an independent action neither sees the rows written by the submission's
+    # transaction nor are its own writes rolled back with it.
+    independent = False
+    # Actions with external side effects, e.g., sending a mail, run once the
+    # submission is committed (ON_COMMIT) and not at all if it is rolled back. They
+    # cannot change the response. Others run within its transaction (IN_TRANSACTION).
+    phase = IN_TRANSACTION
 
     def execute(self, form, request):
         raise NotImplementedError()
 
+    def is_success(self, result):
+        """Returns ``False`` if the result of ``execute`` signals a failure which
+        did not raise an exception, e.g., a silently failing mail."""
+        return True
+
     @staticmethod
     def get_parameter(form, param):
         return (get_option(form, "form_parameters") or {}).get(param, None)
@@ -109,37 +146,22 @@ class SaveToDBAction(FormAction):
     verbose_name = _("Save form submission")
 
     def execute(self, form, request):
+        entry = FormEntry(
+            form_name=get_option(form, "form_name"),
+            form_user=None if request.user.is_anonymous else request.user,
+            entry_data=form.cleaned_data,
+            html_headers=dict(
+                user_agent=request.headers["User-Agent"],
+                referer=request.headers["Referer"],
+            ),
+        )
         if get_option(form, "unique", False) and get_option(
             form, "login_required", False
         ):
-            keys = {
-                "form_name": get_option(form, "form_name"),
-                "form_user": request.user,
-            }
-            defaults = {}
-        else:
-            keys = {}
-            defaults = {
-                "form_name": get_option(form, "form_name"),
-                "form_user": None if request.user.is_anonymous else request.user,
-            }
-        defaults.update(
-            {
-                "entry_data": form.cleaned_data,
-                "html_headers": dict(
-                    user_agent=request.headers["User-Agent"],
-                    referer=request.headers["Referer"],
-                ),
-            }
-        )
-        if keys:  # update_or_create only works if at least one key is given
-            try:
-                FormEntry.objects.update_or_create(**keys, defaults=defaults)
-            except FormEntry.MultipleObjectsReturned:  # Delete outdated objects
-                FormEntry.objects.filter(**keys).delete()
-                FormEntry.objects.create(**keys, **defaults)
-        else:
-            FormEntry.objects.create(**defaults), True
+            entry.unique_user = request.user
+            return FormEntry.objects.upsert(entry)
+        entry.save()
+        return entry
 
 
 SAVE_TO_DB_ACTION = next(iter(_action_registry)) if _action_registry else None
@@ -164,6 +186,8 @@ class SendMailAction(FormAction):
         }
 
     verbose_name = _("Send email")
+    independent = True
+    phase = ON_COMMIT
     from_mail = None
     template = "djangocms_form_builder/actions/mail.html"
     subject = _("%(form_name)s form submission")
@@ -187,18 +211,39 @@ class SendMailAction(FormAction):
         widget=forms.Select if len(MAIL_TEMPLATE_SETS) > 1 else forms.HiddenInput,
     )
 
+    def get_attachments(self, form):
+        """Returns the uploaded files to attach as ``(name, content, content_type)``.
+        Files are attached in order as long as their total size stays within
+        ``DJANGOCMS_FORM_BUILDER_MAIL_ATTACHMENTS_MAX_SIZE``, larger ones are only
+        listed in the mail."""
+        attachments = []
+        budget = MAIL_ATTACHMENTS_MAX_SIZE
+        storage = uploads.get_storage()
+        for reference in uploads.get_references(form.cleaned_data):
+            if reference["size"] > budget:
+                continue
+            budget -= reference["size"]
+            with storage.open(reference["path"]) as file:
+                content = b"".join(file.chunks())
+            attachments.append((reference["name"], content, reference["content_type"]))
+        return attachments
+
     def execute(self, form, request):
-        from django.core.mail import mail_admins, send_mail
+        from django.conf import settings as django_settings
+        from django.core.mail import EmailMultiAlternatives, mail_admins, send_mail
 
         recipients = self.get_parameter(form, "sendemail_recipients") or ""
         template_set = self.get_parameter(form, "sendemail_template") or "default"
         context = dict(
-            cleaned_data=form.cleaned_data,
+            cleaned_data={
+                key: uploads.get_display_value(value)
+                for key, value in form.cleaned_data.items()
+            },
             form_name=getattr(form.Meta, "verbose_name", ""),
             user=request.user,
-            user_agent=request.headers["User-Agent"]
-            if "User-Agent" in request.headers
-            else "",
+            user_agent=(
+                request.headers["User-Agent"] if "User-Agent" in request.headers else ""
+            ),
             referer=request.headers["Referer"] if "Referer" in request.headers else "",
         )
 
@@ -220,14 +265,15 @@ class SendMailAction(FormAction):
         except TemplateDoesNotExist:
             subject = self.subject % dict(form_name=context["form_name"])
 
-        if not recipients:
-            return mail_admins(
-                subject,
-                message,
-                fail_silently=True,
-                html_message=html_message,
-            )
-        else:
+        attachments = self.get_attachments(form)
+        if not attachments:
+            if not recipients:
+                return mail_admins(
+                    subject,
+                    message,
+                    fail_silently=True,
+                    html_message=html_message,
+                )
             return send_mail(
                 subject,
                 message,
@@ -236,6 +282,31 @@ class SendMailAction(FormAction):
                 fail_silently=True,
                 html_message=html_message,
             )
+        if not recipients:  # As mail_admins does
+            if not django_settings.ADMINS:
+                return None
+            mail = EmailMultiAlternatives(
+                f"{django_settings.EMAIL_SUBJECT_PREFIX}{subject}",
+                message,
+                django_settings.SERVER_EMAIL,
+                [
+                    admin if isinstance(admin, str) else admin[1]
+                    for admin in django_settings.ADMINS
+                ],
+            )
+        else:
+            mail = EmailMultiAlternatives(
+                subject, message, self.from_mail, recipients.split()
+            )
+        mail.attach_alternative(html_message, "text/html")
+        for attachment in attachments:
+            mail.attach(*attachment)
+        return mail.send(fail_silently=True)
+
+    def is_success(self, result):
+        # send_mail returns the number of mails sent (0 if it failed silently),
+        # mail_admins returns None
+        return result != 0
 
 
 @register
@@ -260,13 +331,70 @@ class SuccessMessageAction(FormAction):
 
         message = self.get_parameter(form, "submitmessage_message")
         # Overwrite the success context and render template
-        form.get_success_context = lambda *args, **kwargs: {"message": message}
-        form.Meta.options["render_success"] = (
+        form.submission_options["success_context"] = {"message": message}
+        form.submission_options["render_success"] = (
             "djangocms_form_builder/actions/submit_message.html"
         )
         # Overwrite the default redirect to same page
-        if form.Meta.options.get("redirect") == SAME_PAGE_REDIRECT:
-            form.Meta.options["redirect"] = None
+        if get_option(form, "redirect") == SAME_PAGE_REDIRECT:
+            form.submission_options["redirect"] = None
+
+
+@register
+class WebhookAction(FormAction):
+    verbose_name = _("Send to webhook")
+
+    class Meta:
+        entangled_fields = {
+            "action_parameters": [
+                "webhook_url",
+                "webhook_batch",
+            ]
+        }
+
+    webhook_url = forms.URLField(
+        label=_("Webhook URL"),
+        required=False,
+        help_text=_("The submitted data is posted as JSON to this URL."),
+    )
+    webhook_batch = forms.BooleanField(
+        label=_("Send in batches"),
+        required=False,
+        help_text=_(
+            "Collect submissions and send them periodically as a list instead of "
+            "sending each submission right away. Requires the send_webhooks "
+            "management command to run regularly."
+        ),
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if args:
+            form_actions = args[0].get("form_actions", [])
+            self.fields["webhook_url"].required = (
+                get_hash(WebhookAction) in form_actions
+            )
+
+    def execute(self, form, request):
+        batch = bool(self.get_parameter(form, "webhook_batch"))
+        delivery = WebhookDelivery.objects.create(
+            url=self.get_parameter(form, "webhook_url"),
+            batch=batch,
+            payload={
+                "form_name": get_option(form, "form_name"),
+                "submitted_at": now(),
+                "data": form.cleaned_data,
+            },
+        )
+        if not batch:
+            # Send once the submission is committed without delaying the response.
+            # Failed deliveries are retried by webhooks.send_pending().
+            transaction.on_commit(
+                lambda: webhooks.get_executor().submit(
+                    webhooks.send_in_thread, delivery.pk
+                )
+            )
+        return delivery
 
 
 if apps.is_installed("djangocms_link"):
@@ -297,6 +425,6 @@ if apps.is_installed("djangocms_link"):
                 ) in args[0].get("form_actions", [])
 
         def execute(self, form, request):
-            form.Meta.options["redirect"] = get_link(
+            form.submission_options["redirect"] = get_link(
                 self.get_parameter(form, "redirect_link")
             )
@@ -1,6 +1,12 @@
 from django.contrib import admin
+from django.template.defaultfilters import filesizeformat
+from django.utils.html import format_html_join
+from django.utils.safestring import mark_safe
+from django.utils.timezone import now
+from django.utils.translation import gettext_lazy as _
 
-from .models import FormEntry
+from . import uploads
+from .models import FormEntry, WebhookDelivery
 
 
 @admin.register(FormEntry)
@@ -8,11 +14,23 @@ class FormEntryAdmin(admin.ModelAdmin):
     date_hierarchy = "entry_created_at"
     list_display = ("__str__", "form_user", "entry_created_at")
     list_filter = ("form_name", "form_user", "entry_created_at")
-    readonly_fields = ["form_name", "form_user"]
+    readonly_fields = ["form_name", "form_user", "action_records", "uploaded_files"]
 
     def has_add_permission(self, request):
         return False
 
+    @admin.display(description=_("Uploaded files"))
+    def uploaded_files(self, obj):
+        storage = uploads.get_storage()
+        return format_html_join(
+            mark_safe("<br>"),
+            '<a href="{}">{}</a> ({})',
+            (
+                (storage.url(file["path"]), file["name"], filesizeformat(file["size"]))
+                for file in uploads.get_references(obj.entry_data)
+            ),
+        )
+
     def get_form(self, request, obj=None, **kwargs):
         if obj:
             kwargs["form"] = obj.get_admin_form()
@@ -22,3 +40,29 @@ class FormEntryAdmin(admin.ModelAdmin):
         if obj:
             return obj.get_admin_fieldsets()
         return super().get_fieldsets(request, obj)
+
+
+@admin.register(WebhookDelivery)
+class WebhookDeliveryAdmin(admin.ModelAdmin):
+    date_hierarchy = "created_at"
+    list_display = ("__str__", "status", "attempts", "next_attempt_at", "delivered_at")
+    list_filter = ("status", "batch", "url")
+    readonly_fields = [
+        "url",
+        "payload",
+        "batch",
+        "attempts",
+        "last_error",
+        "created_at",
+        "delivered_at",
+    ]
+    actions = ["retry"]
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.action(description=_("Retry selected deliveries"))
+    def retry(self, request, queryset):
+        queryset.exclude(status=WebhookDelivery.DELIVERED).update(
+            status=WebhookDelivery.PENDING, next_attempt_at=now()
+        )
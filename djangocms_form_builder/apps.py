@@ -12,7 +12,19 @@ class FormsConfig(AppConfig):
     verbose_name = _("Form builder")
 
     def ready(self):
-        """Install the URLs"""
+        """Install the URLs and connect the instrumentation sinks and signals"""
+        from cms.signals import post_placeholder_operation
+
+        from . import instrumentation
+        from .cms_plugins.form_plugins import update_choices_after_operation
+        from .settings import INSTRUMENTATION
+
+        instrumentation.connect_sinks(INSTRUMENTATION)
+        post_placeholder_operation.connect(
+            update_choices_after_operation,
+            dispatch_uid="form_builder_update_choices",
+        )
+
         urlconf_module = import_module(settings.ROOT_URLCONF)
 
         # Idempotency guard
@@ -0,0 +1,232 @@
+"""
+Choice sources and lookup of select choices.
+
+Besides its child choice plugins, a select can take its choices from a registered
+choice provider, e.g., a queryset or a callable::
+
+    from djangocms_form_builder.choices import register_choices
+
+    register_choices(
+        Product.objects.filter(available=True),
+        value_field="sku",
+        label_field="name",
+        verbose_name=_("Products"),
+    )
+
+    @register_choices(verbose_name=_("Locations"), models=[Location], timeout=3600)
+    def locations():
+        return [(location.code, str(location)) for location in Location.objects.all()]
+
+Provider results are kept in Django's cache (``DJANGOCMS_FORM_BUILDER_CHOICES_CACHE``)
+for ``timeout`` seconds under a key containing the provider's version. Saving or
+deleting an instance of the provider's models bumps the version, which invalidates
+the cached choices in all processes.
+
+A ``ChoiceIndex`` answers membership checks with a dict lookup and searches the
+choice labels page by page without building the (possibly huge) list of choices a
+form field or widget would need. Indexes are cached per select and version of its
+materialized choices (see ``Select.update_choices``) or of its choice provider, so
+they are built once per process and change of choices.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from itertools import islice
+
+from django.core.cache import caches
+from django.db.models.signals import post_delete, post_save
+from django.utils.encoding import force_str
+from django.utils.translation import gettext_lazy as _
+
+from . import settings
+
+CACHE_SIZE = 128
+
+_indexes = OrderedDict()
+_lock = threading.Lock()
+_provider_registry = {}
+
+
+class ChoiceProvider:
+    """Base class of choice sources for selects. Subclasses implement
+    ``get_choices`` returning a list of ``(value, label)`` tuples."""
+
+    def __init__(self, key, verbose_name=None, models=(), timeout=None):
+        self.key = key
+        self.hash = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        self.verbose_name = verbose_name or key
+        self.models = tuple(models)
+        self.timeout = settings.CHOICES_CACHE_TIMEOUT if timeout is None else timeout
+
+    def get_choices(self):
+        raise NotImplementedError
+
+    @property
+    def cache(self):
+        return caches[settings.CHOICES_CACHE]
+
+    @property
+    def version_key(self):
+        return f"djangocms_form_builder:choices:{self.hash}:version"
+
+    def get_version(self):
+        version = self.cache.get(self.version_key)
+        if version is None:
+            # Time-based, so that an evicted version key does not revive stale choices
+            self.cache.add(self.version_key, time.time_ns(), None)
+            version = self.cache.get(self.version_key)
+        return version
+
+    def invalidate(self, *args, **kwargs):
+        """Bumps the version, e.g., upon a change of one of the provider's models"""
+        try:
+            self.cache.incr(self.version_key)
+        except ValueError:  # No version yet
+            self.cache.add(self.version_key, time.time_ns(), None)
+
+    def get_cached_choices(self):
+        """Returns the choices from the cache and only calls ``get_choices`` if they
+        are missing or expired"""
+        version = self.get_version()
+        key = f"djangocms_form_builder:choices:{self.hash}:{version}"
+        choices = self.cache.get(key)
+        if choices is None:
+            choices = [
+                (force_str(value), force_str(label))
+                for value, label in self.get_choices()
+            ]
+            self.cache.set(key, choices, self.timeout)
+        return [tuple(choice) for choice in choices]
+
+
+class QuerySetChoiceProvider(ChoiceProvider):
+    def __init__(
+        self, queryset, value_field="pk", label_field=None, key=None, **kwargs
+    ):
+        kwargs.setdefault("models", (queryset.model,))
+        kwargs.setdefault("verbose_name", queryset.model._meta.verbose_name_plural)
+        super().__init__(key or queryset.model._meta.label_lower, **kwargs)
+        self.queryset = queryset
+        self.value_field = value_field
+        self.label_field = label_field
+
+    def get_choices(self):
+        queryset = self.queryset.all()  # Fresh queryset without result cache
+        if self.label_field:
+            return queryset.values_list(self.value_field, self.label_field)
+        return [(getattr(obj, self.value_field), str(obj)) for obj in queryset]
+
+
+class CallableChoiceProvider(ChoiceProvider):
+    def __init__(self, func, key=None, **kwargs):
+        super().__init__(key or f"{func.__module__}.{func.__qualname__}", **kwargs)
+        self.func = func
+
+    def get_choices(self):
+        return self.func()
+
+
+def register_choices(source=None, **kwargs):
+    """Registers a queryset, a callable, or a ``ChoiceProvider`` as a choice source
+    for selects. Can be used as a decorator (with or without arguments) for
+    callables. Keyword arguments are passed to the provider."""
+    if source is None:
+        return lambda func: register_choices(func, **kwargs)
+    if isinstance(source, ChoiceProvider):
+        provider = source
+    elif hasattr(source, "model") and hasattr(source, "values_list"):
+        provider = QuerySetChoiceProvider(source, **kwargs)
+    else:
+        provider = CallableChoiceProvider(source, **kwargs)
+    _provider_registry[provider.hash] = provider
+    for model in provider.models:
+        for signal in (post_save, post_delete):
+            signal.connect(
+                provider.invalidate,
+                sender=model,
+                weak=False,
+                dispatch_uid=f"form_builder_choices_{provider.hash}",
+            )
+    return source
+
+
+def unregister_choices(provider_hash):
+    provider = _provider_registry.pop(provider_hash, None)
+    if provider is not None:
+        for model in provider.models:
+            for signal in (post_save, post_delete):
+                signal.disconnect(
+                    sender=model, dispatch_uid=f"form_builder_choices_{provider.hash}"
+                )
+
+
+def get_choice_provider(provider_hash):
+    return _provider_registry.get(provider_hash, None)
+
+
+def get_registered_choice_providers():
+    """Creates a tuple for a ChoiceField to select the choice source"""
+    return (("", _("Choice plugins")),) + tuple(
+        (hash, provider.verbose_name) for hash, provider in _provider_registry.items()
+    )
+
+
+class ChoiceIndex:
+    def __init__(self, choices):
+        self.labels = {str(value): label for value, label in choices}
+        self._search = [
+            (str(value), label, str(label).casefold()) for value, label in choices
+        ]
+
+    def __contains__(self, value):
+        return str(value) in self.labels
+
+    def __len__(self):
+        return len(self.labels)
+
+    def get_label(self, value, default=None):
+        return self.labels.get(str(value), default)
+
+    def search(self, term="", page=1, page_size=50):
+        """Returns the ``page_size`` choices of the given page (starting at 1) whose
+        label contains the search term (ignoring case) and whether more follow."""
+        term = term.strip().casefold()
+        start = (max(page, 1) - 1) * page_size
+        matches = (
+            (value, label)
+            for value, label, folded in self._search
+            if not term or term in folded
+        )
+        results = list(islice(matches, start, start + page_size + 1))
+        return results[:page_size], len(results) > page_size
+
+
+def get_choice_index(select):
+    """Returns the (cached) index of the select's choices"""
+    provider = select.get_choice_provider()
+    if provider is not None:
+        key = (provider.hash, provider.get_version())
+    else:
+        version = select.config.get("_choices_version")
+        if version is None:  # Choices not materialized: no safe cache key
+            return ChoiceIndex(select.get_choices())
+        key = (select.pk, version)
+    with _lock:
+        if key in _indexes:
+            _indexes.move_to_end(key)
+            return _indexes[key]
+    index = ChoiceIndex(
+        select.get_choices() if provider is None else provider.get_cached_choices()
+    )
+    with _lock:
+        _indexes[key] = index
+        while len(_indexes) > CACHE_SIZE:
+            _indexes.popitem(last=False)
+    return index
+
+
+def clear_cache():
+    with _lock:
+        _indexes.clear()
@@ -8,6 +8,8 @@ from .form_plugins import (
     DateTimeFieldPlugin,
     DecimalFieldPlugin,
     EmailFieldPlugin,
+    FileFieldPlugin,
+    FormStepPlugin,
     IntegerFieldPlugin,
     SelectPlugin,
     SubmitPlugin,
@@ -25,6 +27,8 @@ __all__ = [
     "DateTimeFieldPlugin",
     "DecimalFieldPlugin",
     "EmailFieldPlugin",
+    "FileFieldPlugin",
+    "FormStepPlugin",
     "IntegerFieldPlugin",
     "SelectPlugin",
     "SubmitPlugin",
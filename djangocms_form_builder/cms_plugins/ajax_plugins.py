@@ -4,11 +4,14 @@ from urllib.parse import urlencode
 from cms.plugin_base import CMSPluginBase
 from cms.plugin_pool import plugin_pool
 from django.conf import settings as django_settings
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import UploadedFile
 from django.http import Http404, HttpResponseNotAllowed, JsonResponse
 from django.middleware.csrf import get_token
 from django.template.context_processors import csrf
 from django.template.loader import render_to_string
 from django.urls import NoReverseMatch, reverse
+from django.utils import translation
 from django.utils.encoding import force_str
 from django.utils.translation import gettext_lazy as _
 from django.views.generic.edit import FormMixin
@@ -16,10 +19,16 @@ from sekizai.context import SekizaiContext
 
 from djangocms_form_builder import settings
 
-from .. import forms, models, recaptcha
+from .. import forms, models, recaptcha, uploads
+from .. import steps as steps_module
 from ..actions import ActionMixin
-from ..forms import SimpleFrontendForm
-from ..helpers import get_option, insert_fields, mark_safe_lazy
+from ..choices import get_choice_provider
+from ..conditions import get_conditions
+from ..forms import SimpleFrontendForm, check_login_required
+from ..helpers import get_option, insert_fields, mark_safe_lazy, resolve_strings
+from ..instrumentation import measure
+from ..steps import get_steps
+from ..validation import get_cached_validator, get_client_schema
 
 SAME_PAGE_REDIRECT = "result"
 
@@ -37,6 +46,11 @@ class CMSAjaxBase(CMSPluginBase):
             return HttpResponseNotAllowed(["POST"])
         return JsonResponse({"csrf_token": get_token(request)})
 
+    def get_max_body_size(self, request, instance):
+        """Size limit in bytes (or ``None``) for request bodies posted to the plugin,
+        checked before the body is read"""
+        return settings.MAX_BODY_SIZE
+
 
 class AjaxFormMixin(FormMixin):
     form_class = None
@@ -62,84 +76,100 @@ class AjaxFormMixin(FormMixin):
         save = getattr(form, "save", None)
         if callable(save):
             result = form.save()
-        # Identify redirect
-        redirect = get_option(form, "redirect", None)
-        if isinstance(redirect, str):
-            try:
-                redirect = reverse(redirect)
-            except NoReverseMatch:
-                pass
-        elif hasattr(redirect, "get_absolute_url"):
-            redirect = redirect.get_absolute_url()
-
-        get_success_context = "get_success_context"
-        render_success = "render_success"
-        if hasattr(form, "slug"):
-            get_success_context += "_" + form.slug
-            render_success += "_" + form.slug
-
-        if get_option(form, render_success, None):
-            context = SekizaiContext(
-                {
-                    "form": form,
-                    "instance": self.instance,
-                    "request": self.request,
-                    "get_str": urlencode(
-                        {x: y for x, y in self.request.POST.items() if "csrf" not in x}
+        with measure("response", form_name=get_option(form, "form_name")):
+            # Identify redirect
+            redirect = get_option(form, "redirect", None)
+            if isinstance(redirect, str):
+                try:
+                    redirect = reverse(redirect)
+                except NoReverseMatch:
+                    pass
+            elif hasattr(redirect, "get_absolute_url"):
+                redirect = redirect.get_absolute_url()
+
+            get_success_context = "get_success_context"
+            render_success = "render_success"
+            if hasattr(form, "slug"):
+                get_success_context += "_" + form.slug
+                render_success += "_" + form.slug
+
+            if get_option(form, render_success, None):
+                context = SekizaiContext(
+                    {
+                        "form": form,
+                        "instance": self.instance,
+                        "request": self.request,
+                        "get_str": urlencode(
+                            {
+                                x: y
+                                for x, y in self.request.POST.items()
+                                if "csrf" not in x
+                            }
+                        ),
+                    }
+                )
+                if hasattr(form, get_success_context):
+                    get_success_context = getattr(form, get_success_context)
+                    context.update(
+                        get_success_context(self.request, self.instance, form)
+                    )
+                context.update(get_option(form, "success_context", None) or {})
+
+                errors, result, redir, content = (
+                    [],
+                    context.get("result", "success"),
+                    "" if self.replace else "result",
+                    render_to_string(
+                        get_option(form, render_success),
+                        context.flatten(),
+                        self.request,
                     ),
+                )
+            elif redirect:
+                errors, result, redir, content = (
+                    [],
+                    "success",
+                    redirect,
+                    "",
+                )
+            else:
+                errors, result, redir, content = (
+                    [_("No content in response form")],
+                    "error",
+                    "",
+                    "",
+                )
+            redirect = redirect or redir
+            return JsonResponse(
+                {
+                    "result": result,
+                    "redirect": redirect,
+                    "errors": errors,
+                    "field_errors": {},
+                    "content": content,
                 }
             )
-            if hasattr(form, get_success_context):
-                get_success_context = getattr(form, get_success_context)
-                context.update(get_success_context(self.request, self.instance, form))
-
-            errors, result, redir, content = (
-                [],
-                context.get("result", "success"),
-                "" if self.replace else "result",
-                render_to_string(
-                    get_option(form, render_success), context.flatten(), self.request
-                ),
-            )
-        elif redirect:
-            errors, result, redir, content = (
-                [],
-                "success",
-                redirect,
-                "",
-            )
-        else:
-            errors, result, redir, content = (
-                [_("No content in response form")],
-                "error",
-                "",
-                "",
-            )
-        redirect = redirect or redir
-        return JsonResponse(
-            {
-                "result": result,
-                "redirect": redirect,
-                "errors": errors,
-                "field_errors": {},
-                "content": content,
-            }
-        )
+
+    def render_invalid(self, form):
+        """Whether the response to an invalid submission contains the re-rendered
+        form (besides the errors which ``ajax_form.js`` patches into the page)"""
+        return get_option(form, "render_invalid", settings.RENDER_INVALID_FORM)
 
     def form_invalid(self, form):
-        return JsonResponse(
-            {
-                "result": "invalid form",
-                "errors": form.non_field_errors(),
-                "field_errors": {
-                    key + str(self.instance.id): value
-                    for key, value in form.errors.items()
-                },
-                "html": form.render(context=csrf(self.request))
+        response = {
+            "result": "invalid form",
+            "errors": form.non_field_errors(),
+            "field_errors": {
+                key + str(self.instance.id): value for key, value in form.errors.items()
+            },
+        }
+        if self.render_invalid(form):
+            response["html"] = (
+                form.render(context={**form.get_context(), **csrf(self.request)})
                 if hasattr(form, "render")
-                else "",  # Kills reCAPTCHA
-            }
-        )
+                else ""
+            )  # Kills reCAPTCHA
+        return JsonResponse(response)
 
     def get_form_class(self, slug=None):
         if hasattr(self, "form_classes") and isinstance(self.form_classes, list):
@@ -176,21 +206,276 @@ class AjaxFormMixin(FormMixin):
             )
         return kwargs
 
+    def get_compiled_form_class(self):
+        """Returns the form class, taken from the cached compiled validator if the
+        form can be cached (see ``get_validator_key``)"""
+        key = self.get_validator_key()
+        if key is None:
+            return self.get_form_class()
+        validator = get_cached_validator(key, self.get_form_class, self.get_prefix())
+        return self.get_form_class() if validator is None else validator.form_class
+
     def get_ajax_form(self, slug=None):
-        form_class = self.get_form_class(slug)
-        if form_class:
-            if getattr(form_class, "takes_request", False):
-                form = form_class(request=self.request, **self.get_form_kwargs(slug))
-            else:
-                form = form_class(**self.get_form_kwargs(slug))
-            if self.instance:
-                for field in form.base_fields:
-                    form.fields[field].widget.attrs.update(
-                        {"id": (field or "") + str(self.instance.id)}
+        with measure("form_class") as tags:
+            form_class = (
+                self.get_form_class(slug) if slug else self.get_compiled_form_class()
+            )
+            if form_class:
+                tags["form_name"] = get_option(form_class, "form_name")
+                if getattr(form_class, "takes_request", False):
+                    form = form_class(
+                        request=self.request, **self.get_form_kwargs(slug)
                     )
-            return form
+                else:
+                    form = form_class(**self.get_form_kwargs(slug))
+                if self.instance:
+                    for field in form.base_fields:
+                        form.fields[field].widget.attrs.update(
+                            {"id": (field or "") + str(self.instance.id)}
+                        )
+                return form
+        return None
+
+    def get_validator_key(self):
+        """Key under which the compiled validator of the form is cached between
+        requests, or ``None`` if it must not be cached"""
         return None
 
+    def validate_fields(self, names):
+        """Validates only the given fields of the posted data, e.g., while the user
+        fills in the form. Form-wide validation is left to the submission."""
+        names, errors = self.get_field_errors(names)
+        if not names:
+            raise Http404
+        return JsonResponse(
+            {
+                "result": "invalid form" if errors else "valid",
+                "fields": [name + str(self.instance.id) for name in names],
+                "field_errors": {
+                    key + str(self.instance.id): value for key, value in errors.items()
+                },
+            }
+        )
+
+    def get_field_errors(self, names):
+        """Returns the names of the form's fields among ``names`` and the errors of
+        these fields in the posted data"""
+        request = self.request
+        with measure("form_class") as tags:
+            validator = get_cached_validator(
+                self.get_validator_key(), self.get_form_class, self.get_prefix()
+            )
+            if validator is not None:
+                tags["form_name"] = get_option(validator.form_class, "form_name")
+        if validator is not None:
+            names = [name for name in names if name in validator.field_names]
+            if not names:
+                return names, {}
+            with measure("validation", form_name=tags["form_name"]):
+                _, errors = validator.clean_fields(request.POST, request.FILES, names)
+        else:
+            form = self.get_ajax_form()
+            if form is None or not any(name in form.fields for name in names):
+                return [], {}
+            with measure("validation", form_name=get_option(form, "form_name")):
+                form.is_valid()
+            names = [name for name in names if name in form.fields]
+            errors = {name: form.errors[name] for name in names if name in form.errors}
+        return names, errors
+
+    def submit_step(self, step):
+        """Validates the posted fields of a step of a multi-step form (see
+        ``steps``) and returns the token for the next step. For the last step the
+        values of all steps are merged into ``request.POST`` and ``None`` is
+        returned: the form is then submitted as usual."""
+        request = self.request
+        form_class, fields = self.get_fields()
+        steps = get_steps(form_class)
+        try:
+            step = int(step)
+        except ValueError:
+            raise Http404
+        if not 0 <= step < len(steps):
+            raise Http404
+        key = str(self.instance.pk)
+        validated, values = steps_module.loads(
+            request.POST.get(steps_module.TOKEN_FIELD, ""), key
+        )
+        if step > validated:  # Back to the first step not validated yet
+            return JsonResponse(
+                {
+                    "result": "step",
+                    "step": validated,
+                    "token": steps_module.dumps(key, validated, values),
+                }
+            )
+        html_names = {name: html_name for name, html_name, field, is_file in fields}
+        step_fields = {html_names[name] for name in steps[step] if name in html_names}
+        data = request.POST.copy()
+        for html_name, value in values.items():
+            if html_name not in step_fields:
+                data.setlist(html_name, value)
+        request.POST = data
+        if step == len(steps) - 1:
+            return None
+
+        names, errors = self.get_field_errors(steps[step])
+        if errors:
+            return JsonResponse(
+                {
+                    "result": "invalid form",
+                    "errors": [],
+                    "field_errors": {
+                        name + str(self.instance.id): value
+                        for name, value in errors.items()
+                    },
+                }
+            )
+        values.update(
+            {html_names[name]: data.getlist(html_names[name]) for name in names}
+        )
+        return JsonResponse(
+            {
+                "result": "step",
+                "step": step + 1,
+                "token": steps_module.dumps(key, max(validated, step + 1), values),
+            }
+        )
+
+    def get_fields(self):
+        """Returns the form class and its fields as ``(name, html name, field,
+        is file)`` tuples, taken from the cached compiled validator if possible"""
+        prefix = self.get_prefix()
+        with measure("form_class") as tags:
+            validator = get_cached_validator(
+                self.get_validator_key(), self.get_form_class, prefix
+            )
+            if validator is not None:
+                form_class, fields = validator.form_class, validator.fields
+            else:
+                form_class = self.get_form_class()
+                fields = tuple(
+                    (
+                        name,
+                        f"{prefix}-{name}" if prefix else name,
+                        field,
+                        field.widget.needs_multipart_form,
+                    )
+                    for name, field in getattr(form_class, "base_fields", {}).items()
+                )
+            tags["form_name"] = get_option(form_class, "form_name")
+        return form_class, fields
+
+    def save_draft(self, names):
+        """Merges the posted values of the given fields into the user's or session's
+        draft of the form (see ``FormDraft``). Drafts are not validated."""
+        form_class, fields = self.get_fields()
+        if not get_option(form_class, "drafts", False):
+            raise Http404
+        data = {
+            name: field.widget.value_from_datadict(self.request.POST, {}, html_name)
+            for name, html_name, field, is_file in fields
+            if name in names and not is_file and name != recaptcha.field_name
+        }
+        draft = models.FormDraft.objects.patch(
+            get_option(form_class, "form_name"), self.request, data
+        )
+        return JsonResponse(
+            {"result": "draft", "fields": list(data) if draft is not None else []}
+        )
+
+    def upload(self, name):
+        """Receives a file for the (resumable) file field ``name`` in chunks before
+        the form is submitted. Posting the file's ``name``, ``size``, and
+        ``content_type`` starts an upload if the field accepts the file. Posting a
+        chunk (as file ``chunk``) with the parameters ``id`` and ``chunk`` (its
+        number) saves it. All requests, including those with only an ``id``, return
+        the upload's status with the numbers of the received chunks, so that an
+        interrupted upload can resume. Starting an upload is refused (status 429)
+        while the client has ``DJANGOCMS_FORM_BUILDER_UPLOAD_MAX_OPEN`` uploads
+        open."""
+        request = self.request
+        form_class, fields = self.get_fields()
+        html_name, field = next(
+            (
+                (html_name, field)
+                for field_name, html_name, field, is_file in fields
+                if field_name == name
+            ),
+            (None, None),
+        )
+        if not isinstance(field, models.UploadField) or not isinstance(
+            field.widget, models.ResumableFileInput
+        ):
+            raise Http404
+
+        if "id" in self.parameter:
+            upload = uploads.ChunkedUpload.get(self.parameter["id"])
+            if upload is None or upload.field != html_name:
+                raise Http404
+            if "chunk" in self.parameter:
+                try:
+                    upload.write_chunk(
+                        int(self.parameter["chunk"]), request.FILES["chunk"]
+                    )
+                except (KeyError, ValueError):
+                    return JsonResponse(
+                        {"result": "error", "errors": [_("Invalid chunk.")]},
+                        status=400,
+                    )
+            return JsonResponse(upload.get_status())
+
+        try:
+            size = int(request.POST.get("size", ""))
+        except ValueError:
+            size = -1
+        if size < 0:
+            return JsonResponse(
+                {"result": "error", "errors": [_("Invalid file size.")]}, status=400
+            )
+        file = UploadedFile(
+            name=request.POST.get("name", ""),
+            content_type=request.POST.get("content_type", ""),
+            size=size,
+        )
+        errors = {}
+        try:
+            check_login_required(form_class, request)
+        except ValidationError as error:
+            errors["__all__"] = error.messages
+        try:
+            field.clean(file)  # Checks the name, type, and size
+        except ValidationError as error:
+            errors[name + str(self.instance.id)] = error.messages
+        if errors:
+            return JsonResponse(
+                {
+                    "result": "invalid form",
+                    "fields": list(errors),
+                    "field_errors": errors,
+                }
+            )
+        client = uploads.get_client_id(request)
+        if (
+            settings.UPLOAD_MAX_OPEN is not None
+            and uploads.count_open_uploads(client) >= settings.UPLOAD_MAX_OPEN
+        ):
+            key = name + str(self.instance.id)
+            return JsonResponse(
+                {
+                    "result": "invalid form",
+                    "fields": [key],
+                    "field_errors": {
+                        key: [_("Too many uploads in progress. Please try later.")]
+                    },
+                },
+                status=429,
+            )
+        upload = uploads.ChunkedUpload.start(
+            html_name, file.name, file.size, file.content_type, client=client
+        )
+        return JsonResponse(upload.get_status())
+
     def ajax_post(self, request, instance, parameter=None):
         if parameter is None:
             parameter = {}
@@ -198,10 +483,53 @@ class AjaxFormMixin(FormMixin):
         self.instance = instance
         self.parameter = parameter
 
-        form = self.get_ajax_form()
-        if form.is_valid():
-            return self.form_valid(form)
+        if isinstance(parameter.get("validate"), str):
+            return self.validate_fields(parameter["validate"].split("+"))
+        if isinstance(parameter.get("upload"), str):
+            return self.upload(parameter["upload"])
+        if isinstance(parameter.get("draft"), str):
+            return self.save_draft(parameter["draft"].split("+"))
+        if isinstance(parameter.get("step"), str):
+            response = self.submit_step(parameter["step"])
+            if response is not None:
+                return response
+
+        validator = None
+        if settings.COMPILED_VALIDATION:
+            with measure("form_class") as tags:
+                validator = get_cached_validator(
+                    self.get_validator_key(), self.get_form_class, self.get_prefix()
+                )
+                if validator is not None:
+                    form_class = validator.form_class
+                    tags["form_name"] = get_option(form_class, "form_name")
+        if validator is not None:
+            form_name = get_option(form_class, "form_name")
+            with measure("validation", form_name=form_name):
+                cleaned_data, errors = validator.validate(
+                    request, request.POST, request.FILES
+                )
+            if not errors:
+                return self.form_valid(
+                    form_class.from_cleaned_data(
+                        request, request.POST, cleaned_data, request.FILES
+                    )
+                )
+            if self.render_invalid(form_class):
+                form = self.get_ajax_form()
+            else:  # Errors only: no need to build the full form
+                form = form_class.from_cleaned_data(
+                    request, request.POST, cleaned_data, request.FILES
+                )
+            form.cleaned_data, form._errors = cleaned_data, errors
         else:
+            form = self.get_ajax_form()
+            form_name = get_option(form, "form_name")
+            with measure("validation", form_name=form_name):
+                valid = form.is_valid()
+            if valid:
+                return self.form_valid(form)
+        with measure("response", form_name=form_name):
             return self.form_invalid(form)
 
 
@@ -213,6 +541,9 @@ class CMSAjaxForm(AjaxFormMixin, CMSAjaxBase):
         """
         return super(CMSAjaxBase, self).get_form(request, *args, **kwargs)
 
+    def get_max_body_size(self, request, instance):
+        return get_option(self.form_class, "max_body_size", settings.MAX_BODY_SIZE)
+
     def set_context(self, context, instance, placeholder):
         return {}
 
@@ -241,6 +572,20 @@ class CMSAjaxForm(AjaxFormMixin, CMSAjaxBase):
                 "csrf_cookie_httponly": django_settings.CSRF_COOKIE_HTTPONLY,
             }
         )
+        if form and get_option(form, "client_validation", settings.CLIENT_VALIDATION):
+            context["validation_schema"] = get_client_schema(form, str(instance.id))
+            context["schema_id"] = f"validation{context['uid']}"
+        context["live_validation"] = form and get_option(
+            form, "live_validation", settings.LIVE_VALIDATION
+        )
+        context["drafts"] = form and get_option(form, "drafts", False)
+        context["steps"] = len(get_steps(type(form))) if form else 0
+        conditions = get_conditions(type(form)) if form else None
+        if conditions:
+            context["condition_rules"] = conditions.get_client_rules(
+                form, str(instance.id)
+            )
+            context["conditions_id"] = f"conditions{context['uid']}"
         return context
 
 
@@ -269,6 +614,7 @@ class FormPlugin(ActionMixin, CMSAjaxForm):
                     (
                         "form_login_required",
                         "form_unique",
+                        "form_drafts",
                     ),
                     "form_floating_labels",
                     "form_spacing",
@@ -337,13 +683,104 @@ class FormPlugin(ActionMixin, CMSAjaxForm):
             return forms._form_registry.get(self.instance.form_selection, None)
         return None
 
+    def get_cache_expiration(self, request, instance, placeholder):
+        """Forms with drafts are rendered with the user's draft and not cached"""
+        form_class = (
+            forms._form_registry.get(instance.form_selection, None)
+            if instance.form_selection
+            else None
+        )
+        if instance.form_drafts or get_option(form_class, "drafts", False):
+            return 0
+        return super().get_cache_expiration(request, instance, placeholder)
+
+    def get_max_body_size(self, request, instance):
+        """Forms from the registry can set the ``max_body_size`` option. For forms
+        built from plugins the limit grows by the size of the files their upload
+        fields accept, except resumable uploads which are posted in chunks."""
+        if instance.form_selection:
+            form_class = forms._form_registry.get(instance.form_selection, None)
+            return get_option(form_class, "max_body_size", settings.MAX_BODY_SIZE)
+        if settings.MAX_BODY_SIZE is None:
+            return None
+        upload_fields = instance.get_descendants().filter(plugin_type="FileFieldPlugin")
+        return settings.MAX_BODY_SIZE + sum(
+            (config.get("field_max_size") or 0)
+            * 1024
+            * 1024
+            * (config.get("field_max_files") or 1)
+            for config in upload_fields.values_list(
+                "djangocms_form_builder_formfield__config", flat=True
+            )
+            if config and not config.get("field_resumable")
+        )
+
+    def get_validator_key(self):
+        """Identifies the form plugin, the active language, and the state of its
+        children: adding, changing, moving, or deleting a child plugin as well as a
+        change of a select's choices or choice source yield a new key. Moves do not
+        touch ``changed_date``, hence each child's parent and position are part of
+        the key. The form class is built with its strings resolved in the active
+        language, hence one per language."""
+        descendants = list(
+            self.instance.get_descendants().values_list(
+                "pk",
+                "parent_id",
+                "position",
+                "plugin_type",
+                "changed_date",
+                "djangocms_form_builder_formfield__config",
+            )
+        )
+        selects = [
+            config or {}
+            for pk, parent, position, plugin_type, changed, config in descendants
+            if plugin_type == "SelectPlugin"
+        ]
+        providers = (
+            get_choice_provider(config.get("field_choices_source") or "")
+            for config in selects
+        )
+        return (
+            self.instance.pk,
+            translation.get_language(),
+            self.instance.changed_date,
+            tuple(
+                (pk, parent, position)
+                for pk, parent, position, plugin_type, changed, config in descendants
+            ),
+            max(
+                (descendant[4] for descendant in descendants),
+                default=None,
+            ),
+            tuple(config.get("_choices_version") for config in selects),
+            tuple(
+                (provider.hash, provider.get_version())
+                for provider in providers
+                if provider is not None
+            ),
+        )
+
     def create_form_class_from_plugins(self):
-        def traverse(instance):
+        def traverse(instance, step=None):
             """Recursively traverse children to identify form fields (by them having a method called
             "get_form_field" """
             if hasattr(instance, "get_form_field"):
                 name, field = instance.get_form_field()
-                fields[name] = field
+                fields[name] = resolve_strings(field)
+                condition = instance.get_condition()
+                if condition is not None:
+                    conditions[name] = condition
+                if step is not None:
+                    step.append(name)
+                # Form fields contain no further fields, e.g., a Select's children
+                # are its choices which are already part of its form field
+                return
+            if instance.plugin_type == "FormStepPlugin":  # Fields of a new step
+                step = []
+                fieldsets.append(
+                    (instance.config.get("step_title") or None, {"fields": step})
+                )
             if (
                 instance.child_plugin_instances is None
             ):  # children already fetched from db?
@@ -351,9 +788,11 @@ class FormPlugin(ActionMixin, CMSAjaxForm):
                     child.get_plugin_instance()[0] for child in instance.get_children()
                 ]
             for child in instance.child_plugin_instances:
-                traverse(child)
+                traverse(child, step)
 
         fields = {}
+        fieldsets = []
+        conditions = {}
         traverse(self.instance)
 
         # Add recaptcha field if necessary
@@ -370,6 +809,9 @@ class FormPlugin(ActionMixin, CMSAjaxForm):
         )
         meta_options["login_required"] = self.instance.form_login_required
         meta_options["unique"] = self.instance.form_unique
+        meta_options["drafts"] = self.instance.form_drafts
+        meta_options["steps"] = bool(fieldsets)
+        meta_options["conditions"] = conditions
         form_actions = self.instance.form_actions or "[]"
         meta_options["form_actions"] = json.loads(form_actions.replace("'", '"'))
         meta_options["form_parameters"] = getattr(
@@ -381,6 +823,7 @@ class FormPlugin(ActionMixin, CMSAjaxForm):
             (),
             dict(
                 options=meta_options,
+                fieldsets=tuple(fieldsets),
                 verbose_name=self.instance.form_name.replace("-", " ")
                 .replace("_", " ")
                 .capitalize(),
@@ -1,11 +1,15 @@
+from cms import operations
 from cms.plugin_base import CMSPluginBase
 from cms.plugin_pool import plugin_pool
+from django.db import transaction
+from django.http import Http404, JsonResponse
 from django.utils.encoding import force_str
 from django.utils.translation import gettext_lazy as _
 
 from .. import forms, models, settings
 from .. import forms as forms_module
-from ..helpers import add_plugin, delete_plugin, insert_fields
+from ..choices import get_choice_index
+from ..helpers import add_plugins, delete_plugins, insert_fields
 from .ajax_plugins import FormPlugin
 
 mixin_factory = settings.get_renderer(forms_module)
@@ -47,17 +51,32 @@ class FormElementPlugin(CMSPluginBase):
             parent = parent.parent
         return [""]
 
+    condition_fields = (
+        "field_condition_effect",
+        ("field_condition", "field_condition_operator"),
+        "field_condition_value",
+    )
+
     def get_fieldsets(self, request, obj=None):
+        fieldsets = super().get_fieldsets(request, obj)
         if hasattr(self, "settings_fields"):
-            return insert_fields(
-                super().get_fieldsets(request, obj),
+            fieldsets = insert_fields(
+                fieldsets,
                 self.settings_fields,
                 block=None,
                 position=-1,
                 blockname=self.settings_name,
                 blockattrs=dict(classes=()),
             )
-        return super().get_fieldsets(request, obj)
+        if hasattr(self.model, "get_form_field"):  # Only fields can be conditional
+            fieldsets = insert_fields(
+                fieldsets,
+                self.condition_fields,
+                block=None,
+                position=-1,
+                blockname=_("Conditions"),
+            )
+        return fieldsets
 
     def render(self, context, instance, placeholder):
         # instance.add_classes("form-control")
@@ -168,43 +187,78 @@ class SelectPlugin(mixin_factory("SelectField"), FormElementPlugin):
                     "On the right side enter the text to be shown to the user. The order of choices can be adjusted "
                     "in the structure tree <b>after saving</b> the edits."
                 ),
-                "fields": ("field_choices",),
+                "fields": ("field_choices_source", "field_choices"),
             },
         ),
     )
 
     def save_model(self, request, obj, form, change):
-        """Reflects the quick edit changes in the plugin tree"""
-        super().save_model(request, obj, form, change)
-        child_plugins = obj.get_children()
-        children = {}
-        for child in child_plugins:
-            child_ui = child.djangocms_form_builder_formfield
-            children[child_ui.config["value"]] = child_ui
-        position = len(child_plugins)
-        data = form.cleaned_data
-        for value, verbose in data["field_choices"]:
-            child = children.pop(value, None)
-            if child is not None:  # Need to update?
-                if verbose != child.config["verbose"]:
+        """Reflects the quick edit changes in the plugin tree in one transaction: Changed
+        choices are updated and removed choices deleted in bulk. New choices are added
+        in bulk after the existing ones."""
+        with transaction.atomic():
+            super().save_model(request, obj, form, change)
+            if obj.get_choice_provider():  # Choice plugins are not used
+                return
+            children = {
+                child.config["value"]: child
+                for child in models.FormField.objects.filter(parent_id=obj.pk)
+            }
+            changed, new = [], []
+            for value, verbose in form.cleaned_data["field_choices"]:
+                child = children.pop(value, None)
+                if child is None:  # Not in there, add it!
+                    new.append(dict(value=value, verbose=verbose))
+                elif verbose != child.config["verbose"]:  # Need to update?
                     child.config["verbose"] = verbose
-                    child.save()
-            else:  # Not in there, add it!
-                add_plugin(
+                    changed.append(child)
+            if changed:
+                models.FormField.objects.bulk_update(changed, ["config"])
+            if children:  # Delete remaining
+                delete_plugins(obj.placeholder, children.values())
+            if new:
+                position = obj.position + obj.get_children().count() + 1
+                add_plugins(
                     obj.placeholder,
-                    models.Choice(
-                        parent=obj,
-                        placeholder=obj.placeholder,
-                        position=obj.position + position + 1,
-                        language=obj.language,
-                        plugin_type=ChoicePlugin.__name__,
-                        ui_item=models.Choice.__class__.__name__,
-                        config=dict(value=value, verbose=verbose),
-                    ),
+                    [
+                        models.Choice(
+                            parent=obj,
+                            placeholder=obj.placeholder,
+                            position=position + i,
+                            language=obj.language,
+                            plugin_type=ChoicePlugin.__name__,
+                            ui_item=models.Choice.__name__,
+                            config=config,
+                        )
+                        for i, config in enumerate(new)
+                    ],
                 )
-                position += 1
-        for _key, child in children.items():  # Delete remaining
-            delete_plugin(child)
+            obj.update_choices()
+
+    def ajax_get(self, request, instance, parameter):
+        """Returns a page of the choices of a searchable drop down matching the
+        search term ``q``, e.g., ``?q=ber&page=2``"""
+        if (
+            "choices" not in parameter
+            or instance.config.get("field_select") != "remote"
+        ):
+            raise Http404()
+        try:
+            page = int(request.GET.get("page", 1))
+        except ValueError:
+            page = 1
+        results, more = get_choice_index(instance).search(
+            request.GET.get("q", ""), page, settings.REMOTE_CHOICES_PAGE_SIZE
+        )
+        return JsonResponse(
+            {
+                "results": [
+                    {"value": value, "label": force_str(label)}
+                    for value, label in results
+                ],
+                "more": more,
+            }
+        )
 
 
 @plugin_pool.register_plugin
@@ -217,6 +271,31 @@ class ChoicePlugin(mixin_factory("ChoiceField"), FormElementPlugin):
     require_parent = True
     parent_classes = ["SelectPlugin"]
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        update_select_choices(obj.parent_id)
+
+
+def update_select_choices(*parent_ids):
+    for select in models.Select.objects.filter(
+        pk__in=parent_ids, plugin_type=SelectPlugin.__name__
+    ):
+        select.update_choices()
+
+
+def update_choices_after_operation(sender, operation, **kwargs):
+    """Receiver for cms' post_placeholder_operation signal keeping the choices of
+    Select plugins up to date when choices are moved, cut, pasted, or deleted in the
+    structure board"""
+    if operation in (operations.MOVE_PLUGIN, operations.CUT_PLUGIN):
+        update_select_choices(
+            kwargs["source_parent_id"], kwargs.get("target_parent_id")
+        )
+    elif operation == operations.PASTE_PLUGIN:
+        update_select_choices(kwargs["target_parent_id"])
+    elif operation == operations.DELETE_PLUGIN:
+        update_select_choices(kwargs["plugin"].parent_id)
+
 
 @plugin_pool.register_plugin
 class BooleanFieldPlugin(mixin_factory("BooleanField"), FormElementPlugin):
@@ -239,6 +318,29 @@ class BooleanFieldPlugin(mixin_factory("BooleanField"), FormElementPlugin):
     )
 
 
+@plugin_pool.register_plugin
+class FileFieldPlugin(mixin_factory("FileField"), FormElementPlugin):
+    name = _("File upload")
+    model = models.FileField
+    form = forms.FileFieldForm
+    settings_fields = (
+        "field_accept",
+        ("field_max_size", "field_max_files"),
+        "field_resumable",
+    )
+
+
+@plugin_pool.register_plugin
+class FormStepPlugin(mixin_factory("FormStep"), FormElementPlugin):
+    name = _("Form step")
+    model = models.FormStep
+    form = forms.FormStepForm
+    allow_children = True
+    render_template = f"djangocms_form_builder/{settings.framework}/widgets/step.html"
+
+    fieldsets = ((None, {"fields": ("step_title",)}),)
+
+
 @plugin_pool.register_plugin
 class SubmitPlugin(mixin_factory("SubmitButton"), FormElementPlugin):
     name = _("Submit button")
@@ -0,0 +1,127 @@
+"""
+Conditional fields.
+
+A field can be shown or required depending on the value of another field of the
+same form, e.g., "show *company* if *customer_type* equals *business*". Forms built
+from plugins take the rules from their fields' configuration, forms from the
+registry from the option ``conditions``::
+
+    class Meta:
+        options = {
+            "conditions": {
+                "company": {
+                    "field": "customer_type",
+                    "operator": "equals",  # "not_equals", "empty", "not_empty"
+                    "value": "business",
+                    "effect": "show",  # or "require"
+                },
+            },
+        }
+
+The rules of a form class are compiled once (see ``get_conditions``) into a table of
+Python predicates for validation and a JSON table for ``ajax_form.js``. Both compare
+the submitted values as strings, a checked checkbox having the value "on". A field
+whose "show" condition does not hold is hidden: it is neither validated nor part of
+the cleaned data, and fields depending on it see no value. A field with a "require"
+condition is required while the condition holds.
+"""
+
+from .helpers import get_option
+
+OPERATORS = {
+    "equals": lambda values, value: value in values,
+    "not_equals": lambda values, value: value not in values,
+    "empty": lambda values, value: not values,
+    "not_empty": lambda values, value: bool(values),
+}
+EFFECTS = ("show", "require")
+
+
+def get_values(value):
+    """Returns a submitted (raw) value as a list of non-empty strings"""
+    if value is True:
+        return ["on"]
+    if value is None or value is False:
+        return []
+    values = value if isinstance(value, (list, tuple)) else [value]
+    return [str(item) for item in values if item is not None and item != ""]
+
+
+class Conditions:
+    def __init__(self, rules):
+        self.rules = {}
+        self.predicates = {}
+        for name, rule in rules.items():
+            operator = OPERATORS.get(rule.get("operator", "equals"))
+            effect = rule.get("effect", "show")
+            if (
+                operator is None
+                or effect not in EFFECTS
+                or rule.get("field")
+                in (
+                    None,
+                    "",
+                    name,
+                )
+            ):
+                continue
+            value = str(rule.get("value", ""))
+            self.rules[name] = {
+                "field": rule["field"],
+                "operator": rule.get("operator", "equals"),
+                "value": value,
+                "effect": effect,
+            }
+            self.predicates[name] = (
+                effect,
+                rule["field"],
+                lambda values, operator=operator, value=value: operator(values, value),
+            )
+
+    def __bool__(self):
+        return bool(self.predicates)
+
+    def evaluate(self, get_value):
+        """Returns the names of the hidden fields and of the fields required by a
+        condition. ``get_value`` returns the submitted value of a field by name."""
+
+        def holds(name, stack):
+            effect, source, predicate = self.predicates[name]
+            values = get_values(get_value(source)) if visible(source, stack) else []
+            return predicate(values)
+
+        def visible(name, stack):
+            if name in stack or self.predicates.get(name, ("",))[0] != "show":
+                return True  # Cycles are ignored
+            return holds(name, stack | {name})
+
+        hidden, required = set(), set()
+        for name, (effect, source, predicate) in self.predicates.items():
+            if not visible(name, frozenset()):
+                hidden.add(name)
+            elif effect == "require" and holds(name, frozenset({name})):
+                required.add(name)
+        return hidden, required
+
+    def get_client_rules(self, form, suffix=""):
+        """Returns the rules for ``ajax_form.js`` keyed by the widget ids (field
+        name and suffix)"""
+        return {
+            f"{name}{suffix}": {
+                **rule,
+                "name": form.add_prefix(name),
+                "field": form.add_prefix(rule["field"]),
+                "source": f"{rule['field']}{suffix}",
+            }
+            for name, rule in self.rules.items()
+            if name in form.fields
+        }
+
+
+def get_conditions(form_class):
+    """Returns the compiled conditions of a form class, compiled once per class"""
+    conditions = form_class.__dict__.get("_conditions")
+    if conditions is None:
+        conditions = Conditions(get_option(form_class, "conditions", None) or {})
+        form_class._conditions = conditions
+    return conditions
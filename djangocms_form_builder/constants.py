@@ -19,6 +19,7 @@ CHOICE_FIELDS = (
         (
             ("select", _("Drop down")),
             ("radio", _("Radio buttons")),
+            ("remote", _("Searchable drop down (loads choices on demand)")),
         ),
     ),
     (
@@ -29,3 +30,15 @@ CHOICE_FIELDS = (
         ),
     ),
 )
+
+CONDITION_EFFECTS = (
+    ("show", _("Only show the field if")),
+    ("require", _("Require the field if")),
+)
+
+CONDITION_OPERATORS = (
+    ("equals", _("equals")),
+    ("not_equals", _("does not equal")),
+    ("empty", _("is empty")),
+    ("not_empty", _("is not empty")),
+)
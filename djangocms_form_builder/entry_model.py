@@ -3,10 +3,13 @@ import decimal
 from django import forms
 from django.conf import settings
 from django.core.serializers.json import DjangoJSONEncoder
-from django.db import models
+from django.db import connections, models, transaction
+from django.utils.timezone import now
 from django.utils.translation import gettext_lazy as _
 from entangled.forms import EntangledModelForm
 
+from . import uploads
+
 
 class CSValues(forms.CharField):
     class CSVWidget(forms.TextInput):
@@ -23,10 +26,75 @@ class CSValues(forms.CharField):
         return value
 
 
+class FormEntryQuerySet(models.QuerySet):
+    def latest_for(self, form_name, user):
+        """Returns the latest entry of a user for a form (or ``None``) with only its
+        data loaded. Uses a single lookup on the ``form_builder_entry_latest`` index."""
+        return (
+            self.filter(form_name=form_name, form_user=user)
+            .order_by("-pk")
+            .only("entry_data")
+            .first()
+        )
+
+    def upsert(self, entry):
+        """Saves the entry of a unique form replacing the user's previous entry. Uses
+        a single INSERT ... ON CONFLICT statement on the unique (form_name,
+        unique_user) constraint where the database supports it."""
+        features = connections[self.db].features
+        if not features.supports_update_conflicts:
+            return self.update_or_create(
+                form_name=entry.form_name,
+                unique_user=entry.unique_user,
+                defaults={
+                    field: getattr(entry, field) for field in entry.UPSERT_FIELDS
+                },
+            )[0]
+        self.bulk_create(
+            [entry],
+            update_conflicts=True,
+            update_fields=entry.UPSERT_FIELDS,
+            unique_fields=(
+                ["form_name", "unique_user"]
+                if features.supports_update_conflicts_with_target
+                else None
+            ),
+        )
+        if entry.pk is None:  # Backend cannot return the primary key
+            entry.pk = (
+                self.filter(form_name=entry.form_name, unique_user=entry.unique_user)
+                .values_list("pk", flat=True)
+                .get()
+            )
+        return entry
+
+
 class FormEntry(models.Model):
     class Meta:
         verbose_name = _("Form entry")
         verbose_name_plural = _("Form entries")
+        indexes = [
+            models.Index(
+                fields=["form_name", "form_user", "-id"],
+                name="form_builder_entry_latest",
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["form_name", "unique_user"],
+                name="form_builder_entry_unique_user",
+            ),
+        ]
+
+    UPSERT_FIELDS = [
+        "form_user",
+        "entry_data",
+        "html_headers",
+        "action_records",
+        "entry_updated_at",
+    ]
+
+    objects = FormEntryQuerySet.as_manager()
 
     form_name = models.SlugField(
         verbose_name=_("Form"),
@@ -39,6 +107,17 @@ class FormEntry(models.Model):
         blank=True,
         on_delete=models.CASCADE,
     )
+    unique_user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        blank=True,
+        editable=False,
+        on_delete=models.CASCADE,
+        related_name="+",
+        help_text=_(
+            "Set for entries of unique forms. A user has at most one entry per form."
+        ),
+    )
     entry_data = models.JSONField(
         default=dict,
         blank=True,
@@ -48,6 +127,12 @@ class FormEntry(models.Model):
         default=dict,
         blank=True,
     )
+    action_records = models.JSONField(
+        verbose_name=_("Action records"),
+        default=list,
+        blank=True,
+        help_text=_("Duration and outcome of the form actions run upon submission."),
+    )
     entry_created_at = models.DateTimeField(auto_now_add=True)
     entry_updated_at = models.DateTimeField(auto_now=True)
 
@@ -62,7 +147,9 @@ class FormEntry(models.Model):
                     widget=forms.TextInput if len(value) < 80 else forms.Textarea,
                     required=False,
                 )
-            elif isinstance(value, (list, tuple)):
+            elif isinstance(value, (list, tuple)) and not any(
+                map(uploads.is_reference, value)
+            ):
                 entangled_fields.append(key)
                 fields[key] = CSValues(
                     label=key,
@@ -103,7 +190,7 @@ class FormEntry(models.Model):
         return type("DynamicFormEntryForm", (EntangledModelForm,), fields)
 
     def get_admin_fieldsets(self):
-        return (
+        fieldsets = (
             (
                 None,
                 {
@@ -119,10 +206,166 @@ class FormEntry(models.Model):
                         if isinstance(
                             value, (str, tuple, list, bool, decimal.Decimal, int)
                         )
+                        and not uploads.get_references({key: value})
                     )
                 },
             ),
         )
+        if uploads.get_references(self.entry_data):
+            fieldsets += ((_("Uploaded files"), {"fields": ("uploaded_files",)}),)
+        if self.action_records:
+            fieldsets += (
+                (
+                    _("Actions"),
+                    {
+                        "classes": ("collapse",),
+                        "fields": ("action_records",),
+                    },
+                ),
+            )
+        return fieldsets
+
+    def __str__(self):
+        return f"{self.form_name} ({self.pk})"
+
+
+class FormDraftQuerySet(models.QuerySet):
+    @staticmethod
+    def get_owner(request, create=False):
+        """Returns the key identifying the author of drafts, i.e., the user or, for
+        anonymous users, the session (created if ``create`` is set)"""
+        user = getattr(request, "user", None)
+        if user is not None and user.is_authenticated:
+            return f"user:{user.pk}"
+        session = getattr(request, "session", None)
+        if session is None:
+            return None
+        if session.session_key is None and create:
+            session.save()
+        return f"session:{session.session_key}" if session.session_key else None
+
+    def for_request(self, form_name, request):
+        """Returns the draft of the request's user or session (or ``None``) with
+        only its data loaded"""
+        owner = self.get_owner(request)
+        if owner is None:
+            return None
+        return self.filter(form_name=form_name, owner=owner).only("draft_data").first()
+
+    def patch(self, form_name, request, data):
+        """Merges the field values into the draft of the request's user or session
+        and returns the draft (or ``None`` if there is no user or session)"""
+        owner = self.get_owner(request, create=True)
+        if owner is None:
+            return None
+        with transaction.atomic(using=self.db):
+            draft, created = self.select_for_update().get_or_create(
+                form_name=form_name, owner=owner, defaults={"draft_data": data}
+            )
+            if not created:
+                draft.draft_data.update(data)
+                draft.save(update_fields=["draft_data", "draft_updated_at"])
+        return draft
+
+    def discard(self, form_name, request):
+        owner = self.get_owner(request)
+        if owner is not None:
+            self.filter(form_name=form_name, owner=owner).delete()
+
+
+class FormDraft(models.Model):
+    """Values entered into a form which has not been submitted yet. A user or, for
+    anonymous users, a session has at most one draft per form."""
+
+    class Meta:
+        verbose_name = _("Form draft")
+        verbose_name_plural = _("Form drafts")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["form_name", "owner"],
+                name="form_builder_draft_owner",
+            ),
+        ]
+
+    objects = FormDraftQuerySet.as_manager()
+
+    form_name = models.SlugField(
+        verbose_name=_("Form"),
+    )
+    owner = models.CharField(
+        verbose_name=_("Owner"),
+        max_length=64,
+        help_text=_('"user:<pk>" or "session:<session key>"'),
+    )
+    draft_data = models.JSONField(
+        default=dict,
+        blank=True,
+    )
+    draft_updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.form_name} ({self.pk})"
+
+
+class WebhookDelivery(models.Model):
+    """A form submission queued for delivery to a webhook"""
+
+    PENDING = "pending"
+    DELIVERED = "delivered"
+    FAILED = "failed"
+    STATUS_CHOICES = (
+        (PENDING, _("Pending")),
+        (DELIVERED, _("Delivered")),
+        (FAILED, _("Failed")),
+    )
+
+    class Meta:
+        verbose_name = _("Webhook delivery")
+        verbose_name_plural = _("Webhook deliveries")
+        indexes = [
+            models.Index(
+                fields=["status", "next_attempt_at"],
+                name="form_builder_webhook_due",
+            ),
+        ]
+
+    url = models.URLField(
+        verbose_name=_("URL"),
+        max_length=2048,
+    )
+    payload = models.JSONField(
+        default=dict,
+        encoder=DjangoJSONEncoder,
+    )
+    batch = models.BooleanField(
+        verbose_name=_("Batched"),
+        default=False,
+    )
+    status = models.CharField(
+        verbose_name=_("Status"),
+        max_length=16,
+        choices=STATUS_CHOICES,
+        default=PENDING,
+    )
+    attempts = models.PositiveIntegerField(
+        verbose_name=_("Attempts"),
+        default=0,
+    )
+    last_error = models.TextField(
+        verbose_name=_("Last error"),
+        blank=True,
+        default="",
+    )
+    next_attempt_at = models.DateTimeField(
+        verbose_name=_("Next attempt"),
+        default=now,
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    delivered_at = models.DateTimeField(
+        verbose_name=_("Delivered"),
+        null=True,
+        blank=True,
+    )
+
+    def __str__(self):
+        return f"{self.url} ({self.pk})"
@@ -136,6 +136,8 @@ class ChoicesFormField(fields.AttributesFormField):
 
     def clean(self, value):
         if not value:
+            if not self.required:
+                return []
             raise ValidationError(
                 mark_safe(
                     _(
@@ -1,6 +1,14 @@
+import logging
+import time
+from concurrent.futures import wait
+from functools import partial
+
 from django import forms
 from django.core.exceptions import ValidationError
 from django.core.validators import validate_slug
+from django.db import connections, transaction
+from django.forms.utils import ErrorDict
+from django.utils import translation
 from django.utils.translation import gettext_lazy as _
 from entangled.forms import EntangledModelForm, EntangledModelFormMixin
 
@@ -12,10 +20,16 @@ from . import (
     models,
     recaptcha,
     settings,
+    uploads,
 )
-from .entry_model import FormEntry
+from .choices import get_registered_choice_providers
+from .conditions import get_conditions, get_values
+from .entry_model import FormDraft, FormEntry
 from .fields import AttributesFormField, ButtonGroup, ChoicesFormField
 from .helpers import get_option, mark_safe_lazy
+from .instrumentation import action_stats, measure
+
+logger = logging.getLogger(__name__)
 
 
 class Noop:
@@ -26,43 +40,206 @@ def mixin_factory(x):
     return Noop
 
 
+def check_login_required(form, request):
+    if get_option(form, "login_required", False) and not request.user.is_authenticated:
+        raise ValidationError(
+            _("Please login before submitting this form."), code="unauthorized"
+        )
+
+
 class SimpleFrontendForm(forms.Form):
+    """Form whose ``save`` executes the form actions. Actions set options for the
+    response to a submission, e.g., ``redirect`` or ``render_success``, in
+    ``submission_options``. They take precedence over ``Meta.options`` (see
+    ``get_option``) which is shared by all instances of the form class and must
+    not be changed."""
+
     takes_request = True
 
     def __init__(self, *args, **kwargs):
         self._request = kwargs.pop("request")
+        self.submission_options = {}
         if get_option(self, "unique", False) and self._request.user.is_authenticated:
-            qs = FormEntry.objects.filter(
-                form_user=self._request.user, form_name=get_option(self, "form_name")
+            entry = FormEntry.objects.latest_for(
+                get_option(self, "form_name"), self._request.user
             )
-            if qs:
-                kwargs["initial"] = qs.last().entry_data
+            if entry is not None:
+                kwargs["initial"] = entry.entry_data
+        if get_option(self, "drafts", False) and not args and "data" not in kwargs:
+            draft = FormDraft.objects.for_request(
+                get_option(self, "form_name"), self._request
+            )
+            if draft is not None:  # Newer than the initial values
+                kwargs["initial"] = {
+                    **(kwargs.get("initial") or {}),
+                    **draft.draft_data,
+                }
         super().__init__(*args, **kwargs)
 
-    def clean(self):
-        if get_option(self, "login_required", False):
-            if not self._request.user.is_authenticated:
-                raise ValidationError(
-                    _("Please login before submitting this form."), code="unauthorized"
-                )
+    @classmethod
+    def from_cleaned_data(cls, request, data, cleaned_data, files=None):
+        """Returns a bound form for already validated data (see
+        ``validation.CompiledValidator``). Only Django's ``BaseForm.__init__`` runs,
+        skipping the lookups for initial values of ``__init__`` which a submitted
+        form does not need."""
+        form = cls.__new__(cls)
+        form._request = request
+        form.submission_options = {}
+        super(SimpleFrontendForm, form).__init__(data, files)
+        form._errors = ErrorDict()  # Validated: is_valid() does not clean again
+        form.cleaned_data = cleaned_data
+        return form
+
+    def _clean_fields(self):
+        """Skips fields hidden by a condition and requires fields required by one
+        (see ``conditions``)"""
+        conditions = get_conditions(type(self))
+        if not conditions:
+            return super()._clean_fields()
+        hidden, required = conditions.evaluate(
+            lambda name: self[name].data if name in self.fields else None
+        )
+        for name, bf in self._bound_items():
+            if name in hidden:
+                continue
+            field = bf.field
+            value = bf.initial if field.disabled else bf.data
+            try:
+                if name in required and not get_values(value):
+                    raise ValidationError(
+                        field.error_messages["required"], code="required"
+                    )
+                if isinstance(field, forms.FileField):
+                    self.cleaned_data[name] = field.clean(value, bf.initial)
+                else:
+                    self.cleaned_data[name] = field.clean(value)
+                if hasattr(self, f"clean_{name}"):
+                    self.cleaned_data[name] = getattr(self, f"clean_{name}")()
+            except ValidationError as error:
+                self.add_error(name, error)
 
+    def clean(self):
+        check_login_required(self, self._request)
         cleaned_data = super().clean()
         cleaned_data.pop("captcha_field", None)
         return cleaned_data
 
     def save(self):
+        """Executes the form actions. Actions of the ``ON_COMMIT`` phase, e.g.,
+        sending mails, run once the submission's transaction is committed (right away
+        outside of a transaction), the others within it. Actions flagged as
+        ``independent`` run concurrently in a thread pool while the others run one
+        after another. Results and action records are in the order of the actions.
+        The results of actions waiting for the commit are ``None``. Uploaded files
+        are stored before the actions run and deleted again if one of the actions
+        within the transaction fails."""
         results = {}
+        records = []
+        phases = {actions.IN_TRANSACTION: [], actions.ON_COMMIT: []}
         form_actions = get_option(self, "form_actions", [])
+        stored_files = uploads.store_files(self.cleaned_data)
         for action in form_actions:
             Action = actions.get_action_class(action)
-            if Action is not None:
-                results[action] = Action().execute(self, self._request)
-            else:
+            if Action is None:
                 results[action] = _("Action not available any more")
+                continue
+            record = {"action": Action.__name__}
+            records.append(record)
+            phases[Action.phase].append((action, Action, record))
+        self.action_records = records
+        try:
+            self.execute_actions(phases[actions.IN_TRANSACTION], results)
+        except Exception:
+            uploads.delete_files(stored_files)  # No entry refers to them
+            self.persist_action_records(results)
+            raise
+        if phases[actions.ON_COMMIT]:
+            transaction.on_commit(
+                partial(self.execute_on_commit, phases[actions.ON_COMMIT], results)
+            )
+        else:
+            self.persist_action_records(results)
+        if get_option(self, "drafts", False):  # Submitted
+            FormDraft.objects.discard(get_option(self, "form_name"), self._request)
+        results = {action: results.get(action) for action in form_actions}
         if not form_actions:
             results[None] = _("No action registered")
         return results
 
+    def execute_actions(self, scheduled, results):
+        """Executes the ``(action, Action, record)`` tuples and adds their results"""
+        futures = []
+        try:
+            for action, Action, record in scheduled:
+                if Action.independent and settings.ACTION_WORKERS > 1:
+                    future = actions.get_executor().submit(
+                        self.execute_action_in_thread,
+                        Action,
+                        record,
+                        translation.get_language(),
+                    )
+                    futures.append((action, future))
+                else:
+                    results[action] = self.execute_action(Action, record)
+            for action, future in futures:
+                results[action] = future.result()
+        finally:
+            wait([future for _, future in futures])
+
+    def execute_on_commit(self, scheduled, results):
+        """Executes the actions of the ``ON_COMMIT`` phase. The submission is
+        committed at this point, hence errors are recorded and logged only."""
+        try:
+            self.execute_actions(scheduled, results)
+        except Exception:
+            logger.exception(
+                "Form action failed after commit: %s", get_option(self, "form_name")
+            )
+        finally:
+            self.persist_action_records(results)
+
+    def execute_action(self, Action, record):
+        """Executes an action and adds its duration, outcome ("success", "failure",
+        or "error"), and the class of a raised exception to the record"""
+        action = Action()
+        record.update(outcome="success", exception=None)
+        start = time.perf_counter()
+        try:
+            with measure(
+                "action",
+                form_name=get_option(self, "form_name"),
+                action=Action.__name__,
+            ):
+                result = action.execute(self, self._request)
+            if not action.is_success(result):
+                record["outcome"] = "failure"
+            return result
+        except Exception as e:
+            record["outcome"] = "error"
+            record["exception"] = type(e).__name__
+            raise
+        finally:
+            record["duration"] = time.perf_counter() - start
+            action_stats.record(record)
+
+    def execute_action_in_thread(self, Action, record, language):
+        try:
+            with translation.override(language):
+                return self.execute_action(Action, record)
+        finally:
+            connections.close_all()  # Worker threads must not leak connections
+
+    def persist_action_records(self, results):
+        """Stores the action records with the form entries created by the actions
+        if ``DJANGOCMS_FORM_BUILDER_PERSIST_ACTION_RECORDS`` is set"""
+        if not settings.PERSIST_ACTION_RECORDS:
+            return
+        for result in results.values():
+            if isinstance(result, FormEntry):
+                FormEntry.objects.filter(pk=result.pk).update(
+                    action_records=self.action_records
+                )
+
 
 class SelectMultipleActionsWidget(forms.CheckboxSelectMultiple):
     def format_value(self, value):
@@ -87,6 +264,7 @@ class FormsForm(mixin_factory("Form"), EntangledModelForm):
             "form_name",
             "form_login_required",
             "form_unique",
+            "form_drafts",
             "form_floating_labels",
             "form_spacing",
             "form_actions",
@@ -130,6 +308,16 @@ class FormsForm(mixin_factory("Form"), EntangledModelForm):
         help_text=_('Requires "Login required" to be checked to work.'),
     )
 
+    form_drafts = forms.BooleanField(
+        label=_("Save drafts"),
+        required=False,
+        initial=False,
+        help_text=_(
+            "Saves the entered values while the form is filled in and restores them "
+            "when the user returns before submitting."
+        ),
+    )
+
     form_spacing = forms.ChoiceField(
         label=_("Margin between fields"),
         choices=settings.SPACER_SIZE_CHOICES,
@@ -303,6 +491,10 @@ class FormFieldMixin(EntangledModelFormMixin):
                 "field_placeholder",
                 "field_required",
                 "field_help_text",
+                "field_condition_effect",
+                "field_condition",
+                "field_condition_operator",
+                "field_condition_value",
             ]
         }
 
@@ -341,6 +533,40 @@ class FormFieldMixin(EntangledModelFormMixin):
         help_text=_("Help text shown below the field."),
         widget=forms.Textarea,
     )
+    field_condition_effect = forms.ChoiceField(
+        label=_("Condition"),
+        choices=constants.CONDITION_EFFECTS,
+        initial="show",
+        required=False,
+    )
+    field_condition = forms.CharField(
+        label=_("Field"),
+        help_text=_(
+            "Name of the field the condition depends on. Leave empty for no condition."
+        ),
+        required=False,
+        validators=[validate_slug],
+    )
+    field_condition_operator = forms.ChoiceField(
+        label=_("Operator"),
+        choices=constants.CONDITION_OPERATORS,
+        initial="equals",
+        required=False,
+    )
+    field_condition_value = forms.CharField(
+        label=_("Value"),
+        help_text=_('Compared to the entered value, "on" for a checked checkbox'),
+        required=False,
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        condition = cleaned_data.get("field_condition")
+        if condition and condition == cleaned_data.get("field_name"):
+            self.add_error(
+                "field_condition", _("A field cannot depend on its own value.")
+            )
+        return cleaned_data
 
 
 class CharFieldForm(mixin_factory("CharField"), FormFieldMixin, EntangledModelForm):
@@ -495,14 +721,26 @@ class TimeFieldForm(mixin_factory("TimeField"), FormFieldMixin, EntangledModelFo
 class SelectFieldForm(mixin_factory("SelectField"), FormFieldMixin, EntangledModelForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        if "instance" in kwargs and kwargs["instance"] is not None:
-            self.fields["field_choices"].initial = kwargs["instance"].get_choices()
+        instance = kwargs.get("instance", None)
+        if instance is not None:
+            self.fields["field_choices"].initial = (
+                instance.get_child_choices()
+                if instance.get_choice_provider()
+                else instance.get_choices()
+            )
+        providers = get_registered_choice_providers()
+        self.fields["field_choices_source"].choices = providers
+        if len(providers) > 1:
+            self.fields["field_choices"].required = False
+        else:
+            self.fields["field_choices_source"].widget = forms.HiddenInput()
 
     class Meta:
         model = models.FormField
         entangled_fields = {
             "config": [
                 "field_select",
+                "field_choices_source",
             ]
         }
         untangled_fields = ("field_choices",)
@@ -515,11 +753,34 @@ class SelectFieldForm(mixin_factory("SelectField"), FormFieldMixin, EntangledMod
             attrs=dict(property="text", label_class="btn-outline-secondary")
         ),
     )
+    field_choices_source = forms.ChoiceField(
+        label=_("Source of choices"),
+        required=False,
+        initial="",
+        help_text=_(
+            "Choices can be taken from a registered source instead of the choices "
+            "entered below."
+        ),
+    )
     field_choices = ChoicesFormField(
         required=True,
     )
 
     def clean(self):
+        super().clean()
+        if not self.cleaned_data.get(
+            "field_choices_source"
+        ) and not self.cleaned_data.get("field_choices", True):
+            raise ValidationError(
+                {
+                    "field_choices": mark_safe_lazy(
+                        _(
+                            "Please enter at least one choice. Use the <code>+</code> "
+                            "symbol to add a choice."
+                        )
+                    )
+                }
+            )
         if (
             self.cleaned_data.get("field_required", False)
             and self.cleaned_data.get("field_select", "") == "checkbox"
@@ -561,6 +822,25 @@ class ChoiceForm(EntangledModelForm):
     )
 
 
+class FormStepForm(EntangledModelForm):
+    class Meta:
+        model = models.FormField
+        entangled_fields = {
+            "config": [
+                "step_title",
+            ]
+        }
+
+    step_title = forms.CharField(
+        label=_("Title"),
+        required=False,
+        help_text=_(
+            "Forms with steps show one step at a time. Fields outside of the steps "
+            "are shown with the last step."
+        ),
+    )
+
+
 class BooleanFieldForm(
     mixin_factory("BooleanField"), FormFieldMixin, EntangledModelForm
 ):
@@ -590,6 +870,54 @@ class BooleanFieldForm(
         )
 
 
+class FileFieldForm(mixin_factory("FileField"), FormFieldMixin, EntangledModelForm):
+    class Meta:
+        model = models.FormField
+        entangled_fields = {
+            "config": [
+                "field_accept",
+                "field_max_size",
+                "field_max_files",
+                "field_resumable",
+            ]
+        }
+
+    field_accept = forms.CharField(
+        label=_("Accepted file types"),
+        required=False,
+        initial="",
+        help_text=_(
+            "Comma-separated list of file extensions or content types, e.g., "
+            "<code>.pdf,.docx,image/*</code>. Leave empty to accept all files."
+        ),
+    )
+    field_max_size = forms.IntegerField(
+        label=_("Maximum file size (MB)"),
+        required=False,
+        initial=5,
+        min_value=1,
+    )
+    field_max_files = forms.IntegerField(
+        label=_("Maximum number of files"),
+        initial=1,
+        min_value=1,
+        max_value=20,
+    )
+    field_resumable = forms.BooleanField(
+        label=_("Resumable upload"),
+        required=False,
+        initial=False,
+        help_text=_(
+            "Upload files in chunks before submitting the form. Interrupted uploads "
+            "of large files resume where they stopped."
+        ),
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["field_placeholder"].help_text = _("Not visible on most browsers.")
+
+
 class SubmitButtonForm(
     mixin_factory("SubmitButton"), FormFieldMixin, EntangledModelForm
 ):
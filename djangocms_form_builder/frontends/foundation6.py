@@ -12,6 +12,7 @@ attr_dict = dict(
     Select=dict(input="form-select"),
     SelectMultiple=dict(input="form-select"),
     NullBooleanSelect=dict(input="form-select"),
+    RemoteSelect=dict(input="form-select"),
     RadioSelect=dict(
         input="form-check-input", label="form-check-label", div="form-check"
     ),
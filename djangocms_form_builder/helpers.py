@@ -1,11 +1,13 @@
 import copy
 import decimal
+from collections import defaultdict
 
 from django.apps import apps
-from django.db.models import ObjectDoesNotExist
+from django.core.exceptions import ValidationError
+from django.db import connections, transaction
 from django.template.exceptions import TemplateDoesNotExist
 from django.template.loader import select_template
-from django.utils.functional import lazy
+from django.utils.functional import Promise, lazy
 from django.utils.safestring import mark_safe
 
 from . import settings
@@ -14,20 +16,59 @@ global_options = settings.FORM_OPTIONS
 
 
 def get_option(form, option, default=None):
+    """Returns a form option. Options set for the current submission (see
+    ``SimpleFrontendForm.submission_options``) take precedence over the form's
+    ``Meta.options`` and the global options."""
+    submission_options = getattr(form, "submission_options", None) or {}
+    if option in submission_options:
+        return submission_options[option]
     form_options = getattr(getattr(form, "Meta", None), "options", {})
     return form_options.get(option, global_options.get(option, default))
 
 
-def get_related_object(scope, field_name):
+def get_related_object(scope, field_name, request=None):
     """
     Returns the related field, referenced by the content of a ModelChoiceField.
     """
-    try:
-        Model = apps.get_model(scope[field_name]["model"])
-        relobj = Model.objects.get(pk=scope[field_name]["pk"])
-    except (ObjectDoesNotExist, LookupError):
-        relobj = None
-    return relobj
+    return get_related_objects(scope, [field_name], request=request)[field_name]
+
+
+def get_related_objects(scope, field_names=None, request=None):
+    """
+    Returns a dict of the objects referenced by the contents of ModelChoiceFields,
+    e.g., ``{"model": "app.model", "pk": 1}``, for the given fields (default: all
+    references in scope). Unresolvable references return ``None``. Objects are
+    fetched with one query per model and, if a request is given, remembered for
+    the rest of the request.
+    """
+    if request is None:
+        memo = {}
+    else:
+        memo = request.__dict__.setdefault("_form_builder_related_objects", {})
+    references = {}
+    missing = defaultdict(set)
+    for field_name in scope if field_names is None else field_names:
+        reference = scope.get(field_name)
+        if isinstance(reference, dict) and "model" in reference and "pk" in reference:
+            key = (reference["model"].lower(), str(reference["pk"]))
+            references[field_name] = key
+            if key not in memo:
+                missing[key[0]].add(reference["pk"])
+        elif field_names is not None:
+            references[field_name] = None
+    for label, pks in missing.items():
+        try:
+            Model = apps.get_model(label)
+            found = Model.objects.in_bulk(pks)
+        except (LookupError, ValueError, ValidationError):
+            found = {}
+        found = {str(pk): obj for pk, obj in found.items()}
+        for pk in pks:
+            memo[label, str(pk)] = found.get(str(pk))
+    return {
+        field_name: None if key is None else memo[key]
+        for field_name, key in references.items()
+    }
 
 
 def insert_fields(
@@ -86,6 +127,49 @@ def first_choice(choices):
     return None
 
 
+def resolve_lazy(value):
+    """Returns a lazy translation as a string in the active language. Lazy plurals
+    (``ngettext_lazy`` with a named number) only resolve with their number and are
+    returned unchanged."""
+    if isinstance(value, Promise):
+        resolved = str(value)
+        if resolved:
+            return resolved
+    return value
+
+
+def resolve_choices(choices):
+    return [
+        (
+            value,
+            (
+                resolve_choices(label)
+                if isinstance(label, (list, tuple))
+                else resolve_lazy(label)
+            ),
+        )
+        for value, label in choices
+    ]
+
+
+def resolve_strings(field):
+    """Resolves the lazy user-visible strings of a form field in the active
+    language: label, help text, error messages, choices, and widget attributes.
+    Only use with fields which are not shared between languages."""
+    field.label = resolve_lazy(field.label)
+    field.help_text = resolve_lazy(field.help_text)
+    field.error_messages = {
+        code: resolve_lazy(message) for code, message in field.error_messages.items()
+    }
+    if isinstance(getattr(field, "choices", None), list):
+        field.choices = resolve_choices(field.choices)
+    widget = field.widget
+    widget.attrs = {key: resolve_lazy(value) for key, value in widget.attrs.items()}
+    if isinstance(getattr(widget, "empty_choices", None), list):
+        widget.empty_choices = resolve_choices(widget.empty_choices)
+    return field
+
+
 def get_template_path(prefix, template, name):
     return (
         f"djangocms_form_builder/{settings.framework}/{prefix}/{template}/{name}.html"
@@ -131,6 +215,81 @@ def delete_plugin(plugin):
         return plugin.delete()
 
 
+def add_plugins(placeholder, plugins):
+    """CMS version save function to add several plugins of the same model as a block to a
+    placeholder. The block is inserted at the position of the first plugin. For CMS v4+
+    this takes a constant number of queries: The plugins are created using bulk
+    inserts, which neither call ``save()`` nor send signals, i.e., ``pre_save`` and
+    ``post_save`` receivers do not run for them. Fields' ``pre_save`` still runs,
+    e.g., for ``auto_now`` fields. If the placeholder lacks the (private) methods
+    used to shift plugin positions, the plugins are added one by one."""
+    if not plugins:
+        return
+    connection = connections[placeholder._state.db or "default"]
+    bulk = connection.features.can_return_rows_from_bulk_insert and all(
+        hasattr(placeholder, method)
+        for method in (
+            "get_last_plugin_position",
+            "_shift_plugin_positions",
+            "_recalculate_plugin_positions",
+        )
+    )
+    if not bulk:  # CMS < v4, changed CMS internals, or ids of rows not returned
+        for plugin in plugins:
+            add_plugin(placeholder, plugin)
+        return
+
+    from cms.models import CMSPlugin
+
+    model = plugins[0]._meta.concrete_model
+    language = plugins[0].language
+    start = plugins[0].position
+    with transaction.atomic(using=connection.alias):
+        last_position = placeholder.get_last_plugin_position(language) or 0
+        if start <= last_position:
+            # Park the plugins from start on behind the block to avoid collisions
+            offset = last_position + len(plugins)
+            placeholder._shift_plugin_positions(language, start=start, offset=offset)
+        for position, plugin in enumerate(plugins, start=start):
+            plugin.placeholder = placeholder
+            plugin.position = position
+        CMSPlugin.objects.using(connection.alias).bulk_create(plugins)
+        # Django cannot bulk create multi-table models: insert their own table's rows
+        fields = model._meta.local_concrete_fields
+        for plugin in plugins:
+            setattr(plugin, model._meta.pk.attname, plugin.id)
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                "INSERT INTO {} ({}) VALUES ({})".format(
+                    connection.ops.quote_name(model._meta.db_table),
+                    ", ".join(connection.ops.quote_name(f.column) for f in fields),
+                    ", ".join(["%s"] * len(fields)),
+                ),
+                [
+                    [
+                        field.get_db_prep_save(
+                            field.pre_save(plugin, add=True), connection
+                        )
+                        for field in fields
+                    ]
+                    for plugin in plugins
+                ],
+            )
+        if start <= last_position:  # Close the gap behind the block
+            placeholder._recalculate_plugin_positions(
+                language, base=last_position + offset
+            )
+
+
+def delete_plugins(placeholder, plugins):
+    """CMS version save function to delete several plugins (and their descendants) from a
+    placeholder"""
+    if hasattr(placeholder, "delete_plugins"):  # CMS v5.1+
+        return placeholder.delete_plugins(plugins)
+    for plugin in plugins:
+        delete_plugin(plugin)
+
+
 def coerce_decimal(value):
     try:
         return decimal.Decimal(value)
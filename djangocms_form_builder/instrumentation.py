@@ -0,0 +1,242 @@
+"""
+Timing and query count instrumentation of the form lifecycle.
+
+Each stage of a form submission (plugin lookup, form class build, validation, and
+the execution of each form action) is wrapped by :func:`measure`. When a stage
+finishes, the ``stage_finished`` signal is sent with the stage name, its duration in
+seconds, the number of database queries, and the tags ``form_name`` and ``action``.
+If no receiver is connected, nothing is measured.
+
+Two sinks are available and can be activated by the setting
+``DJANGOCMS_FORM_BUILDER_INSTRUMENTATION``, e.g., ``("logging", "metrics")``:
+
+* ``"logging"`` logs every stage to the ``djangocms_form_builder.instrumentation``
+  logger
+* ``"metrics"`` aggregates the stages in memory and exposes them in the Prometheus
+  text format through the ``form_builder:metrics`` view
+
+Independently, every execution of a form action is recorded (duration, outcome, and
+exception class) and aggregated per action in ``action_stats``. The aggregates are
+returned by :func:`get_action_stats` and included in the metrics export.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from django.db import connection
+from django.dispatch import Signal
+
+logger = logging.getLogger(__name__)
+
+stage_finished = Signal()
+
+STAGES = ("plugin_lookup", "form_class", "validation", "action", "response")
+
+
+class QueryCounter:
+    """Database execute wrapper counting the queries run while it is installed"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+@contextmanager
+def measure(stage, form_name=None, action=None):
+    """Context manager measuring time and queries of a lifecycle stage. It yields a
+    dict of tags which may be updated inside the block, e.g., once the form name
+    is known."""
+    tags = {"form_name": form_name, "action": action}
+    if not stage_finished.has_listeners():
+        yield tags
+        return
+    counter = QueryCounter()
+    start = time.perf_counter()
+    try:
+        with connection.execute_wrapper(counter):
+            yield tags
+    finally:
+        stage_finished.send(
+            sender=None,
+            stage=stage,
+            duration=time.perf_counter() - start,
+            queries=counter.count,
+            **tags,
+        )
+
+
+def log_stage(sender, stage, duration, queries, form_name=None, action=None, **kwargs):
+    """Logging sink"""
+    logger.info(
+        "%s form=%s action=%s duration=%.2fms queries=%d",
+        stage,
+        form_name or "-",
+        action or "-",
+        duration * 1000,
+        queries,
+    )
+
+
+class StageMetrics:
+    """Metrics sink aggregating count, total duration, and total queries per stage,
+    form name, and action"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = {}
+
+    def __call__(self, sender, stage, duration, queries, **kwargs):
+        key = (stage, kwargs.get("form_name") or "", kwargs.get("action") or "")
+        with self._lock:
+            count, total_duration, total_queries = self._data.get(key, (0, 0.0, 0))
+            self._data[key] = (
+                count + 1,
+                total_duration + duration,
+                total_queries + queries,
+            )
+
+    def reset(self):
+        with self._lock:
+            self._data = {}
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._data)
+
+    def export(self):
+        """Returns the metrics in the Prometheus text exposition format"""
+
+        def escape(value):
+            return (
+                str(value)
+                .replace("\\", "\\\\")
+                .replace('"', '\\"')
+                .replace("\n", "\\n")
+            )
+
+        prefix = "djangocms_form_builder_stage"
+        data = sorted(self.snapshot().items())
+        lines = [
+            f"# HELP {prefix}_duration_seconds Time spent in a form lifecycle stage.",
+            f"# TYPE {prefix}_duration_seconds summary",
+        ]
+        for (stage, form_name, action), (count, duration, _) in data:
+            labels = f'stage="{escape(stage)}",form_name="{escape(form_name)}",action="{escape(action)}"'
+            lines.append(f"{prefix}_duration_seconds_count{{{labels}}} {count}")
+            lines.append(f"{prefix}_duration_seconds_sum{{{labels}}} {duration:.6f}")
+        lines += [
+            f"# HELP {prefix}_queries_total Database queries run in a form lifecycle stage.",
+            f"# TYPE {prefix}_queries_total counter",
+        ]
+        for (stage, form_name, action), (_, _, queries) in data:
+            labels = f'stage="{escape(stage)}",form_name="{escape(form_name)}",action="{escape(action)}"'
+            lines.append(f"{prefix}_queries_total{{{labels}}} {queries}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = StageMetrics()
+
+
+class ActionStats:
+    """Aggregates the execution records of form actions per action class name.
+    Each record is a dict with the keys ``action``, ``outcome`` (one of ``OUTCOMES``),
+    ``exception`` (class name or ``None``), and ``duration`` (in seconds)."""
+
+    OUTCOMES = ("success", "failure", "error")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = {}
+
+    def record(self, record):
+        with self._lock:
+            stats = self._data.setdefault(
+                record["action"],
+                {
+                    "count": 0,
+                    "total_duration": 0.0,
+                    "max_duration": 0.0,
+                    "outcomes": dict.fromkeys(self.OUTCOMES, 0),
+                    "exceptions": {},
+                },
+            )
+            stats["count"] += 1
+            stats["total_duration"] += record["duration"]
+            stats["max_duration"] = max(stats["max_duration"], record["duration"])
+            stats["outcomes"][record["outcome"]] += 1
+            if record["exception"]:
+                exceptions = stats["exceptions"]
+                exceptions[record["exception"]] = (
+                    exceptions.get(record["exception"], 0) + 1
+                )
+
+    def reset(self):
+        with self._lock:
+            self._data = {}
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                action: {
+                    **stats,
+                    "mean_duration": stats["total_duration"] / stats["count"],
+                    "outcomes": dict(stats["outcomes"]),
+                    "exceptions": dict(stats["exceptions"]),
+                }
+                for action, stats in self._data.items()
+            }
+
+    def export(self):
+        """Returns the action executions in the Prometheus text exposition format"""
+        prefix = "djangocms_form_builder_action"
+        data = sorted(self.snapshot().items())
+        lines = [
+            f"# HELP {prefix}_executions_total Form action executions by outcome.",
+            f"# TYPE {prefix}_executions_total counter",
+        ]
+        for action, stats in data:
+            for outcome, count in stats["outcomes"].items():
+                lines.append(
+                    f'{prefix}_executions_total{{action="{action}",outcome="{outcome}"}} {count}'
+                )
+        lines += [
+            f"# HELP {prefix}_duration_seconds_max Slowest execution of a form action.",
+            f"# TYPE {prefix}_duration_seconds_max gauge",
+        ]
+        for action, stats in data:
+            lines.append(
+                f'{prefix}_duration_seconds_max{{action="{action}"}} {stats["max_duration"]:.6f}'
+            )
+        return "\n".join(lines) + "\n"
+
+
+action_stats = ActionStats()
+
+
+def get_action_stats():
+    """Returns the aggregated execution statistics per form action, e.g.,
+    ``{"SendMailAction": {"count": 2, "mean_duration": 0.8, "max_duration": 1.1,
+    "total_duration": 1.6, "outcomes": {"success": 1, "failure": 1, "error": 0},
+    "exceptions": {}}}``"""
+    return action_stats.snapshot()
+
+
+SINKS = {
+    "logging": log_stage,
+    "metrics": metrics,
+}
+
+
+def connect_sinks(sinks):
+    for sink in sinks:
+        stage_finished.connect(SINKS[sink], dispatch_uid=f"form_builder_{sink}")
+
+
+def disconnect_sinks(sinks):
+    for sink in sinks:
+        stage_finished.disconnect(SINKS[sink], dispatch_uid=f"form_builder_{sink}")
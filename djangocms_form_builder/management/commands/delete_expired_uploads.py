@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from djangocms_form_builder import uploads
+
+
+class Command(BaseCommand):
+    help = "Deletes resumable uploads abandoned before the form was submitted."
+
+    def handle(self, *args, **options):
+        deleted = uploads.delete_expired_uploads()
+        self.stdout.write(f"Deleted {deleted} expired upload(s).")
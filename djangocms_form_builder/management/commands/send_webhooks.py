@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from djangocms_form_builder import webhooks
+
+
+class Command(BaseCommand):
+    help = "Sends pending and retried webhook deliveries of form submissions."
+
+    def handle(self, *args, **options):
+        delivered = webhooks.send_pending()
+        self.stdout.write(f"Delivered {delivered} submission(s).")
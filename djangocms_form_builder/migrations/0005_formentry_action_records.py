@@ -0,0 +1,22 @@
+# Generated by Django 5.2.12 on 2026-10-19 02:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("djangocms_form_builder", "0004_alter_form_captcha_requirement_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="formentry",
+            name="action_records",
+            field=models.JSONField(
+                blank=True,
+                default=list,
+                help_text="Duration and outcome of the form actions run upon submission.",
+                verbose_name="Action records",
+            ),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("djangocms_form_builder", "0006_webhookdelivery"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="formentry",
+            index=models.Index(
+                fields=["form_name", "form_user", "-id"],
+                name="form_builder_entry_latest",
+            ),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:07
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("djangocms_form_builder", "0007_formentry_latest_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="formentry",
+            name="unique_user",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                help_text="Set for entries of unique forms. A user has at most one entry per form.",
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+    ]
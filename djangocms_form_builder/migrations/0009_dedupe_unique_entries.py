@@ -0,0 +1,51 @@
+from django.db import migrations, transaction
+from django.db.models import F, Max
+
+CHUNK_SIZE = 500
+
+
+def dedupe_unique_entries(apps, schema_editor):
+    """Keeps only the latest entry per user of unique forms and marks it as the
+    user's unique entry. Runs in chunks of users to keep transactions short."""
+    Form = apps.get_model("djangocms_form_builder", "Form")
+    FormEntry = apps.get_model("djangocms_form_builder", "FormEntry")
+    db = schema_editor.connection.alias
+
+    form_names = (
+        Form.objects.using(db)
+        .filter(form_unique=True, form_login_required=True)
+        .exclude(form_name="")
+        .values_list("form_name", flat=True)
+        .distinct()
+    )
+    for form_name in form_names:
+        entries = FormEntry.objects.using(db).filter(
+            form_name=form_name, form_user__isnull=False, unique_user__isnull=True
+        )
+        latest = list(
+            entries.values("form_user")
+            .annotate(latest=Max("pk"))
+            .order_by("form_user")
+            .values_list("form_user", "latest")
+        )
+        for start in range(0, len(latest), CHUNK_SIZE):
+            chunk = latest[start : start + CHUNK_SIZE]
+            users = [user for user, _ in chunk]
+            keep = [pk for _, pk in chunk]
+            with transaction.atomic(using=db):
+                entries.filter(form_user__in=users).exclude(pk__in=keep).delete()
+                FormEntry.objects.using(db).filter(pk__in=keep).update(
+                    unique_user=F("form_user")
+                )
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("djangocms_form_builder", "0008_formentry_unique_user"),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_unique_entries, migrations.RunPython.noop),
+    ]
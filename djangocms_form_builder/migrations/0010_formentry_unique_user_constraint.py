@@ -0,0 +1,17 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("djangocms_form_builder", "0009_dedupe_unique_entries"),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name="formentry",
+            constraint=models.UniqueConstraint(
+                fields=("form_name", "unique_user"),
+                name="form_builder_entry_unique_user",
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:05
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("djangocms_form_builder", "0010_formentry_unique_user_constraint"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FileField",
+            fields=[],
+            options={
+                "verbose_name": "File field",
+                "proxy": True,
+                "indexes": [],
+                "constraints": [],
+            },
+            bases=("djangocms_form_builder.formfield",),
+        ),
+    ]
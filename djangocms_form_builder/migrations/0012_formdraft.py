@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("djangocms_form_builder", "0011_filefield"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="form",
+            name="form_drafts",
+            field=models.BooleanField(
+                default=False,
+                help_text="Saves the entered values while the form is filled in and restores them when the user returns before submitting.",
+                verbose_name="Save drafts",
+            ),
+        ),
+        migrations.CreateModel(
+            name="FormDraft",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("form_name", models.SlugField(verbose_name="Form")),
+                (
+                    "owner",
+                    models.CharField(
+                        help_text='"user:<pk>" or "session:<session key>"',
+                        max_length=64,
+                        verbose_name="Owner",
+                    ),
+                ),
+                ("draft_data", models.JSONField(blank=True, default=dict)),
+                ("draft_updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Form draft",
+                "verbose_name_plural": "Form drafts",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("form_name", "owner"), name="form_builder_draft_owner"
+                    )
+                ],
+            },
+        ),
+    ]
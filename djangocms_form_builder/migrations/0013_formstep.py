@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:20
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("djangocms_form_builder", "0012_formdraft"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FormStep",
+            fields=[],
+            options={
+                "verbose_name": "Form step",
+                "proxy": True,
+                "indexes": [],
+                "constraints": [],
+            },
+            bases=("djangocms_form_builder.formfield",),
+        ),
+    ]
@@ -1,17 +1,23 @@
 import decimal
+import hashlib
+import json
 
 from cms.models import CMSPlugin
 from django import forms
+from django.core.exceptions import ValidationError
 from django.core.serializers.json import DjangoJSONEncoder
 from django.core.validators import validate_slug
 from django.db import models
 from django.forms.widgets import Input
+from django.template.defaultfilters import filesizeformat
+from django.urls import reverse
 from django.utils.html import conditional_escape, mark_safe
-from django.utils.translation import gettext
+from django.utils.translation import gettext, ngettext_lazy
 from django.utils.translation import gettext_lazy as _
 
-from . import recaptcha, settings
-from .entry_model import FormEntry  # NoQA
+from . import recaptcha, settings, uploads
+from .choices import get_choice_index, get_choice_provider
+from .entry_model import FormDraft, FormEntry, WebhookDelivery  # NoQA
 from .fields import AttributesField
 from .helpers import coerce_decimal, mark_safe_lazy
 
@@ -51,6 +57,14 @@ class Form(CMSPlugin):
         default=False,
         help_text=_('Requires "Login required" to be checked to work.'),
     )
+    form_drafts = models.BooleanField(
+        verbose_name=_("Save drafts"),
+        default=False,
+        help_text=_(
+            "Saves the entered values while the form is filled in and restores them "
+            "when the user returns before submitting."
+        ),
+    )
     form_floating_labels = models.BooleanField(
         verbose_name=_("Floating labels"),
         default=False,
@@ -190,6 +204,18 @@ class FormField(CMSPlugin):
             )
         return self
 
+    def get_condition(self):
+        """Returns the rule showing or requiring the field depending on the value of
+        another field (see ``conditions``) or ``None``"""
+        if not self.config.get("field_condition"):
+            return None
+        return {
+            "field": self.config["field_condition"],
+            "operator": self.config.get("field_condition_operator") or "equals",
+            "value": self.config.get("field_condition_value", ""),
+            "effect": self.config.get("field_condition_effect") or "show",
+        }
+
     def get_short_description(self):
         label = self.config.get("field_label", "")
         return f"{label} ({self.config.get('field_name')})"
@@ -397,17 +423,42 @@ class Select(FormField):
     _choices = None
     no_selection = [("", _("No selection"))]
 
+    def get_choice_provider(self):
+        """Returns the registered choice provider if the select does not use its
+        choice plugins"""
+        source = self.config.get("field_choices_source")
+        return get_choice_provider(source) if source else None
+
     def get_choices(self):
         if self._choices is None:
-            descendants = self.get_children().order_by("position")
-            self._choices = []
-            for child in descendants:
-                instance = child.djangocms_form_builder_formfield
-                self._choices.append(
-                    (instance.config["value"], instance.config["verbose"])
-                )
+            provider = self.get_choice_provider()
+            if provider is not None:
+                self._choices = provider.get_cached_choices()
+            elif "_choices" in self.config:  # Materialized by update_choices
+                self._choices = [tuple(choice) for choice in self.config["_choices"]]
+            else:
+                self._choices = self.get_child_choices()
         return self._choices
 
+    def get_child_choices(self):
+        """Reads the choices from the child plugins which are the editing source"""
+        return [
+            (child.config["value"], child.config["verbose"])
+            for child in FormField.objects.filter(parent_id=self.pk).order_by(
+                "position"
+            )
+        ]
+
+    def update_choices(self):
+        """Materializes the ordered choices in the config, so building the form field
+        does not need to query the child plugins. Call after changing choices."""
+        self._choices = self.get_child_choices()
+        self.config["_choices"] = self._choices
+        self.config["_choices_version"] = hashlib.sha1(
+            json.dumps(self._choices).encode("utf-8")
+        ).hexdigest()[:16]
+        FormField.objects.filter(pk=self.pk).update(config=self.config)
+
     def get_form_field(self):
         multiple_choice = self.config.get("field_select", "") in (
             "multiselect",
@@ -415,6 +466,20 @@ class Select(FormField):
         )
         field = forms.MultipleChoiceField if multiple_choice else forms.ChoiceField
         required = self.config.get("field_required", False)
+        if self.config.get("field_select", "") == "remote":
+            return self.field_name, RemoteChoiceField(
+                label=self.config.get("field_label", ""),
+                required=required,
+                help_text=self.config.get("field_help_text", ""),
+                index=get_choice_index(self),
+                widget=RemoteSelect(
+                    url=reverse(
+                        "form_builder:ajaxview",
+                        kwargs={"instance_id": self.pk, "parameter": "choices"},
+                    ),
+                    empty_choices=[] if required else self.no_selection,
+                ),
+            )
         choices = self.get_choices()
         if not required and not multiple_choice:
             choices = self.no_selection + choices
@@ -437,6 +502,46 @@ class Select(FormField):
         )
 
 
+class RemoteSelect(forms.Select):
+    """Drop down which only renders the selected option. Further options are
+    searched and loaded page by page from the url given in ``data-remote-url``."""
+
+    index = None
+
+    def __init__(self, url, empty_choices=(), attrs=None):
+        super().__init__(
+            attrs={
+                "data-remote-url": url,
+                "data-page-size": settings.REMOTE_CHOICES_PAGE_SIZE,
+                "data-search-placeholder": _("Search"),
+                "data-more-label": _("More choices"),
+                **(attrs or {}),
+            }
+        )
+        self.empty_choices = list(empty_choices)
+
+    def optgroups(self, name, value, attrs=None):
+        self.choices = self.empty_choices + [
+            (item, self.index.get_label(item)) for item in value if item in self.index
+        ]
+        return super().optgroups(name, value, attrs)
+
+
+class RemoteChoiceField(forms.ChoiceField):
+    """Choice field validating the membership of the value in a ``ChoiceIndex``
+    instead of a list of choices"""
+
+    widget = RemoteSelect
+
+    def __init__(self, *, index, **kwargs):
+        super().__init__(**kwargs)
+        self.index = index
+        self.widget.index = index
+
+    def valid_value(self, value):
+        return value in self.index
+
+
 class Choice(FormField):
     class Meta:
         proxy = True
@@ -466,6 +571,151 @@ class BooleanField(FormField):
         )
 
 
+class MultipleFileInput(forms.FileInput):
+    allow_multiple_selected = True
+
+
+class ResumableFileInput(forms.FileInput):
+    """File input whose files ``ajax_form.js`` uploads in chunks before submitting
+    the form, which then only posts the upload ids (see ``uploads.ChunkedUpload``)"""
+
+    def __init__(self, attrs=None, multiple=False):
+        self.allow_multiple_selected = multiple
+        super().__init__(
+            {**(attrs or {}), "data-chunk-size": settings.UPLOAD_CHUNK_SIZE}
+        )
+
+    def value_from_datadict(self, data, files, name):
+        value = super().value_from_datadict(data, files, name)
+        upload_ids = data.getlist(name) if hasattr(data, "getlist") else []
+        if not upload_ids:
+            return value
+        value = value if isinstance(value, list) else [value] if value else []
+        return value + uploads.get_uploaded_files(upload_ids, name)
+
+
+class UploadField(forms.FileField):
+    """File field accepting up to ``max_files`` files of at most ``max_size`` bytes
+    each. If given, the files' names or content types have to match one of the
+    ``accept`` patterns (as in the HTML attribute, e.g., ``.pdf,image/*``)."""
+
+    default_error_messages = {
+        "max_files": ngettext_lazy(
+            "Please upload at most %(max)d file.",
+            "Please upload at most %(max)d files.",
+            "max",
+        ),
+        "max_size": _("%(name)s is larger than %(max)s."),
+        "file_type": _("%(name)s is not of an accepted file type."),
+        "upload_expired": _("The upload has expired. Please select the file again."),
+    }
+
+    def __init__(
+        self, *, accept="", max_size=None, max_files=1, resumable=False, **kwargs
+    ):
+        self.accept = [
+            pattern.strip().lower() for pattern in accept.split(",") if pattern.strip()
+        ]
+        self.max_size = max_size
+        self.max_files = max_files
+        attrs = {"accept": ",".join(self.accept)} if self.accept else {}
+        if "widget" not in kwargs:
+            if resumable:
+                kwargs["widget"] = ResumableFileInput(attrs, multiple=max_files > 1)
+            elif max_files == 1:
+                kwargs["widget"] = forms.FileInput(attrs)
+            else:
+                kwargs["widget"] = MultipleFileInput(attrs)
+        super().__init__(**kwargs)
+
+    def accepts(self, file):
+        if not self.accept:
+            return True
+        name = file.name.lower()
+        content_type = (getattr(file, "content_type", None) or "").lower()
+        for pattern in self.accept:
+            if pattern.startswith("."):
+                if name.endswith(pattern):
+                    return True
+            elif pattern.endswith("/*"):
+                if content_type.startswith(pattern[:-1]):
+                    return True
+            elif content_type == pattern:
+                return True
+        return False
+
+    def clean(self, data, initial=None):
+        files = (
+            list(data) if isinstance(data, (list, tuple)) else [data] if data else []
+        )
+        if not files:
+            value = super().clean(None, initial)
+            return value if self.max_files == 1 else []
+        if len(files) > self.max_files:
+            raise ValidationError(
+                self.error_messages["max_files"],
+                code="max_files",
+                params={"max": self.max_files},
+            )
+        if any(isinstance(file, str) for file in files):  # Unknown upload id
+            raise ValidationError(
+                self.error_messages["upload_expired"], code="upload_expired"
+            )
+        clean_file = super().clean
+        files = [clean_file(file, initial) for file in files]
+        errors = []
+        for file in files:
+            if self.max_size is not None and file.size > self.max_size:
+                errors.append(
+                    ValidationError(
+                        self.error_messages["max_size"],
+                        code="max_size",
+                        params={
+                            "name": file.name,
+                            "max": filesizeformat(self.max_size),
+                        },
+                    )
+                )
+            if not self.accepts(file):
+                errors.append(
+                    ValidationError(
+                        self.error_messages["file_type"],
+                        code="file_type",
+                        params={"name": file.name},
+                    )
+                )
+        if errors:
+            raise ValidationError(errors)
+        return files[0] if self.max_files == 1 else files
+
+
+class FileField(FormField):
+    class Meta:
+        proxy = True
+        verbose_name = _("File field")
+
+    def get_form_field(self):
+        max_size = self.config.get("field_max_size", None)
+        return self.field_name, UploadField(
+            label=self.config.get("field_label", ""),
+            required=self.config.get("field_required", False),
+            help_text=self.config.get("field_help_text", ""),
+            accept=self.config.get("field_accept", "") or "",
+            max_size=max_size * 1024 * 1024 if max_size else None,
+            max_files=self.config.get("field_max_files", None) or 1,
+            resumable=self.config.get("field_resumable", False),
+        )
+
+
+class FormStep(FormField):
+    class Meta:
+        proxy = True
+        verbose_name = _("Form step")
+
+    def get_short_description(self):
+        return self.config.get("step_title", "")
+
+
 class FormSubmitButton(forms.Field):
     widget = Input(attrs=dict(type="submit"))
 
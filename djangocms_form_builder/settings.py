@@ -17,6 +17,85 @@ MAIL_TEMPLATE_SETS = getattr(
     django_settings, "DJANGOCMS_MAIL_TEMPLATE_SETS", (("default", _("Default")),)
 )
 
+INSTRUMENTATION = getattr(
+    django_settings, "DJANGOCMS_FORM_BUILDER_INSTRUMENTATION", ()
+)  # Any of "logging", "metrics"
+METRICS_TOKEN = getattr(django_settings, "DJANGOCMS_FORM_BUILDER_METRICS_TOKEN", None)
+ACTION_WORKERS = getattr(
+    django_settings, "DJANGOCMS_FORM_BUILDER_ACTION_WORKERS", 4
+)  # Threads for independent actions, 1 runs all actions in the request thread
+PERSIST_ACTION_RECORDS = getattr(
+    django_settings, "DJANGOCMS_FORM_BUILDER_PERSIST_ACTION_RECORDS", False
+)
+WEBHOOK_TIMEOUT = getattr(
+    django_settings, "DJANGOCMS_FORM_BUILDER_WEBHOOK_TIMEOUT", 5
+)  # Seconds for connecting and each read
+WEBHOOK_POOL_SIZE = getattr(
+    django_settings, "DJANGOCMS_FORM_BUILDER_WEBHOOK_POOL_SIZE", 4
+)
+WEBHOOK_BATCH_SIZE = getattr(
+    django_settings, "DJANGOCMS_FORM_BUILDER_WEBHOOK_BATCH_SIZE", 100
+)
+WEBHOOK_MAX_ATTEMPTS = getattr(
+    django_settings, "DJANGOCMS_FORM_BUILDER_WEBHOOK_MAX_ATTEMPTS", 10
+)
+WEBHOOK_BACKOFF = getattr(
+    django_settings, "DJANGOCMS_FORM_BUILDER_WEBHOOK_BACKOFF", 30
+)  # Seconds before the first retry, doubled for each further retry
+WEBHOOK_MAX_BACKOFF = getattr(
+    django_settings, "DJANGOCMS_FORM_BUILDER_WEBHOOK_MAX_BACKOFF", 6 * 3600
+)
+REMOTE_CHOICES_PAGE_SIZE = getattr(
+    django_settings, "DJANGOCMS_FORM_BUILDER_REMOTE_CHOICES_PAGE_SIZE", 50
+)
+CHOICES_CACHE = getattr(
+    django_settings, "DJANGOCMS_FORM_BUILDER_CHOICES_CACHE", "default"
+)
+CHOICES_CACHE_TIMEOUT = getattr(
+    django_settings, "DJANGOCMS_FORM_BUILDER_CHOICES_CACHE_TIMEOUT", 300
+)
+COMPILED_VALIDATION = getattr(
+    django_settings, "DJANGOCMS_FORM_BUILDER_COMPILED_VALIDATION", True
+)
+RENDER_INVALID_FORM = getattr(
+    django_settings, "DJANGOCMS_FORM_BUILDER_RENDER_INVALID_FORM", False
+)
+CLIENT_VALIDATION = getattr(
+    django_settings, "DJANGOCMS_FORM_BUILDER_CLIENT_VALIDATION", True
+)
+LIVE_VALIDATION = getattr(
+    django_settings, "DJANGOCMS_FORM_BUILDER_LIVE_VALIDATION", False
+)
+MAX_BODY_SIZE = getattr(
+    django_settings, "DJANGOCMS_FORM_BUILDER_MAX_BODY_SIZE", 10 * 1024 * 1024
+)  # Bytes, None for no limit
+UPLOAD_STORAGE = getattr(
+    django_settings, "DJANGOCMS_FORM_BUILDER_UPLOAD_STORAGE", "default"
+)  # Alias in STORAGES
+UPLOAD_TO = getattr(
+    django_settings, "DJANGOCMS_FORM_BUILDER_UPLOAD_TO", "form_builder/%Y/%m"
+)  # strftime formatted directory in the upload storage
+MAIL_ATTACHMENTS_MAX_SIZE = getattr(
+    django_settings,
+    "DJANGOCMS_FORM_BUILDER_MAIL_ATTACHMENTS_MAX_SIZE",
+    10 * 1024 * 1024,
+)  # Bytes of uploads attached to a mail, larger uploads are only listed
+UPLOAD_CHUNK_SIZE = getattr(
+    django_settings, "DJANGOCMS_FORM_BUILDER_UPLOAD_CHUNK_SIZE", 1024 * 1024
+)  # Bytes per chunk of resumable uploads, below MAX_BODY_SIZE
+UPLOAD_TEMP_DIR = getattr(
+    django_settings, "DJANGOCMS_FORM_BUILDER_UPLOAD_TEMP_DIR", None
+)  # Local directory assembling resumable uploads, None for the temp directory
+UPLOAD_EXPIRY = getattr(
+    django_settings, "DJANGOCMS_FORM_BUILDER_UPLOAD_EXPIRY", 24 * 3600
+)  # Seconds after which inactive resumable uploads are abandoned
+UPLOAD_MAX_OPEN = getattr(
+    django_settings, "DJANGOCMS_FORM_BUILDER_UPLOAD_MAX_OPEN", 20
+)  # Resumable uploads a client (IP address) may have open, None for no limit
+STEP_TOKEN_MAX_AGE = getattr(
+    django_settings, "DJANGOCMS_FORM_BUILDER_STEP_TOKEN_MAX_AGE", 24 * 3600
+)  # Seconds for which the progress of a multi-step form is kept
+
 framework = getattr(django_settings, "DJANGOCMS_FRONTEND_FRAMEWORK", "bootstrap5")
 theme = getattr(django_settings, "DJANGOCMS_FRONTEND_THEME", "djangocms_frontend")
 
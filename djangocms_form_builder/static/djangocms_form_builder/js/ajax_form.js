@@ -15,7 +15,182 @@ function resetAltchaWidget(container) {
     }
 }
 
+function getConditionState(form) {
+    // Evaluates the conditions rendered with the form (see
+    // conditions.Conditions.get_client_rules) as the server does: a hidden field
+    // counts as empty for the fields depending on it.
+    const state = {hidden: new Set(), required: new Set()};
+    const script = form.dataset.conditions && document.getElementById(form.dataset.conditions);
+    if (!script) {
+        return state;
+    }
+    const rules = JSON.parse(script.textContent);
+    const data = new FormData(form);
+    const operators = {
+        equals: (values, value) => values.includes(value),
+        not_equals: (values, value) => !values.includes(value),
+        empty: (values) => values.length === 0,
+        not_empty: (values) => values.length > 0,
+    };
+    const holds = (key, stack) => {
+        const rule = rules[key];
+        const values = !visible(rule.source, stack) ? [] : data.getAll(rule.field).map(
+            (value) => typeof value === 'string' ? value : value.name
+        ).filter((value) => value !== '');
+        return operators[rule.operator](values, rule.value);
+    };
+    const visible = (key, stack) => {
+        if (stack.has(key) || !rules[key] || rules[key].effect !== 'show') {
+            return true;  // Cycles are ignored
+        }
+        return holds(key, new Set([...stack, key]));
+    };
+    for (const [key, rule] of Object.entries(rules)) {
+        if (!visible(key, new Set())) {
+            state.hidden.add(key);
+        } else if (rule.effect === 'require' && holds(key, new Set([key]))) {
+            state.required.add(key);
+        }
+    }
+    return state;
+}
+
+function applyConditions(form) {
+    // Hides the fields whose "show" condition does not hold and marks the fields
+    // required by a condition
+    const state = getConditionState(form);
+    for (const wrapper of form.querySelectorAll('[data-condition]')) {
+        const key = wrapper.dataset.condition;
+        if (wrapper.dataset.required === undefined) {
+            wrapper.dataset.required = wrapper.classList.contains('required');
+        }
+        wrapper.classList.toggle('d-none', state.hidden.has(key));
+        wrapper.classList.toggle(
+            'required', state.required.has(key) || wrapper.dataset.required === 'true'
+        );
+    }
+}
+
+function getValidationErrors(form) {
+    // Checks the form against the validation schema rendered with it (see
+    // validation.get_client_schema). Lenient where in doubt: the server validates
+    // every submission anyway. Fields hidden by a condition are not checked.
+    const script = form.dataset.validation && document.getElementById(form.dataset.validation);
+    if (!script) {
+        return {};
+    }
+    const schema = JSON.parse(script.textContent);
+    const conditions = getConditionState(form);
+    const data = new FormData(form);
+    const numeric = ['integer', 'decimal', 'number'];
+    const errors = {};
+    for (const [key, rule] of Object.entries(schema)) {
+        if (conditions.hidden.has(key)) {
+            continue;
+        }
+        const required = rule.required || conditions.required.has(key);
+        const messages = [];
+        const error = (name, value) => {
+            messages.push((rule.messages[name] || '').replace('{value}', value));
+        }
+        const values = data.getAll(rule.name).map(
+            (value) => typeof value === 'string' ? value.trim() : value.name
+        ).filter((value) => value !== '');
+        if (values.length === 0) {
+            if (required) {
+                error('required', '');
+            }
+        } else {
+            for (const value of values) {
+                if (rule.choices && !rule.choices.includes(value)) {
+                    error('invalid_choice', value);
+                }
+                if (rule.type === 'email' && !/^[^\s@]+@[^\s@]+$/.test(value)) {
+                    error('invalid', value);
+                } else if (rule.type === 'integer' && !/^[+-]?\d+(\.0*)?$/.test(value)) {
+                    error('invalid', value);
+                } else if (numeric.includes(rule.type) && !/^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$/.test(value)) {
+                    error('invalid', value);
+                } else if (numeric.includes(rule.type)) {
+                    if ('min_value' in rule && Number(value) < rule.min_value) {
+                        error('min_value', value);
+                    }
+                    if ('max_value' in rule && Number(value) > rule.max_value) {
+                        error('max_value', value);
+                    }
+                    if (!/[eE]/.test(value)) {  // Leave exponents to the server
+                        const [whole, fraction = ''] = value.replace(/^[+-]/, '').split('.');
+                        const decimals = fraction.length;
+                        const digits = whole.replace(/^0+/, '').length + decimals;
+                        if ('max_digits' in rule && digits > rule.max_digits) {
+                            error('max_digits', value);
+                        } else if ('decimal_places' in rule && decimals > rule.decimal_places) {
+                            error('max_decimal_places', value);
+                        } else if ('max_digits' in rule && 'decimal_places' in rule &&
+                                digits - decimals > rule.max_digits - rule.decimal_places) {
+                            error('max_whole_digits', value);
+                        }
+                    }
+                }
+                const length = [...value].length;
+                if ('min_length' in rule && length < rule.min_length) {
+                    error('min_length', length);
+                }
+                if ('max_length' in rule && length > rule.max_length) {
+                    error('max_length', length);
+                }
+            }
+        }
+        if (rule.type === 'file') {
+            const files = data.getAll(rule.name).filter(
+                (file) => typeof file !== 'string' && file.name
+            );
+            if ('max_files' in rule && files.length > rule.max_files) {
+                error('max_files', files.length);
+            }
+            for (const file of files) {
+                if ('max_size' in rule && file.size > rule.max_size) {
+                    error('max_size', file.name);
+                }
+            }
+        }
+        if (messages.length > 0) {
+            errors[key] = messages;
+        }
+    }
+    return errors;
+}
+
 function djangocms_form_builder_form(form) {
+    const getSteps = (node) => Array.from(node.querySelectorAll('.form-step'));
+
+    const inStep = (node, element) => {
+        // Whether a form element belongs to the current step of a multi-step form.
+        // Elements outside of the steps belong to the last step.
+        if (!node.dataset.steps) {
+            return true;
+        }
+        const steps = getSteps(node);
+        const step = element.closest('.form-step');
+        return step ? step === steps[node.currentStep] : node.currentStep === steps.length - 1;
+    }
+
+    const showStep = (node, number) => {
+        const steps = getSteps(node);
+        node.currentStep = Math.max(0, Math.min(number, steps.length - 1));
+        steps.forEach((step, index) => step.classList.toggle('d-none', index !== node.currentStep));
+        const last = node.currentStep === steps.length - 1;
+        for (const button of node.querySelectorAll('input[type="submit"]')) {
+            if (!button.closest('.form-step')) {
+                button.dataset.label = button.dataset.label || button.value;
+                button.value = last ? button.dataset.label : (node.dataset.nextLabel || button.dataset.label);
+            }
+        }
+        if (node.backButton) {
+            node.backButton.classList.toggle('d-none', node.currentStep === 0);
+        }
+    }
+
     const feedback = (node, data) => {
         if (data.result === 'success') {
             const range = document.createRange();
@@ -49,7 +224,9 @@ function djangocms_form_builder_form(form) {
                 target.appendChild(fragment);
             }
         } else if (data.result === 'invalid form') {
-            resetAltchaWidget(node);
+            if (!data.client) {
+                resetAltchaWidget(node);
+            }
             for (let invalid of node.getElementsByClassName('all-invalid')) {
                 invalid.classList.add('d-none');
                 let li = invalid.getElementsByTagName('li');
@@ -89,6 +266,15 @@ function djangocms_form_builder_form(form) {
                 }
             }
             node.classList.add('was-validated');
+        } else if (data.result === 'step') {
+            // Next step of a multi-step form: the token carries the values so far
+            node.stepToken = data.token;
+            let invalid = node.getElementsByClassName('invalid-feedback');
+            while (invalid !== undefined && invalid.length > 0) {
+                invalid[0].remove();
+            }
+            node.classList.remove('was-validated');
+            showStep(node, data.step);
         } else if (data.result === 'error') {
             resetAltchaWidget(node);
             alert(data.errors[0]);
@@ -111,26 +297,51 @@ function djangocms_form_builder_form(form) {
           .catch(() => null);
     }
 
-    const submitForm = (node, headers) => {
-        return fetch(node.getAttribute('action'),{
+    const getBody = (node, uploaded = {}) => {
+        // Files need a multipart body, other forms are sent url-encoded. Files
+        // uploaded in chunks before are replaced by their upload ids.
+        const data = new FormData(node);
+        for (const [name, ids] of Object.entries(uploaded)) {
+            data.delete(name);
+            ids.forEach((id) => data.append(name, id));
+        }
+        if (node.dataset.steps) {  // Only the fields of the current step
+            const names = new Set(Array.from(node.elements).filter(
+                (element) => element.name && inStep(node, element)
+            ).map((element) => element.name));
+            names.add('csrfmiddlewaretoken');
+            for (const name of new Set(data.keys())) {
+                if (!names.has(name)) {
+                    data.delete(name);
+                }
+            }
+            data.set('form_step_token', node.stepToken || '');
+        }
+        return node.enctype === 'multipart/form-data' ? data : new URLSearchParams(data);
+    }
+
+    const submitForm = (node, headers, uploaded) => {
+        const url = node.getAttribute('action') + (node.dataset.steps ? '/step=' + node.currentStep : '');
+        return fetch(url, {
             method: 'POST',
             headers: headers,
-            body: new URLSearchParams(new FormData(node)),
+            body: getBody(node, uploaded),
         }).then((response) => {
             return response.json();
         }).then((data) => {
             feedback(node, data);
+            return data;
         }).catch((json) => {
             console.error(json);
             alert(getErrorMessage());
         });
     }
 
-    const post_ajax = (node) => {
+    const csrfHeaders = (node) => {
         // If the form already carries an inline csrfmiddlewaretoken (rendered when
         // CSRF_COOKIE_HTTPONLY is on), submit as-is - the token rides in the body.
         if (node.querySelector('input[name="csrfmiddlewaretoken"]')) {
-            return submitForm(node, {});
+            return Promise.resolve({});
         }
         // Otherwise fetch the token from the JSON GET endpoint and send it as a
         // header. Cache it on the form node so subsequent submits skip the GET.
@@ -140,11 +351,215 @@ function djangocms_form_builder_form(form) {
                 form.csrfToken = token;
                 return token;
             });
-        tokenPromise.then((csrfToken) => {
-            return submitForm(node, csrfToken ? { 'X-CSRFToken': csrfToken } : {});
+        return tokenPromise.then((csrfToken) => csrfToken ? { 'X-CSRFToken': csrfToken } : {});
+    }
+
+    const uploadFile = (node, input, file, headers) => {
+        // Resumable upload: the file is sent in chunks (see AjaxFormMixin.upload),
+        // the upload id is remembered to only send missing chunks after a failure.
+        const url = node.getAttribute('action') + '/upload=' + encodeURIComponent(input.name);
+        const key = ['djangocms_form_builder', url, file.name, file.size, file.lastModified].join(':');
+        const post = (url, body) => fetch(url, {
+            method: 'POST',
+            headers: {...headers, 'Accept': 'application/json'},
+            body: body,
+        }).then((response) => {
+            if (response.status >= 500) {
+                throw new Error(response.statusText);
+            }
+            return response.json();
+        });
+        const retry = (send, attempt = 0) => send().catch((error) => {
+            if (attempt >= 5) {
+                throw error;
+            }
+            return new Promise((resolve) => setTimeout(resolve, 1000 * 2 ** attempt))
+                .then(() => retry(send, attempt + 1));
+        });
+        const sendChunk = (status, number) => {
+            const data = new FormData();
+            const start = number * status.chunk_size;
+            data.append('chunk', file.slice(start, start + status.chunk_size), file.name);
+            return retry(() => post(url + ',id=' + status.id + ',chunk=' + number, data));
+        }
+        const stored = localStorage.getItem(key);
+        return (stored ? post(url + ',id=' + stored, new URLSearchParams()).catch(() => null) : Promise.resolve(null))
+            .then((status) => (status && status.result === 'upload') ? status : retry(() => post(url, new URLSearchParams({
+                name: file.name, size: file.size, content_type: file.type,
+            }))))
+            .then((status) => {
+                if (status.result !== 'upload') {
+                    return status;  // Not accepted
+                }
+                localStorage.setItem(key, status.id);
+                const missing = [...Array(status.chunks).keys()].filter((number) => !status.received.includes(number));
+                return missing.reduce(
+                    (previous, number) => previous.then(() => sendChunk(status, number)), Promise.resolve(status)
+                ).then((result) => {
+                    if (result.result !== 'upload' || !result.complete) {
+                        throw new Error(result.errors ? result.errors[0] : 'Upload incomplete');
+                    }
+                    return {...result, key: key};
+                });
+            });
+    }
+
+    const uploadFiles = (node, headers) => {
+        // Returns the upload ids by field name or null if a file is not accepted
+        const inputs = Array.from(node.querySelectorAll('input[type="file"][data-chunk-size]'))
+            .filter((input) => input.files.length > 0 && inStep(node, input));
+        const uploaded = {};
+        const errors = {};
+        return inputs.reduce((previous, input) => previous.then(() => Array.from(input.files).reduce(
+            (next, file) => next.then(() => uploadFile(node, input, file, headers).then((status) => {
+                if (status.result === 'upload') {
+                    (uploaded[input.name] = uploaded[input.name] || []).push(status);
+                } else {
+                    Object.assign(errors, status.field_errors);
+                }
+            })), Promise.resolve()
+        )), Promise.resolve()).then(() => {
+            if (Object.keys(errors).length > 0) {
+                feedback(node, {result: 'invalid form', field_errors: errors, client: true});
+                return null;
+            }
+            return uploaded;
         });
     }
 
+    const post_ajax = (node) => {
+        clearTimeout(node.draftTimer);  // The submission replaces the draft
+        return csrfHeaders(node).then((headers) => uploadFiles(node, headers).then((uploaded) => {
+            if (uploaded === null) {
+                return;
+            }
+            const ids = Object.fromEntries(Object.entries(uploaded).map(
+                ([name, statuses]) => [name, statuses.map((status) => status.id)]
+            ));
+            return submitForm(node, headers, ids).then((data) => {
+                if (data && data.result !== 'invalid form' && data.result !== 'error') {
+                    // Stored with the submission
+                    for (const statuses of Object.values(uploaded)) {
+                        statuses.forEach((status) => localStorage.removeItem(status.key));
+                    }
+                }
+            });
+        })).catch((error) => {
+            console.error(error);
+            alert(getErrorMessage());
+        });
+    }
+
+    const validateField = (node, field) => {
+        // Live validation: the server only validates the changed field
+        const url = node.getAttribute('action') + '/validate=' + encodeURIComponent(field.name);
+        return csrfHeaders(node).then((headers) => fetch(url, {
+            method: 'POST',
+            headers: {...headers, 'Accept': 'application/json'},
+            body: new URLSearchParams(new FormData(node)),  // Without files
+        })).then((response) => response.ok ? response.json() : null)
+          .then((data) => {
+            if (!data) {
+                return;
+            }
+            for (const key of data.fields) {
+                const target = document.getElementById(key);
+                if (!target) {
+                    continue;
+                }
+                while (target.nextElementSibling &&
+                        target.nextElementSibling.classList.contains('invalid-feedback')) {
+                    target.nextElementSibling.remove();
+                }
+                for (const err of (data.field_errors[key] || []).slice().reverse()) {
+                    const msg = document.createElement('template');
+                    msg.innerHTML = "<div class='invalid-feedback d-block'><strong></strong></div>";
+                    msg.content.querySelector('strong').innerText = err;
+                    target.after(msg.content);
+                }
+            }
+        }).catch((error) => console.error(error));
+    }
+
+    const saveDraft = (node, names) => {
+        // Autosave: only the values of the fields changed since the last patch
+        const url = node.getAttribute('action') + '/draft=' + names.map(encodeURIComponent).join('+');
+        const data = new URLSearchParams();
+        for (const [name, value] of new FormData(node)) {
+            if (names.includes(name) && typeof value === 'string') {
+                data.append(name, value);
+            }
+        }
+        return csrfHeaders(node).then((headers) => fetch(url, {
+            method: 'POST',
+            headers: {...headers, 'Accept': 'application/json'},
+            body: data,
+        })).catch((error) => console.error(error));
+    }
+
+    const validate = (node) => {
+        const errors = Object.fromEntries(Object.entries(getValidationErrors(node)).filter(
+            ([key, messages]) => !document.getElementById(key) || inStep(node, document.getElementById(key))
+        ));
+        if (Object.keys(errors).length > 0) {
+            feedback(node, {result: 'invalid form', field_errors: errors, client: true});
+            return false;
+        }
+        return true;
+    }
+
+    if (form.dataset.liveValidation && !form.dataset.liveValidationEvent) {
+        form.dataset.liveValidationEvent = true;
+        form.addEventListener('change', (event) => {
+            if (event.target.name && event.target.type !== 'file') {
+                validateField(form, event.target);
+            }
+        });
+    }
+
+    if (form.dataset.conditions && !form.dataset.conditionEvent) {
+        form.dataset.conditionEvent = true;
+        form.addEventListener('input', () => applyConditions(form));
+        form.addEventListener('change', () => applyConditions(form));
+        applyConditions(form);
+    }
+
+    if (form.dataset.steps && !form.backButton) {
+        const back = document.createElement('button');
+        back.type = 'button';
+        back.className = 'btn btn-secondary me-2 d-none';
+        back.innerText = form.dataset.backLabel || 'Back';
+        back.addEventListener('click', () => showStep(form, form.currentStep - 1));
+        const submit = form.querySelector('[type="submit"]');
+        if (submit) {
+            submit.before(back);
+        } else {
+            form.append(back);
+        }
+        form.backButton = back;
+        showStep(form, 0);
+    }
+
+    if (form.dataset.draft && !form.dataset.draftEvent) {
+        form.dataset.draftEvent = true;
+        const changed = new Set();
+        const schedule = (event) => {
+            const name = event.target.name;
+            if (!name || event.target.type === 'file' || name === 'csrfmiddlewaretoken') {
+                return;
+            }
+            changed.add(name);
+            clearTimeout(form.draftTimer);
+            form.draftTimer = setTimeout(() => {
+                const names = [...changed];
+                changed.clear();
+                saveDraft(form, names);
+            }, 1000);
+        };
+        form.addEventListener('input', schedule);
+        form.addEventListener('change', schedule);
+    }
+
     let recaptcha = form.getElementsByClassName('g-recaptcha');
     if (recaptcha.length === 1) {
             let submitButton = form.querySelector('input[type="submit"]');
@@ -164,7 +579,9 @@ function djangocms_form_builder_form(form) {
                         form.dataset.submitEvent = true;
                         form.addEventListener('submit', (event) => {
                             event.preventDefault();
-                            grecaptcha.execute(gid);
+                            if (validate(form)) {
+                                grecaptcha.execute(gid);
+                            }
                         });
                     }
                 }
@@ -174,12 +591,68 @@ function djangocms_form_builder_form(form) {
                 form.dataset.submitEvent = true;
                 form.addEventListener('submit', (event) => {
                     event.preventDefault();
-                    post_ajax(form);
+                    if (validate(form)) {
+                        post_ajax(form);
+                    }
                 });
             }
 
 }
 
+function djangocms_form_builder_remote_select(select) {
+    // Searchable drop down: only the selected option is rendered, further options
+    // are loaded page by page from the select's data-remote-url
+    const search = document.createElement('input');
+    search.type = 'search';
+    search.className = 'form-control form-control-sm mb-1';
+    search.placeholder = select.dataset.searchPlaceholder || '';
+    search.setAttribute('aria-controls', select.id);
+    const more = document.createElement('button');
+    more.type = 'button';
+    more.className = 'btn btn-link btn-sm d-none';
+    more.innerText = select.dataset.moreLabel || 'More';
+    select.before(search);
+    select.after(more);
+
+    let page = 1;
+    let timer = null;
+    const load = (append) => {
+        const params = new URLSearchParams({q: search.value, page: page});
+        return fetch(select.dataset.remoteUrl + '?' + params, {
+            method: 'GET',
+            headers: { 'Accept': 'application/json' },
+        }).then((response) => response.json())
+          .then((data) => {
+            if (!append) {
+                // Keep the empty and the selected option
+                select.replaceChildren(...Array.from(select.options).filter(
+                    (option) => option.value === '' || option.selected
+                ));
+            }
+            const present = new Set(Array.from(select.options).map((option) => option.value));
+            for (const choice of data.results) {
+                if (!present.has(choice.value)) {
+                    select.add(new Option(choice.label, choice.value));
+                }
+            }
+            more.classList.toggle('d-none', !data.more);
+        }).catch((error) => console.error(error));
+    }
+
+    search.addEventListener('input', () => {
+        clearTimeout(timer);
+        timer = setTimeout(() => {
+            page = 1;
+            load(false);
+        }, 250);
+    });
+    more.addEventListener('click', () => {
+        page += 1;
+        load(true);
+    });
+    select.addEventListener('focus', () => load(true), { once: true });
+}
+
 function reCaptchaOnLoadCallback() {
     window.recaptcha_loaded = true;
 };
@@ -188,4 +661,7 @@ window.addEventListener('load', () => {
     for (let form of document.getElementsByClassName('djangocms-form-builder-ajax-form')) {
         djangocms_form_builder_form(form);
     }
+    for (let select of document.querySelectorAll('.djangocms-form-builder-ajax-form select[data-remote-url]')) {
+        djangocms_form_builder_remote_select(select);
+    }
 });
@@ -0,0 +1,58 @@
+"""
+Multi-step forms.
+
+A form with the option ``steps`` is filled in step by step, each step being one of
+its fieldsets (``Meta.fieldsets``, for forms built from plugins the "Form step"
+plugins). Fields outside of the fieldsets belong to the last step. ``ajax_form.js``
+shows one step at a time and only posts its fields with the parameter ``step=<n>``
+(counting from 0). Only these fields are validated (see
+``AjaxFormMixin.submit_step``). The response carries a signed token with the values
+of all steps validated so far, which the browser posts with the next step. The last
+step merges the token's values with its own and submits the form: all values are
+validated once more and the form's actions run once.
+
+Files posted with a step are not kept in the token. File fields of earlier steps
+should hence be resumable (see ``uploads.ChunkedUpload``), their upload ids are.
+"""
+
+from django.core import signing
+
+from . import settings
+from .helpers import get_option
+
+SALT = "djangocms_form_builder.steps"
+TOKEN_FIELD = "form_step_token"
+
+
+def get_steps(form_class):
+    """Returns the field names of each step of a multi-step form, or an empty list
+    if the form is not split into steps"""
+    if form_class is None or not get_option(form_class, "steps", False):
+        return []
+    fieldsets = getattr(getattr(form_class, "Meta", None), "fieldsets", None) or ()
+    steps = [list(options.get("fields", ())) for title, options in fieldsets]
+    if not steps:
+        return []
+    in_steps = {name for step in steps for name in step}
+    steps[-1] += [name for name in form_class.base_fields if name not in in_steps]
+    return steps
+
+
+def dumps(key, step, values):
+    """Returns the token for the posted values (by HTML name) of the steps before
+    ``step`` of the form identified by ``key``"""
+    return signing.dumps(
+        {"key": key, "step": step, "values": values}, salt=SALT, compress=True
+    )
+
+
+def loads(token, key):
+    """Returns the number of validated steps and their values for a token.
+    Missing, invalid, expired, and foreign tokens yield no values."""
+    try:
+        data = signing.loads(token, salt=SALT, max_age=settings.STEP_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        return 0, {}
+    if not isinstance(data, dict) or data.get("key") != key:
+        return 0, {}
+    return data["step"], data["values"]
@@ -4,8 +4,10 @@ from django.template.loader import render_to_string
 from django.utils.html import mark_safe
 
 from .. import constants, recaptcha
-from ..helpers import get_option
+from ..conditions import get_conditions
+from ..helpers import get_option, get_related_objects
 from ..settings import FORM_TEMPLATE
+from ..steps import get_steps
 
 register = template.Library()
 attr_dict = constants.attr_dict
@@ -28,6 +30,15 @@ else:
             self.form = form
 
 
+@register.simple_tag(takes_context=True)
+def related_objects(context, scope, *field_names):
+    """Resolves the model references in scope (e.g., submitted form data), usage:
+    ``{% related_objects data as objects %}{{ objects.product.name }}``"""
+    return get_related_objects(
+        scope, field_names or None, request=context.get("request", None)
+    )
+
+
 @register.filter
 def add_placeholder(form):
     """Adds placeholder based on a form field's title"""
@@ -107,6 +118,8 @@ def render_widget(form, form_field, **kwargs):
     div_attrs = attrs_for_widget(field.field.widget, "div", field_sep)
     if field.field.required:
         div_attrs["class"] = div_attrs.get("class", "") + " required"
+    if field.name in get_conditions(type(form)).rules:  # Shown or hidden by JS
+        div_attrs["data-condition"] = field.field.widget.attrs.get("id", field.name)
     div_attrs = " ".join([f'{key}="{value}"' for key, value in div_attrs.items()])
     grp_attrs = attrs_for_widget(field.field.widget, "group")
     errors = "".join(
@@ -162,3 +175,9 @@ def get_fieldset(form):
     elif hasattr(form, "Meta") and hasattr(form.Meta, "fieldsets"):
         return form.Meta.fieldsets
     return ((None, {"fields": [field.name for field in form.visible_fields()]}),)
+
+
+@register.filter
+def is_multi_step(form):
+    """Whether the form is shown step by step, one fieldset at a time"""
+    return bool(get_steps(type(form)))
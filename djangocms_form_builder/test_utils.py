@@ -0,0 +1,73 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        pass  # e.g., clients closing the connection after a timeout
+
+
+class WebhookTestServer:
+    """Local HTTP server standing in for a webhook endpoint in tests. It records the
+    JSON bodies posted to it and answers with ``status`` (optionally after
+    ``delay`` seconds)::
+
+        with WebhookTestServer() as server:
+            ...  # Submit a form with a webhook action posting to server.url
+            self.assertEqual(server.requests[0]["data"], {...})
+    """
+
+    def __init__(self, status=200, delay=0):
+        self.status = status
+        self.delay = delay
+        self.requests = []
+        self.connections = set()
+        self._httpd = _HTTPServer(("127.0.0.1", 0), self._get_handler())
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/hook"
+
+    def _get_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-alive
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                server.connections.add(self.client_address)
+                server.requests.append(json.loads(body or "null"))
+                if server.delay:
+                    threading.Event().wait(server.delay)
+                self.send_response(server.status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"{}")
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
@@ -0,0 +1,343 @@
+"""
+Storage of files uploaded with form submissions.
+
+Django's upload handlers stream uploaded files in chunks to memory or, for larger
+files, to a temporary file (see ``FILE_UPLOAD_MAX_MEMORY_SIZE``). Before the actions
+of a valid submission run, the files are saved to the storage
+``DJANGOCMS_FORM_BUILDER_UPLOAD_STORAGE`` (an alias of Django's ``STORAGES``) and
+replaced in the cleaned data by references, i.e., dicts with the keys ``name``,
+``path``, ``size``, and ``content_type``. Form entries hence store references
+rather than the files' content.
+
+Large files can be uploaded in chunks before the form is submitted (resumable
+uploads, see ``AjaxFormMixin.upload``). Each ``ChunkedUpload`` has a directory in
+``DJANGOCMS_FORM_BUILDER_UPLOAD_TEMP_DIR`` on the local file system with a manifest,
+the received chunks, and, once all chunks are there, the assembled file. A submission
+then only posts the upload's id as the field's value. Uploads without activity for
+``DJANGOCMS_FORM_BUILDER_UPLOAD_EXPIRY`` seconds are abandoned and removed by
+``delete_expired_uploads`` (management command ``delete_expired_uploads``). A client
+(IP address) can have at most ``DJANGOCMS_FORM_BUILDER_UPLOAD_MAX_OPEN`` uploads which
+have not expired.
+"""
+
+import hashlib
+import json
+import os
+import posixpath
+import re
+import shutil
+import tempfile
+import time
+import uuid
+
+from django.conf import settings as django_settings
+from django.core.files.storage import storages
+from django.core.files.uploadedfile import UploadedFile
+from django.utils import timezone
+
+from . import settings
+
+UPLOAD_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+def get_storage():
+    return storages[settings.UPLOAD_STORAGE]
+
+
+def is_reference(value):
+    return isinstance(value, dict) and "path" in value and "name" in value
+
+
+def store_file(file):
+    """Saves an uploaded file chunk by chunk and returns its reference"""
+    name = os.path.basename(file.name)
+    path = posixpath.join(
+        timezone.now().strftime(settings.UPLOAD_TO), uuid.uuid4().hex, name
+    )
+    reference = {
+        "name": name,
+        "path": get_storage().save(path, file),
+        "size": file.size,
+        "content_type": file.content_type,
+    }
+    if isinstance(file, AssembledFile):  # Stored: the local copy is not needed
+        file.close()
+        file.upload.delete()
+    return reference
+
+
+def store_files(cleaned_data):
+    """Replaces the uploaded files in the cleaned data by references to the stored
+    files and returns these references. If a file cannot be stored, the files
+    stored before are deleted."""
+    references = []
+
+    def store(file):
+        references.append(store_file(file))
+        return references[-1]
+
+    try:
+        for key, value in cleaned_data.items():
+            if isinstance(value, UploadedFile):
+                cleaned_data[key] = store(value)
+            elif isinstance(value, list) and any(
+                isinstance(item, UploadedFile) for item in value
+            ):
+                cleaned_data[key] = [store(item) for item in value]
+    except Exception:
+        delete_files(references)
+        raise
+    return references
+
+
+def delete_files(references):
+    """Deletes the stored files of the references, e.g., of a failed submission"""
+    storage = get_storage()
+    for reference in references:
+        try:
+            storage.delete(reference["path"])
+        except OSError:  # Best effort: the submission's error matters
+            pass
+
+
+def get_references(data):
+    """Returns the references to stored files in the (cleaned) data"""
+    references = []
+    for value in data.values():
+        for item in value if isinstance(value, list) else [value]:
+            if is_reference(item):
+                references.append(item)
+    return references
+
+
+def get_display_value(value):
+    """Returns the file name(s) for references and other values unchanged"""
+    if is_reference(value):
+        return value["name"]
+    if isinstance(value, list) and value and all(map(is_reference, value)):
+        return ", ".join(reference["name"] for reference in value)
+    return value
+
+
+def get_temp_dir():
+    return settings.UPLOAD_TEMP_DIR or os.path.join(
+        django_settings.FILE_UPLOAD_TEMP_DIR or tempfile.gettempdir(),
+        "djangocms_form_builder",
+    )
+
+
+def get_last_activity(directory):
+    """Returns the time the last chunk of an upload was received"""
+    try:
+        return max(entry.stat().st_mtime for entry in os.scandir(directory))
+    except (OSError, ValueError):
+        return 0
+
+
+class AssembledFile(UploadedFile):
+    """An assembled chunked upload, stored like a file posted with the form. The
+    local file is only opened once it is read, not each time the posted data is
+    read, e.g., to evaluate conditions or validate the upload's size."""
+
+    def __init__(self, upload):
+        self.upload = upload
+        self._file = None
+        super().__init__(None, upload.name, upload.content_type, upload.size)
+
+    @property
+    def file(self):
+        if self._file is None:
+            self._file = open(self.upload.data_path, "rb")
+        return self._file
+
+    @file.setter
+    def file(self, file):
+        self._file = file
+
+    @property
+    def closed(self):
+        return self._file is None or self._file.closed
+
+    def open(self, mode=None):
+        if self.closed:
+            self._file = open(self.upload.data_path, mode or "rb")
+        else:
+            self.seek(0)
+        return self
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+class ChunkedUpload:
+    """A file uploaded in chunks of ``chunk_size`` bytes, numbered from 0, for a
+    form field (``field`` is the field's HTML name)"""
+
+    def __init__(self, upload_id, manifest):
+        self.id = upload_id
+        self.directory = os.path.join(get_temp_dir(), upload_id)
+        self.field = manifest["field"]
+        self.name = manifest["name"]
+        self.size = manifest["size"]
+        self.content_type = manifest["content_type"]
+        self.chunk_size = manifest["chunk_size"]
+        self.client = manifest.get("client")
+
+    @classmethod
+    def start(cls, field, name, size, content_type, client=None):
+        upload_id = uuid.uuid4().hex
+        manifest = {
+            "field": field,
+            "name": os.path.basename(name),
+            "size": size,
+            "content_type": content_type,
+            "chunk_size": settings.UPLOAD_CHUNK_SIZE,
+            "client": client,
+        }
+        upload = cls(upload_id, manifest)
+        os.makedirs(upload.directory)
+        with open(os.path.join(upload.directory, "manifest.json"), "w") as file:
+            json.dump(manifest, file)
+        return upload
+
+    @classmethod
+    def get(cls, upload_id):
+        """Returns the upload or ``None`` if it does not exist or has expired"""
+        if not isinstance(upload_id, str) or not UPLOAD_ID.match(upload_id):
+            return None
+        path = os.path.join(get_temp_dir(), upload_id, "manifest.json")
+        try:
+            with open(path) as file:
+                upload = cls(upload_id, json.load(file))
+        except (OSError, ValueError, KeyError):
+            return None
+        if get_last_activity(upload.directory) < time.time() - settings.UPLOAD_EXPIRY:
+            return None
+        return upload
+
+    @property
+    def chunks(self):
+        return max(1, -(-self.size // self.chunk_size))
+
+    @property
+    def data_path(self):
+        return os.path.join(self.directory, "data")
+
+    @property
+    def complete(self):
+        return os.path.exists(self.data_path)
+
+    def chunk_path(self, number):
+        return os.path.join(self.directory, f"{number}.part")
+
+    def received(self):
+        """Returns the numbers of the chunks received so far"""
+        if self.complete:
+            return list(range(self.chunks))
+        return [
+            number
+            for number in range(self.chunks)
+            if os.path.exists(self.chunk_path(number))
+        ]
+
+    def write_chunk(self, number, file):
+        """Saves a chunk (of the expected size) and assembles the file once all
+        chunks have been received. Chunks can be sent repeatedly and in any order."""
+        if not 0 <= number < self.chunks:
+            raise ValueError("Invalid chunk number")
+        expected = min(self.chunk_size, self.size - number * self.chunk_size)
+        if file.size != expected:
+            raise ValueError("Invalid chunk size")
+        if self.complete:
+            return
+        temp_path = f"{self.chunk_path(number)}.{uuid.uuid4().hex}"
+        with open(temp_path, "wb") as destination:
+            for data in file.chunks():
+                destination.write(data)
+        os.replace(temp_path, self.chunk_path(number))  # No partial chunks
+        if len(self.received()) == self.chunks:
+            self.assemble()
+
+    def assemble(self):
+        temp_path = f"{self.data_path}.{uuid.uuid4().hex}"
+        try:
+            with open(temp_path, "wb") as destination:
+                for number in range(self.chunks):
+                    with open(self.chunk_path(number), "rb") as chunk:
+                        shutil.copyfileobj(chunk, destination)
+        except FileNotFoundError:  # Assembled concurrently
+            os.remove(temp_path)
+            return
+        os.replace(temp_path, self.data_path)
+        for number in range(self.chunks):
+            try:
+                os.remove(self.chunk_path(number))
+            except FileNotFoundError:
+                pass
+
+    def open(self):
+        return AssembledFile(self)
+
+    def delete(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def get_status(self):
+        return {
+            "result": "upload",
+            "id": self.id,
+            "chunk_size": self.chunk_size,
+            "chunks": self.chunks,
+            "received": self.received(),
+            "complete": self.complete,
+        }
+
+
+def get_uploaded_files(upload_ids, field):
+    """Returns the assembled files of the given uploads of a field. Ids of unknown,
+    expired, or incomplete uploads are returned unchanged."""
+    files = []
+    for upload_id in upload_ids:
+        upload = ChunkedUpload.get(upload_id)
+        if upload is not None and upload.field == field and upload.complete:
+            files.append(upload.open())
+        else:
+            files.append(upload_id)
+    return files
+
+
+def get_client_id(request):
+    """Identifies the client of a request by a hash of its IP address"""
+    address = request.META.get("REMOTE_ADDR") or ""
+    return hashlib.sha256(address.encode("utf-8")).hexdigest()[:16]
+
+
+def count_open_uploads(client):
+    """Returns the number of the client's uploads which have not expired, including
+    complete uploads whose form has not been submitted yet"""
+    temp_dir = get_temp_dir()
+    if not os.path.isdir(temp_dir):
+        return 0
+    count = 0
+    for entry in os.scandir(temp_dir):
+        if entry.is_dir():
+            upload = ChunkedUpload.get(entry.name)
+            if upload is not None and upload.client == client:
+                count += 1
+    return count
+
+
+def delete_expired_uploads():
+    """Removes uploads without activity for ``DJANGOCMS_FORM_BUILDER_UPLOAD_EXPIRY``
+    seconds and returns their number"""
+    temp_dir = get_temp_dir()
+    if not os.path.isdir(temp_dir):
+        return 0
+    deleted = 0
+    expired = time.time() - settings.UPLOAD_EXPIRY
+    for entry in os.scandir(temp_dir):
+        if entry.is_dir() and UPLOAD_ID.match(entry.name):
+            if get_last_activity(entry.path) < expired:
+                shutil.rmtree(entry.path, ignore_errors=True)
+                deleted += 1
+    return deleted
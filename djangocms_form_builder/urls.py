@@ -5,6 +5,7 @@ from . import views
 app_name = "djangocms_form_builder"
 
 urlpatterns = [
+    path("metrics", views.metrics_view, name="metrics"),
     path("f<form_id>", views.AjaxView.as_view(), name="ajaxformbuilder"),
     path(
         "<int:instance_id>/<path:parameter>",
@@ -0,0 +1,274 @@
+"""
+Compiled validation of form submissions.
+
+Instantiating a Django form deep-copies all its fields, although validating a
+submission only needs to read them. A ``CompiledValidator`` is built once from a
+form class' field definitions and coerces and validates the submitted data directly.
+It produces the same ``cleaned_data`` and errors as ``form.is_valid()`` does. The
+full form is only needed to execute the actions of a valid submission (see
+``SimpleFrontendForm.from_cleaned_data``) or to render the errors.
+
+Forms with custom validation hooks (``clean_<field>`` methods, an overridden
+``clean``, ``_post_clean``, or ``full_clean``) or disabled fields are not compiled
+and validated as usual.
+
+Compiled validators can be cached between requests (see ``get_cached_validator``),
+e.g., to validate single fields while the user fills in a form without building
+the form class from its plugins.
+
+``get_client_schema`` describes the rules of a form's fields which can be checked
+in the browser (required, type, value and length limits, decimal places, choices,
+and the number and size of files). ``ajax_form.js`` enforces them before posting a
+form to save a round trip, the server still validates every submission.
+
+Fields hidden by a condition (see ``conditions``) are skipped without running their
+validators, fields required by a condition are checked as required fields.
+"""
+
+import threading
+from collections import OrderedDict
+
+from django import forms
+from django.core import validators
+from django.core.exceptions import ValidationError
+from django.forms.utils import ErrorDict, ErrorList
+from django.template.defaultfilters import filesizeformat
+from django.utils.encoding import force_str
+
+from .conditions import get_conditions, get_values
+from .forms import SimpleFrontendForm, check_login_required
+from .models import RemoteChoiceField, UploadField
+
+CACHE_SIZE = 128
+
+_validators = OrderedDict()
+_lock = threading.Lock()
+
+# Stands in for the length of the entered value in length messages
+SHOW_VALUE = 987654321
+
+FIELD_TYPES = (  # Subclasses first
+    (forms.EmailField, "email"),
+    (forms.URLField, "url"),
+    (forms.DecimalField, "decimal"),
+    (forms.FloatField, "number"),
+    (forms.IntegerField, "integer"),
+    (forms.BooleanField, "boolean"),
+    (forms.MultipleChoiceField, "multiple"),
+    (forms.ChoiceField, "choice"),
+)
+
+
+class CompiledValidator:
+    def __init__(self, form_class, prefix=None):
+        self.form_class = form_class
+        self.fields = tuple(
+            (
+                name,
+                f"{prefix}-{name}" if prefix else name,
+                field,
+                isinstance(field, forms.FileField),
+            )
+            for name, field in form_class.base_fields.items()
+        )
+        self.conditions = get_conditions(form_class)
+
+    @staticmethod
+    def can_compile(form_class):
+        if not issubclass(form_class, SimpleFrontendForm):
+            return False
+        for method in (
+            "__init__",
+            "clean",
+            "_clean_fields",
+            "_post_clean",
+            "full_clean",
+        ):
+            if getattr(form_class, method) is not getattr(SimpleFrontendForm, method):
+                return False
+        return not any(
+            field.disabled or hasattr(form_class, f"clean_{name}")
+            for name, field in form_class.base_fields.items()
+        )
+
+    @property
+    def field_names(self):
+        return [name for name, _, _, _ in self.fields]
+
+    def clean_fields(self, data, files=None, names=None):
+        """Returns the cleaned data and an ``ErrorDict`` of the errors of the given
+        fields (default: all fields)"""
+        cleaned_data = {}
+        errors = ErrorDict()
+        files = {} if files is None else files
+        hidden, required = (), ()
+        if self.conditions:
+            widgets = {
+                name: (html_name, field) for name, html_name, field, _ in self.fields
+            }
+            hidden, required = self.conditions.evaluate(
+                lambda name: (
+                    widgets[name][1].widget.value_from_datadict(
+                        data, files, widgets[name][0]
+                    )
+                    if name in widgets
+                    else None
+                )
+            )
+        for name, html_name, field, is_file in self.fields:
+            if names is not None and name not in names or name in hidden:
+                continue
+            value = field.widget.value_from_datadict(data, files, html_name)
+            try:
+                if name in required and not get_values(value):
+                    raise ValidationError(
+                        field.error_messages["required"], code="required"
+                    )
+                if is_file:
+                    cleaned_data[name] = field.clean(value, field.initial)
+                else:
+                    cleaned_data[name] = field.clean(value)
+            except ValidationError as error:
+                errors[name] = ErrorList(error.error_list)
+        return cleaned_data, errors
+
+    def validate(self, request, data, files=None):
+        """Returns the cleaned data and an ``ErrorDict`` of the errors (empty if the
+        data is valid)"""
+        cleaned_data, errors = self.clean_fields(data, files)
+        try:
+            check_login_required(self.form_class, request)
+        except ValidationError as error:
+            errors[forms.forms.NON_FIELD_ERRORS] = ErrorList(
+                error.error_list, error_class="nonfield"
+            )
+        cleaned_data.pop("captcha_field", None)
+        return cleaned_data, errors
+
+
+def get_validator(form_class, prefix=None):
+    """Returns a ``CompiledValidator`` for the form class or ``None`` if the form
+    needs to be validated by instantiating it"""
+    if form_class is None or not CompiledValidator.can_compile(form_class):
+        return None
+    return CompiledValidator(form_class, prefix)
+
+
+def get_cached_validator(key, get_form_class, prefix=None):
+    """Returns the ``CompiledValidator`` cached under the key, e.g., identifying a
+    form plugin and the state of its children. ``get_form_class`` is only called if
+    the validator is not cached (or ``key`` is ``None``)."""
+    if key is None:
+        return get_validator(get_form_class(), prefix)
+    key = (key, prefix)
+    with _lock:
+        if key in _validators:
+            _validators.move_to_end(key)
+            return _validators[key]
+    validator = get_validator(get_form_class(), prefix)
+    if validator is not None:
+        with _lock:
+            _validators[key] = validator
+            while len(_validators) > CACHE_SIZE:
+                _validators.popitem(last=False)
+    return validator
+
+
+def clear_cache():
+    with _lock:
+        _validators.clear()
+
+
+def format_message(message, **params):
+    message = force_str(message % params)
+    return message.replace(str(SHOW_VALUE), "{value}")
+
+
+def get_field_rules(field):
+    """Returns the rules of a form field which can be checked in the browser
+    (see ``ajax_form.js``) together with the error messages the server would
+    report. Values are validated as entered, "{value}" in messages stands for the
+    entered value or its length."""
+    rules = {"required": field.required}
+    messages = {"required": force_str(field.error_messages["required"])}
+    for field_class, field_type in FIELD_TYPES:
+        if isinstance(field, field_class):
+            rules["type"] = field_type
+            break
+    if isinstance(field, UploadField):
+        rules["type"] = "file"
+        rules["max_files"] = field.max_files
+        messages["max_files"] = format_message(
+            field.error_messages["max_files"], max=field.max_files
+        )
+        if field.max_size is not None:
+            rules["max_size"] = field.max_size
+            messages["max_size"] = format_message(
+                field.error_messages["max_size"],
+                name="{value}",
+                max=filesizeformat(field.max_size),
+            )
+    if "invalid" in field.error_messages:
+        messages["invalid"] = force_str(field.error_messages["invalid"])
+    if isinstance(field, forms.ChoiceField) and not isinstance(
+        field, RemoteChoiceField
+    ):
+        rules["choices"] = [
+            force_str(value)
+            for value, label in field.choices
+            if not isinstance(label, (list, tuple))
+        ] + [
+            force_str(value)
+            for group, options in field.choices
+            if isinstance(options, (list, tuple))
+            for value, label in options
+        ]
+        messages["invalid_choice"] = format_message(
+            field.error_messages["invalid_choice"], value="{value}"
+        )
+    for validator in field.validators:
+        if isinstance(validator, validators.DecimalValidator):
+            if validator.max_digits is not None:
+                rules["max_digits"] = validator.max_digits
+                messages["max_digits"] = format_message(
+                    validator.messages["max_digits"], max=validator.max_digits
+                )
+            if validator.decimal_places is not None:
+                rules["decimal_places"] = validator.decimal_places
+                messages["max_decimal_places"] = format_message(
+                    validator.messages["max_decimal_places"],
+                    max=validator.decimal_places,
+                )
+            if None not in (validator.max_digits, validator.decimal_places):
+                messages["max_whole_digits"] = format_message(
+                    validator.messages["max_whole_digits"],
+                    max=validator.max_digits - validator.decimal_places,
+                )
+            continue
+        for validator_class, rule in (
+            (validators.MinValueValidator, "min_value"),
+            (validators.MaxValueValidator, "max_value"),
+            (validators.MinLengthValidator, "min_length"),
+            (validators.MaxLengthValidator, "max_length"),
+        ):
+            if isinstance(validator, validator_class) and not callable(
+                validator.limit_value
+            ):
+                rules[rule] = validator.limit_value
+                messages[rule] = format_message(
+                    validator.message,
+                    limit_value=validator.limit_value,
+                    show_value=SHOW_VALUE,
+                )
+    rules["messages"] = messages
+    return rules
+
+
+def get_client_schema(form, suffix=""):
+    """Returns the validation schema of a form for ``ajax_form.js``. It is keyed
+    by the widget ids (field name and suffix) used for error messages."""
+    return {
+        f"{name}{suffix}": {"name": form.add_prefix(name), **get_field_rules(field)}
+        for name, field in form.fields.items()
+        if not field.widget.is_hidden and not field.disabled
+    }
@@ -2,12 +2,27 @@ import hashlib
 
 from cms import __version__ as cms_version
 from cms.models import CMSPlugin
+from django.conf import settings as django_settings
 from django.core.exceptions import ValidationError
-from django.http import Http404, JsonResponse, QueryDict
+from django.http import (
+    Http404,
+    HttpResponse,
+    HttpResponseForbidden,
+    JsonResponse,
+    QueryDict,
+)
+from django.middleware.csrf import CsrfViewMiddleware
 from django.shortcuts import get_object_or_404
-from django.utils.crypto import get_random_string
+from django.utils.crypto import constant_time_compare, get_random_string
+from django.utils.datastructures import MultiValueDict
+from django.utils.decorators import method_decorator
+from django.utils.module_loading import import_string
 from django.utils.translation import gettext as _
 from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+
+from . import settings
+from .instrumentation import action_stats, measure, metrics
 
 _formview_pool = {}
 
@@ -18,6 +33,16 @@ else:
     SELECT_RELATED = ("placeholder", "placeholder__content_type")
 
 
+def get_csrf_middleware():
+    """Returns the installed CSRF middleware, i.e., ``CsrfViewMiddleware`` or a
+    subclass of it, or ``None``"""
+    for path in django_settings.MIDDLEWARE:
+        middleware = import_string(path)
+        if isinstance(middleware, type) and issubclass(middleware, CsrfViewMiddleware):
+            return middleware
+    return None
+
+
 def register_form_view(cls, slug=None):
     """
     Registers a Widget (with type defined by cls) and slug
@@ -35,6 +60,7 @@ def register_form_view(cls, slug=None):
     return key
 
 
+@method_decorator(csrf_exempt, name="dispatch")
 class AjaxView(View):
     r"""
     A Django view to handle AJAX requests for GET and POST methods for django CMS Form Builder forms.
@@ -45,6 +71,13 @@ class AjaxView(View):
     ``ajax_form.js`` uses for the ``X-CSRFToken`` header on the subsequent POST.
     This works regardless of ``CSRF_COOKIE_HTTPONLY`` or ``CSRF_USE_SESSIONS``.
 
+    Request bodies larger than the plugin's limit (see ``get_max_body_size``) are
+    refused based on their ``Content-Length`` before they are read. Since the CSRF
+    middleware reads the body of POST requests, the view is exempt from it and
+    runs the installed CSRF middleware (``CsrfViewMiddleware`` or a subclass)
+    itself after the size check. Multipart bodies are streamed through Django's
+    upload handlers.
+
     Methods
     -------
 
@@ -84,6 +117,44 @@ class AjaxView(View):
                 params[element] = True
         return params
 
+    @staticmethod
+    def get_max_body_size(plugin, request, instance):
+        get_max_body_size = getattr(plugin, "get_max_body_size", None)
+        if callable(get_max_body_size):
+            return get_max_body_size(request, instance)
+        return settings.MAX_BODY_SIZE
+
+    @staticmethod
+    def check_request(request, max_body_size):
+        """Returns an error response if the request body exceeds ``max_body_size``
+        or the check of the installed CSRF middleware fails, otherwise ``None``.
+        The size is checked first so that oversized bodies are refused before they
+        are read."""
+        try:
+            content_length = int(request.META.get("CONTENT_LENGTH") or 0)
+        except ValueError:
+            content_length = 0  # As Django's WSGIRequest does
+        if max_body_size is not None and content_length > max_body_size:
+            return JsonResponse(
+                {"result": "error", "errors": [_("The submitted data is too large.")]},
+                status=413,
+            )
+        middleware = get_csrf_middleware()
+        if middleware is None:  # The site does not check CSRF tokens
+            return None
+        return middleware(lambda request: None).process_view(request, None, (), {})
+
+    @staticmethod
+    def parse_body(request):
+        """Returns the data and files of the request body. Multipart bodies are
+        streamed through Django's upload handlers (``MultiPartParser``) instead of
+        being read into memory."""
+        if request.content_type == "multipart/form-data":
+            if request.method == "POST":  # Parsed by Django (or the CSRF check)
+                return request.POST, request.FILES
+            return request.parse_file_upload(request.META, request)
+        return QueryDict(request.body), MultiValueDict()
+
     @staticmethod
     def plugin_instance(pk, admin_user):
         try:
@@ -134,11 +205,18 @@ class AjaxView(View):
                              processing.
         """
         if "instance_id" in kwargs:
-            plugin, instance = self.plugin_instance(
-                kwargs["instance_id"], admin_user=request.user.is_staff
-            )
+            with measure("plugin_lookup") as tags:
+                plugin, instance = self.plugin_instance(
+                    kwargs["instance_id"], admin_user=request.user.is_staff
+                )
+                tags["form_name"] = getattr(instance, "form_name", None)
             if hasattr(plugin, "ajax_post"):
-                request.POST = QueryDict(request.body)
+                error = self.check_request(
+                    request, self.get_max_body_size(plugin, request, instance)
+                )
+                if error is not None:
+                    return error
+                request.POST, request._files = self.parse_body(request)
                 try:
                     params = (
                         self.decode_path(kwargs["parameter"])
@@ -152,6 +230,9 @@ class AjaxView(View):
                 raise Http404()
         elif "form_id" in kwargs:
             if kwargs["form_id"] in _formview_pool:
+                error = self.check_request(request, settings.MAX_BODY_SIZE)
+                if error is not None:
+                    return error
                 form_id = kwargs.pop("form_id")
                 instance = _formview_pool[form_id][0](*args, **kwargs)
                 if hasattr(instance, "ajax_post"):
@@ -187,11 +268,20 @@ class AjaxView(View):
               the `_formview_pool` and calls its `ajax_get` or `get` method if available.
         """
         if "instance_id" in kwargs:
-            plugin, instance = self.plugin_instance(
-                kwargs["instance_id"], admin_user=request.user.is_staff
-            )
+            with measure("plugin_lookup") as tags:
+                plugin, instance = self.plugin_instance(
+                    kwargs["instance_id"], admin_user=request.user.is_staff
+                )
+                tags["form_name"] = getattr(instance, "form_name", None)
             if hasattr(plugin, "ajax_get"):
-                request.GET = QueryDict(request.body)
+                error = self.check_request(
+                    request, self.get_max_body_size(plugin, request, instance)
+                )
+                if error is not None:
+                    return error
+                data = self.parse_body(request)[0]
+                if data:
+                    request.GET = data
                 try:
                     params = (
                         self.decode_path(kwargs["parameter"])
@@ -211,3 +301,23 @@ class AjaxView(View):
                     return instance.get(request, *args, **kwargs)
             raise Http404()
         raise Http404()
+
+
+def metrics_view(request):
+    """Exports the aggregated instrumentation metrics in the Prometheus text format.
+    Available to staff users or to scrapers presenting the bearer token set in
+    ``DJANGOCMS_FORM_BUILDER_METRICS_TOKEN``."""
+    if "metrics" not in settings.INSTRUMENTATION:
+        raise Http404()
+    token = settings.METRICS_TOKEN
+    if not request.user.is_staff and not (
+        token
+        and constant_time_compare(
+            request.headers.get("Authorization", ""), f"Bearer {token}"
+        )
+    ):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        metrics.export() + action_stats.export(),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
@@ -0,0 +1,249 @@
+"""
+Delivery of form submissions to webhooks.
+
+Each submission handled by the ``WebhookAction`` is stored as a ``WebhookDelivery``
+before anything is sent. Unless the action batches submissions, the delivery is
+attempted right after the request's transaction commits in a thread pool of its own.
+Pending and retried deliveries are sent by :func:`send_pending` (run it periodically,
+e.g., with the ``send_webhooks`` management command) which sends batches of up to
+``DJANGOCMS_FORM_BUILDER_WEBHOOK_BATCH_SIZE`` submissions per request.
+
+Failed deliveries are retried with exponential backoff until
+``DJANGOCMS_FORM_BUILDER_WEBHOOK_MAX_ATTEMPTS`` is reached. Deliveries are claimed
+in a short transaction and sent outside of it, hence a delivery whose claim expires
+while it is still being sent may be sent twice.
+"""
+
+import http.client
+import json
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from urllib.parse import urlsplit
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils.timezone import now
+
+from . import settings
+from .entry_model import WebhookDelivery
+
+logger = logging.getLogger(__name__)
+
+RETRY_ON_REUSED_CONNECTION = (
+    http.client.RemoteDisconnected,
+    ConnectionResetError,
+    BrokenPipeError,
+)
+
+
+class ConnectionPool:
+    """Thread-safe pool of keep-alive HTTP(S) connections per scheme, host, and port"""
+
+    def __init__(self, maxsize=4):
+        self.maxsize = maxsize
+        self._pools = {}
+        self._lock = threading.Lock()
+
+    def _get_pool(self, key):
+        with self._lock:
+            return self._pools.setdefault(key, queue.LifoQueue(self.maxsize))
+
+    def _new_connection(self, scheme, host, port, timeout):
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, port, timeout=timeout)
+        return http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def request(self, method, url, body=None, headers=None, timeout=None):
+        """Sends a request and returns the tuple ``(status, body)``. A reused
+        connection closed by the server is replaced by a new one once."""
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.hostname, parts.port)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        pool = self._get_pool(key)
+        try:
+            conn, reused = pool.get_nowait(), True
+        except queue.Empty:
+            conn, reused = self._new_connection(*key, timeout), False
+        conn.timeout = timeout
+        try:
+            try:
+                conn.request(method, path, body=body, headers=headers or {})
+                response = conn.getresponse()
+            except RETRY_ON_REUSED_CONNECTION:
+                if not reused:
+                    raise
+                conn.close()
+                conn = self._new_connection(*key, timeout)
+                conn.request(method, path, body=body, headers=headers or {})
+                response = conn.getresponse()
+            content = response.read()
+        except Exception:
+            conn.close()
+            raise
+        if response.will_close:
+            conn.close()
+        else:
+            try:
+                pool.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+        return response.status, content
+
+    def clear(self):
+        with self._lock:
+            pools, self._pools = self._pools, {}
+        for pool in pools.values():
+            while not pool.empty():
+                pool.get_nowait().close()
+
+
+pool = ConnectionPool(settings.WEBHOOK_POOL_SIZE)
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Returns the thread pool sending deliveries right after their submission.
+    It is separate from the pool running independent actions, so slow webhooks
+    do not delay form submissions, and has one thread per pooled connection."""
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.WEBHOOK_POOL_SIZE,
+                thread_name_prefix="form_builder_webhook",
+            )
+        return _executor
+
+
+def get_backoff(attempts):
+    """Delay before the next attempt after ``attempts`` failed attempts"""
+    delay = settings.WEBHOOK_BACKOFF * 2 ** (attempts - 1)
+    return timedelta(seconds=min(delay, settings.WEBHOOK_MAX_BACKOFF))
+
+
+def post(url, payload):
+    """Posts the payload as JSON and raises an ``OSError`` or an
+    ``http.client.HTTPException`` on failure"""
+    body = json.dumps(payload, cls=DjangoJSONEncoder).encode("utf-8")
+    status, content = pool.request(
+        "POST",
+        url,
+        body=body,
+        headers={
+            "Content-Type": "application/json",
+            "User-Agent": "djangocms-form-builder",
+        },
+        timeout=settings.WEBHOOK_TIMEOUT,
+    )
+    if not 200 <= status < 300:
+        raise OSError(f"HTTP {status}: {content[:200].decode('utf-8', 'replace')}")
+
+
+def send(deliveries, batch=False):
+    """Sends the deliveries, either one per request or all (sharing the same url)
+    in one request, and updates their status. Returns the number of delivered
+    submissions."""
+    try:
+        if batch:
+            post(deliveries[0].url, [delivery.payload for delivery in deliveries])
+        else:
+            post(deliveries[0].url, deliveries[0].payload)
+    except (OSError, http.client.HTTPException) as e:  # Incl. timeouts
+        for delivery in deliveries:
+            delivery.attempts += 1
+            delivery.last_error = str(e)[:1000] or e.__class__.__name__
+            if delivery.attempts >= settings.WEBHOOK_MAX_ATTEMPTS:
+                delivery.status = WebhookDelivery.FAILED
+            else:
+                delivery.next_attempt_at = now() + get_backoff(delivery.attempts)
+        WebhookDelivery.objects.bulk_update(
+            deliveries, ["attempts", "last_error", "status", "next_attempt_at"]
+        )
+        return 0
+    WebhookDelivery.objects.filter(
+        pk__in=[delivery.pk for delivery in deliveries]
+    ).update(
+        status=WebhookDelivery.DELIVERED,
+        delivered_at=now(),
+        attempts=F("attempts") + 1,
+    )
+    return len(deliveries)
+
+
+def get_due_deliveries():
+    qs = WebhookDelivery.objects.filter(
+        status=WebhookDelivery.PENDING, next_attempt_at__lte=now()
+    )
+    if connection.features.has_select_for_update_skip_locked:
+        qs = qs.select_for_update(skip_locked=True)
+    return qs
+
+
+def get_lease():
+    """Time other processes leave claimed deliveries alone, long enough for a
+    request retried once on a new connection"""
+    return timedelta(seconds=4 * settings.WEBHOOK_TIMEOUT + 60)
+
+
+def claim(deliveries):
+    """Postpones the next attempt of the (locked) deliveries by the lease, so they
+    can be sent after the transaction locking them is committed"""
+    WebhookDelivery.objects.filter(
+        pk__in=[delivery.pk for delivery in deliveries]
+    ).update(next_attempt_at=now() + get_lease())
+
+
+def send_pending():
+    """Sends all pending deliveries which are due, batched by url. Rows being sent
+    by another process are skipped where the database supports it. Deliveries are
+    claimed in a short transaction and sent outside of it, so no locks are held
+    while waiting for the endpoint. An unexpected error is logged and does not keep
+    the remaining deliveries from being sent; they are retried once their claim
+    expires. Returns the number of delivered submissions."""
+    delivered = 0
+    attempted = set()
+    while True:
+        with transaction.atomic():
+            qs = get_due_deliveries().exclude(pk__in=attempted)
+            first = qs.order_by("next_attempt_at", "pk").first()
+            if first is None:
+                return delivered
+            if first.batch:
+                deliveries = list(
+                    qs.filter(url=first.url, batch=True).order_by("pk")[
+                        : settings.WEBHOOK_BATCH_SIZE
+                    ]
+                )
+            else:
+                deliveries = [first]
+            claim(deliveries)
+        attempted.update(delivery.pk for delivery in deliveries)
+        try:
+            delivered += send(deliveries, batch=first.batch)
+        except Exception:
+            logger.exception("Sending webhook deliveries to %s failed", first.url)
+
+
+def send_now(pk):
+    """Sends a single pending delivery, e.g., right after the submission commits"""
+    with transaction.atomic():
+        delivery = get_due_deliveries().filter(pk=pk).first()
+        if delivery is None:
+            return
+        claim([delivery])
+    send([delivery])
+
+
+def send_in_thread(pk):
+    try:
+        send_now(pk)
+    finally:
+        connection.close()  # Worker threads must not leak connections
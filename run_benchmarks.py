@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+import argparse
+import json
+import os
+import platform
+import sys
+
+import django
+from django.conf import settings
+from django.test.utils import get_runner
+
+BASELINE = os.path.join(
+    os.path.dirname(__file__), "tests", "benchmarks", "baseline.json"
+)
+SCENARIOS = [
+    "render",
+    "render_widget",
+    "submit",
+    "validate",
+    "validate_form",
+    "validate_field",
+]
+
+
+def run():
+    parser = argparse.ArgumentParser(
+        description="Benchmarks rendering and submission of form builder forms."
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5, 50, 500])
+    parser.add_argument(
+        "--scenarios",
+        nargs="+",
+        default=SCENARIOS,
+        choices=SCENARIOS,
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="Write the results to the baseline file instead of comparing",
+    )
+    parser.add_argument("--time-tolerance", type=float, default=1.0)
+    parser.add_argument("--alloc-tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.test_settings")
+    django.setup()
+    from tests.benchmarks import suite
+
+    runner = get_runner(settings)(verbosity=0)
+    runner.setup_test_environment()
+    old_config = runner.setup_databases()
+    try:
+        results = suite.run(
+            sizes=args.sizes, scenarios=args.scenarios, repeat=args.repeat, log=print
+        )
+    finally:
+        runner.teardown_databases(old_config)
+        runner.teardown_test_environment()
+
+    report = {
+        "environment": {
+            "python": platform.python_version(),
+            "django": django.__version__,
+            "database": settings.DATABASES["default"]["ENGINE"].rsplit(".", 1)[-1],
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        return
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = suite.compare(
+            results,
+            baseline["results"],
+            time_tolerance=args.time_tolerance,
+            alloc_tolerance=args.alloc_tolerance,
+        )
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        sys.exit(bool(regressions))
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,322 @@
+"""
+Benchmark suite for the form rendering and submission path.
+
+Each form variant is built from plugins on its own page. For every variant six
+scenarios are measured:
+
+* ``render``: rendering the placeholder containing the form plugin
+  (``FormPlugin.render`` and its templates)
+* ``render_widget``: rendering every field of an unbound form through the
+  ``render_widget`` template tag
+* ``submit``: posting valid data to ``AjaxView`` (``ajax_post``)
+* ``validate``: validating a submission with the compiled validator of the AJAX
+  POST path and binding the valid form (``validation.CompiledValidator``)
+* ``validate_form``: validating the same submission by instantiating the form as
+  ``get_ajax_form`` does and calling ``is_valid()``
+* ``validate_field``: live validation of a single field posted to ``AjaxView``
+  with the ``validate`` parameter (``AjaxFormMixin.validate_fields``)
+
+For each scenario the number of queries, the median wall time and the peak of
+traced allocations are recorded. Run it with ``python run_benchmarks.py``, e.g.,
+``python run_benchmarks.py --sizes 10 100 500 --scenarios validate validate_form``
+to compare both validation paths.
+"""
+
+import json
+import statistics
+import time
+import tracemalloc
+import uuid
+from unittest import mock
+from urllib.parse import urlencode
+
+from cms.api import add_plugin
+from cms.models import Placeholder
+from cms.plugin_rendering import ContentRenderer
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.test import RequestFactory
+from django.urls import reverse
+from sekizai.context import SekizaiContext
+
+from djangocms_form_builder import actions, cms_plugins
+from djangocms_form_builder.instrumentation import QueryCounter
+from djangocms_form_builder.templatetags.form_builder_tags import render_widget
+from djangocms_form_builder.validation import get_validator
+from djangocms_form_builder.views import AjaxView
+
+from ..fixtures import TestFixture
+from ..helpers import make_valid_altcha_payload
+
+SIZES = (5, 50, 500)
+SCENARIOS = (
+    "render",
+    "render_widget",
+    "submit",
+    "validate",
+    "validate_form",
+    "validate_field",
+)
+SELECT_EVERY = 5
+CHOICES_PER_SELECT = 10
+
+# Plugin type, additional config and a valid submission value
+FIELD_TYPES = (
+    (cms_plugins.CharFieldPlugin.__name__, {}, "Some text"),
+    (cms_plugins.EmailFieldPlugin.__name__, {}, "bench@example.com"),
+    (cms_plugins.IntegerFieldPlugin.__name__, {}, "42"),
+    (cms_plugins.DecimalFieldPlugin.__name__, {"decimal_places": 2}, "3.14"),
+    (cms_plugins.TextareaPlugin.__name__, {"field_rows": 5}, "Lorem ipsum"),
+    (cms_plugins.DateFieldPlugin.__name__, {}, "2024-01-31"),
+    (cms_plugins.BooleanFieldPlugin.__name__, {}, "on"),
+)
+
+
+def variant_name(size, selects=False, captcha=False):
+    name = f"{size}-fields"
+    if selects:
+        name += "-selects"
+    if captcha:
+        name += "-captcha"
+    return name
+
+
+class BenchmarkFixture(TestFixture):
+    """Creates pages and form plugins outside of a test case."""
+
+    def __init__(self, language="en"):
+        self.language = language
+        self.superuser = get_user_model().objects.create_superuser(
+            "benchmark", "benchmark@example.com", "benchmark"
+        )
+        self.factory = RequestFactory()
+
+    def create_form(self, size, selects=False, captcha=False):
+        """Creates a published page holding a form with ``size`` fields and returns the
+        form plugin and the data of a valid submission"""
+        name = variant_name(size, selects, captcha)
+        page = self.create_page(title=name, template="page.html")
+        self.publish(page, self.language)
+        placeholder = self.get_placeholders(page).get(slot="content")
+        form_plugin = add_plugin(
+            placeholder=placeholder,
+            plugin_type=cms_plugins.FormPlugin.__name__,
+            language=self.language,
+            form_name=name,
+            form_actions=json.dumps([actions.SAVE_TO_DB_ACTION]),
+            captcha_widget="altcha" if captcha else "",
+        )
+        data = {}
+        for i in range(size):
+            field_name = f"field_{i}"
+            if selects and i % SELECT_EVERY == SELECT_EVERY - 1:
+                select = add_plugin(
+                    placeholder=placeholder,
+                    plugin_type=cms_plugins.SelectPlugin.__name__,
+                    target=form_plugin,
+                    language=self.language,
+                    config={
+                        "field_name": field_name,
+                        "field_label": f"Select {i}",
+                        "field_required": True,
+                        "field_select": "select",
+                    },
+                )
+                for j in range(CHOICES_PER_SELECT):
+                    add_plugin(
+                        placeholder=placeholder,
+                        plugin_type=cms_plugins.ChoicePlugin.__name__,
+                        target=select,
+                        language=self.language,
+                        config={"value": f"c{j}", "verbose": f"Choice {j}"},
+                    )
+                select.update_choices()  # As saving the plugin in the admin does
+                data[field_name] = f"c{CHOICES_PER_SELECT // 2}"
+            else:
+                plugin_type, config, value = FIELD_TYPES[i % len(FIELD_TYPES)]
+                add_plugin(
+                    placeholder=placeholder,
+                    plugin_type=plugin_type,
+                    target=form_plugin,
+                    language=self.language,
+                    config={
+                        "field_name": field_name,
+                        "field_label": f"Field {i}",
+                        "field_required": True,
+                        **config,
+                    },
+                )
+                data[field_name] = value
+        return form_plugin, data
+
+    def get_request(self, method="get", data=None, path="/"):
+        if method == "post":
+            request = self.factory.post(
+                path,
+                urlencode(data or {}, doseq=True),
+                content_type="application/x-www-form-urlencoded",
+                headers={
+                    "accept": "application/json",
+                    "user-agent": "benchmark",
+                    "referer": "/benchmark/",
+                },
+            )
+        else:
+            request = self.factory.get(path)
+        request.user = AnonymousUser()
+        request.session = {}
+        request._dont_enforce_csrf_checks = True  # As the test client does
+        return request
+
+    def render(self, form_plugin):
+        request = self.get_request()
+        renderer = ContentRenderer(request)
+        context = SekizaiContext({"request": request})
+        # A fresh placeholder instance does not carry the plugins of a previous run
+        placeholder = Placeholder.objects.get(pk=form_plugin.placeholder_id)
+        return renderer.render_placeholder(placeholder, context, language=self.language)
+
+    def render_widgets(self, form_plugin):
+        plugin = form_plugin.get_plugin_class_instance()
+        plugin.instance = type(form_plugin).objects.get(pk=form_plugin.pk)
+        plugin.request = self.get_request()
+        form = plugin.get_ajax_form()
+        return [render_widget(form, field_name) for field_name in form.fields]
+
+    def submit(self, form_plugin, data):
+        url = reverse("form_builder:ajaxview", kwargs={"instance_id": form_plugin.pk})
+        if form_plugin.captcha_widget:
+            # Altcha rejects replayed challenges
+            data = {
+                **data,
+                "captcha_field": make_valid_altcha_payload(uuid.uuid4().hex),
+            }
+        request = self.get_request("post", data, path=url)
+        response = AjaxView.as_view()(request, instance_id=form_plugin.pk)
+        result = json.loads(response.content)
+        assert result["result"] == "success", result
+        return response
+
+    def validate_field(self, form_plugin, data):
+        field_name = next(iter(data))
+        parameter = f"validate={field_name}"
+        url = reverse(
+            "form_builder:ajaxview",
+            kwargs={"instance_id": form_plugin.pk, "parameter": parameter},
+        )
+        request = self.get_request("post", data, path=url)
+        response = AjaxView.as_view()(
+            request, instance_id=form_plugin.pk, parameter=parameter
+        )
+        result = json.loads(response.content)
+        assert result["result"] == "valid", result
+        return response
+
+    def get_validation(self, form_plugin, data, compiled=True):
+        """Returns a function validating the data with the compiled validator or the
+        form"""
+        plugin = form_plugin.get_plugin_class_instance()
+        plugin.instance = type(form_plugin).objects.get(pk=form_plugin.pk)
+        plugin.request = self.get_request("post", data)
+        form_class = plugin.get_form_class()
+
+        def get_data():
+            data = plugin.request.POST.copy()
+            if form_plugin.captcha_widget:
+                data["captcha_field"] = make_valid_altcha_payload(uuid.uuid4().hex)
+            return data
+
+        def validate():
+            request, data = plugin.request, get_data()
+            cleaned_data, errors = get_validator(form_class).validate(request, data)
+            assert not errors, errors
+            return form_class.from_cleaned_data(request, data, cleaned_data)
+
+        def validate_form():
+            plugin.request.POST = get_data()
+            form = plugin.get_ajax_form()
+            assert form.is_valid(), form.errors
+            return form
+
+        return validate if compiled else validate_form
+
+
+def measure(func, repeat=5):
+    """Runs ``func`` once to warm up, once to count queries, ``repeat`` times for timing
+    and once under ``tracemalloc`` for allocations."""
+    func()
+    queries = QueryCounter()
+    with connection.execute_wrapper(queries):
+        func()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "queries": queries.count,
+        "time_ms": round(statistics.median(timings) * 1000, 3),
+        "peak_alloc_kb": round(peak / 1024, 1),
+    }
+
+
+def run(sizes=SIZES, scenarios=SCENARIOS, repeat=5, log=None):
+    """Builds all form variants and measures each scenario. Returns a dict mapping
+    ``"<scenario>/<variant>"`` to the measurements."""
+    fixture = BenchmarkFixture()
+    results = {}
+    with mock.patch("altcha.verify_solution", return_value=(True, None)):
+        for size in sizes:
+            for selects in (False, True):
+                for captcha in (False, True):
+                    name = variant_name(size, selects, captcha)
+                    form_plugin, data = fixture.create_form(size, selects, captcha)
+                    benchmarks = {
+                        "render": lambda: fixture.render(form_plugin),
+                        "render_widget": lambda: fixture.render_widgets(form_plugin),
+                        "submit": lambda: fixture.submit(form_plugin, data),
+                        "validate": fixture.get_validation(form_plugin, data),
+                        "validate_form": fixture.get_validation(
+                            form_plugin, data, compiled=False
+                        ),
+                        "validate_field": lambda: fixture.validate_field(
+                            form_plugin, data
+                        ),
+                    }
+                    for scenario in scenarios:
+                        key = f"{scenario}/{name}"
+                        results[key] = measure(benchmarks[scenario], repeat=repeat)
+                        if log is not None:
+                            log(f"{key}: {results[key]}")
+    return results
+
+
+def compare(results, baseline, time_tolerance=1.0, alloc_tolerance=0.25):
+    """Compares results with a baseline and returns a list of regressions. Query counts
+    must not grow at all, wall time and allocations may grow by the given fraction."""
+    regressions = []
+    for key, result in results.items():
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+        if result["queries"] > reference["queries"]:
+            regressions.append(
+                f"{key}: {result['queries']} queries (baseline {reference['queries']})"
+            )
+        if result["time_ms"] > reference["time_ms"] * (1 + time_tolerance):
+            regressions.append(
+                f"{key}: {result['time_ms']} ms (baseline {reference['time_ms']} ms)"
+            )
+        if result["peak_alloc_kb"] > reference["peak_alloc_kb"] * (1 + alloc_tolerance):
+            regressions.append(
+                f"{key}: {result['peak_alloc_kb']} kB allocated "
+                f"(baseline {reference['peak_alloc_kb']} kB)"
+            )
+    return regressions
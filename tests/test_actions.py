@@ -1,18 +1,39 @@
+import threading
+import time
 from unittest.mock import patch
 
+import django
 from cms.api import add_plugin
 from cms.test_utils.testcases import CMSTestCase
 from django.apps import apps
 from django.contrib.admin.sites import AdminSite
 from django.contrib.auth.models import AnonymousUser
+from django.db import transaction
 
+from djangocms_form_builder import actions
+from djangocms_form_builder import settings as form_builder_settings
 from djangocms_form_builder.actions import get_registered_actions
 from djangocms_form_builder.cms_plugins.ajax_plugins import FormPlugin
 from djangocms_form_builder.entry_model import FormEntry
+from djangocms_form_builder.helpers import get_option
+from djangocms_form_builder.instrumentation import action_stats, get_action_stats
 
 from .fixtures import TestFixture
 
 
+class SlowAction(actions.FormAction):
+    verbose_name = "Slow action"
+    independent = True
+
+    def execute(self, form, request):
+        time.sleep(0.2)
+        return threading.current_thread().name
+
+
+class OtherSlowAction(SlowAction):
+    verbose_name = "Other slow action"
+
+
 class ActionTestCase(TestFixture, CMSTestCase):
     def setUp(self):
         super().setUp()
@@ -67,7 +88,9 @@ class ActionTestCase(TestFixture, CMSTestCase):
         with patch("django.core.mail.send_mail") as mock_send_mail:
             form = plugin.get_form_class()({}, request=self.get_request("/"))
             form.cleaned_data = {"field1": "value1", "field2": "value2"}
-            form.save()
+            with self.captureOnCommitCallbacks(execute=True):
+                form.save()
+                mock_send_mail.assert_not_called()  # Sent once committed
 
         # Validate send_mail call
         mock_send_mail.assert_called_once()
@@ -86,7 +109,8 @@ class ActionTestCase(TestFixture, CMSTestCase):
         with patch("django.core.mail.mail_admins") as mock_mail_admins:
             form = plugin.get_form_class()({}, request=self.get_request("/"))
             form.cleaned_data = {"field1": "value1", "field2": "value2"}
-            form.save()
+            with self.captureOnCommitCallbacks(execute=True):
+                form.save()
 
         # Validate mail_admins call
         mock_mail_admins.assert_called_once()
@@ -179,6 +203,16 @@ class ActionTestCase(TestFixture, CMSTestCase):
         )
         self.assertEqual(entries.count(), 1)
         self.assertEqual(entries.first().entry_data.get("x"), 2)
+        self.assertEqual(entries.first().unique_user, self.superuser)
+
+        # A single statement upserts the entry (Django < 5.0 does not return the
+        # primary key of upserted rows, so it is read separately)
+        form = plugin.get_form_class()({}, request=request)
+        form.cleaned_data = {"x": 3}
+        with self.assertNumQueries(1 if django.VERSION >= (5, 0) else 2):
+            results = form.save()
+        self.assertEqual(results[self.save_action].pk, entries.first().pk)
+        self.assertEqual(entries.get().entry_data.get("x"), 3)
 
     def test_success_message_action_sets_render_success_and_redirect(self):
         plugin_instance = add_plugin(
@@ -220,11 +254,20 @@ class ActionTestCase(TestFixture, CMSTestCase):
         form.save()
 
         # After SuccessMessageAction, render_success should be set and redirect cleared
+        # for this submission only
         self.assertEqual(
-            form.Meta.options.get("render_success"),
+            get_option(form, "render_success"),
             "djangocms_form_builder/actions/submit_message.html",
         )
-        self.assertIsNone(form.Meta.options.get("redirect"))
+        self.assertIsNone(get_option(form, "redirect"))
+        self.assertEqual(
+            get_option(form, "success_context"), {"message": "<p>Thanks!</p>"}
+        )
+        self.assertIsNone(form.Meta.options.get("render_success"))
+        self.assertEqual(form.Meta.options.get("redirect"), "result")
+        other = type(form)({}, request=request)  # E.g., a concurrent submission
+        self.assertIsNone(get_option(other, "render_success"))
+        self.assertEqual(get_option(other, "redirect"), "result")
 
     def test_redirect_action_sets_redirect_url(self):
         if not apps.is_installed("djangocms_link") or self.redirect_action is None:
@@ -259,7 +302,142 @@ class ActionTestCase(TestFixture, CMSTestCase):
         form = plugin.get_form_class()({}, request=request)
         form.cleaned_data = {}
         form.save()
-        self.assertEqual(form.Meta.options.get("redirect"), "/home/")
+        self.assertEqual(get_option(form, "redirect"), "/home/")
+        self.assertEqual(form.Meta.options.get("redirect"), "result")
+
+    def get_form(self, form_name, form_actions, user=None):
+        plugin_instance = add_plugin(
+            placeholder=self.placeholder,
+            plugin_type="FormPlugin",
+            language=self.language,
+            form_name=form_name,
+        )
+        plugin_instance.form_actions = str(form_actions).replace("'", '"')
+        plugin_instance.save()
+        add_plugin(
+            placeholder=self.placeholder,
+            plugin_type="CharFieldPlugin",
+            language=self.language,
+            target=plugin_instance,
+            config={"field_name": "field1"},
+        )
+        plugin = plugin_instance.get_plugin_class_instance()
+        plugin.instance = plugin_instance
+
+        request = self.get_request("/")
+        request.META["HTTP_USER_AGENT"] = "pytest-agent"
+        request.META["HTTP_REFERER"] = "/from"
+        request.user = user or AnonymousUser()
+        form = plugin.get_form_class()({}, request=request)
+        form.cleaned_data = {"field1": "value1"}
+        return form
+
+    def test_action_records_and_stats(self):
+        action_stats.reset()
+        form = self.get_form("records_form", [self.save_action, self.send_mail_action])
+
+        with (
+            patch("django.core.mail.mail_admins", return_value=None),
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            form.save()
+        with (
+            patch("django.core.mail.send_mail", return_value=0),
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            form.Meta.options["form_parameters"] = {"sendemail_recipients": "a@b.c"}
+            form.save()
+
+        self.assertEqual(
+            [(record["action"], record["outcome"]) for record in form.action_records],
+            [("SaveToDBAction", "success"), ("SendMailAction", "failure")],
+        )
+        self.assertGreaterEqual(form.action_records[0]["duration"], 0)
+        self.assertIsNone(form.action_records[1]["exception"])
+
+        stats = get_action_stats()
+        self.assertEqual(stats["SaveToDBAction"]["count"], 2)
+        self.assertEqual(
+            stats["SendMailAction"]["outcomes"],
+            {"success": 1, "failure": 1, "error": 0},
+        )
+        self.assertLessEqual(
+            stats["SendMailAction"]["mean_duration"],
+            stats["SendMailAction"]["max_duration"],
+        )
+        # Not persisted by default
+        self.assertEqual(FormEntry.objects.latest("pk").action_records, [])
+        action_stats.reset()
+
+    def test_on_commit_actions_skip_rolled_back_submissions(self):
+        form = self.get_form("rollback_form", [self.save_action, self.send_mail_action])
+
+        with (
+            patch("django.core.mail.mail_admins") as mail_admins,
+            self.captureOnCommitCallbacks(execute=True) as callbacks,
+        ):
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                results = form.save()
+                self.assertIsNone(results[self.send_mail_action])  # Not sent yet
+                raise RuntimeError
+
+        mail_admins.assert_not_called()
+        self.assertEqual(callbacks, [])
+        self.assertFalse(FormEntry.objects.filter(form_name="rollback_form").exists())
+
+    def test_action_error_is_recorded_and_persisted(self):
+        action_stats.reset()
+        form = self.get_form("error_form", [self.save_action, self.send_mail_action])
+
+        with (
+            patch.object(form_builder_settings, "PERSIST_ACTION_RECORDS", True),
+            patch("django.core.mail.mail_admins", side_effect=ConnectionError),
+            self.assertLogs("djangocms_form_builder.forms", "ERROR"),
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            results = form.save()  # Committed: the error is logged only
+        self.assertIsInstance(results[self.save_action], FormEntry)
+
+        self.assertEqual(form.action_records[1]["outcome"], "error")
+        self.assertEqual(form.action_records[1]["exception"], "ConnectionError")
+        self.assertEqual(
+            get_action_stats()["SendMailAction"]["exceptions"], {"ConnectionError": 1}
+        )
+        entry = FormEntry.objects.get(form_name="error_form")
+        self.assertEqual(
+            [record["outcome"] for record in entry.action_records],
+            ["success", "error"],
+        )
+        action_stats.reset()
+
+    def test_independent_actions_run_concurrently(self):
+        actions.register(SlowAction)
+        actions.register(OtherSlowAction)
+        self.addCleanup(actions.unregister, SlowAction)
+        self.addCleanup(actions.unregister, OtherSlowAction)
+        form_actions = [
+            actions.get_hash(OtherSlowAction),
+            self.save_action,
+            actions.get_hash(SlowAction),
+        ]
+        form = self.get_form("parallel_form", form_actions)
+
+        start = time.perf_counter()
+        results = form.save()
+        duration = time.perf_counter() - start
+
+        self.assertLess(duration, 0.35)
+        self.assertEqual(list(results), form_actions)
+        self.assertTrue(results[form_actions[0]].startswith("form_builder_action"))
+        self.assertIsInstance(results[self.save_action], FormEntry)
+        self.assertEqual(
+            [record["action"] for record in form.action_records],
+            ["OtherSlowAction", "SaveToDBAction", "SlowAction"],
+        )
+
+        with patch.object(form_builder_settings, "ACTION_WORKERS", 1):
+            results = form.save()
+        self.assertEqual(results[form_actions[0]], threading.current_thread().name)
 
     def test_actions_appear_in_form_plugin_fieldsets(self):
         """Test that registered actions appear in FormPlugin admin fieldsets"""
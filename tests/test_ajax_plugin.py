@@ -5,11 +5,14 @@ from urllib.parse import urlencode
 from cms import __version__ as cms_version
 from cms.api import add_plugin
 from cms.test_utils.testcases import CMSTestCase
+from django.conf import settings as django_settings
 from django.http import HttpResponseNotAllowed, JsonResponse
-from django.test import RequestFactory, override_settings
+from django.middleware.csrf import CsrfViewMiddleware
+from django.test import Client, RequestFactory, override_settings
 from django.urls import reverse
 
 from djangocms_form_builder import cms_plugins
+from djangocms_form_builder import settings as form_builder_settings
 from djangocms_form_builder.models import FormEntry
 from djangocms_form_builder.views import AjaxView, register_form_view
 from tests.helpers import make_valid_altcha_payload
@@ -17,6 +20,11 @@ from tests.helpers import make_valid_altcha_payload
 from .fixtures import TestFixture
 
 
+class CustomCsrfViewMiddleware(CsrfViewMiddleware):
+    def _reject(self, request, reason):
+        return JsonResponse({"result": "error", "reason": reason}, status=403)
+
+
 class AjaxViewTestCase(TestFixture, CMSTestCase):
     """Tests for the AjaxView class and URL routing"""
 
@@ -549,6 +557,96 @@ class AjaxGetRequestTestCase(TestFixture, CMSTestCase):
         self.assertIn(json_data["result"], ["success", "error"])
         self.assertIn("field_errors", json_data)
 
+    def test_ajax_post_refuses_oversized_body(self):
+        """Bodies exceeding the limit are refused before they are read or the CSRF
+        token is checked"""
+        form_plugin = self._create_simple_form_plugin("simple-ajax-post-size")
+        self.publish(self.page, self.language)
+        url = reverse("form_builder:ajaxview", kwargs={"instance_id": form_plugin.pk})
+        client = Client(enforce_csrf_checks=True)
+        data = urlencode({"simple_field": "x" * 200})
+
+        with mock.patch.object(form_builder_settings, "MAX_BODY_SIZE", 100):
+            with mock.patch.object(AjaxView, "parse_body") as parse_body:
+                response = client.post(
+                    url,
+                    data=data,
+                    content_type="application/x-www-form-urlencoded",
+                    headers={"accept": "application/json"},
+                )
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(response.json()["result"], "error")
+        parse_body.assert_not_called()
+
+        # Within the limit the CSRF token is still required
+        response = client.post(
+            url,
+            data=data,
+            content_type="application/x-www-form-urlencoded",
+            headers={"accept": "application/json"},
+        )
+        self.assertEqual(response.status_code, 403)
+
+    def test_ajax_post_without_csrf_middleware(self):
+        """Sites without the CSRF middleware do not require the token"""
+        form_plugin = self._create_simple_form_plugin("simple-ajax-post-no-csrf")
+        self.publish(self.page, self.language)
+        url = reverse("form_builder:ajaxview", kwargs={"instance_id": form_plugin.pk})
+        middleware = [
+            name
+            for name in django_settings.MIDDLEWARE
+            if name != "django.middleware.csrf.CsrfViewMiddleware"
+        ]
+
+        with override_settings(MIDDLEWARE=middleware):
+            response = Client(enforce_csrf_checks=True).post(
+                url,
+                data=urlencode({"simple_field": "posted value"}),
+                content_type="application/x-www-form-urlencoded",
+                headers={"accept": "application/json"},
+            )
+        self.assertEqual(response.status_code, 200)
+
+    def test_ajax_post_with_custom_csrf_middleware(self):
+        """A subclass of the CSRF middleware checks the token"""
+        form_plugin = self._create_simple_form_plugin("simple-ajax-post-custom-csrf")
+        self.publish(self.page, self.language)
+        url = reverse("form_builder:ajaxview", kwargs={"instance_id": form_plugin.pk})
+        middleware = [
+            (
+                "tests.test_ajax_plugin.CustomCsrfViewMiddleware"
+                if name == "django.middleware.csrf.CsrfViewMiddleware"
+                else name
+            )
+            for name in django_settings.MIDDLEWARE
+        ]
+
+        with override_settings(MIDDLEWARE=middleware):
+            response = Client(enforce_csrf_checks=True).post(
+                url,
+                data=urlencode({"simple_field": "posted value"}),
+                content_type="application/x-www-form-urlencoded",
+                headers={"accept": "application/json"},
+            )
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.json()["result"], "error")
+
+    def test_ajax_post_multipart_form_submission(self):
+        """Multipart bodies are parsed by Django's upload handlers"""
+        form_plugin = self._create_simple_form_plugin("simple-ajax-post-multipart")
+        self.publish(self.page, self.language)
+        url = reverse("form_builder:ajaxview", kwargs={"instance_id": form_plugin.pk})
+
+        with self.login_user_context(self.superuser):
+            response = self.client.post(
+                url,
+                data={"simple_field": "posted value"},
+                headers={"accept": "application/json"},
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["field_errors"], {})
+
 
 @skipIf(cms_version < "4", "Form plugin tests require django CMS 4 or higher")
 class FormPluginTestCase(TestFixture, CMSTestCase):
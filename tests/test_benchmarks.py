@@ -0,0 +1,41 @@
+from cms.test_utils.testcases import CMSTestCase
+
+from .benchmarks import suite
+
+
+class BenchmarkSuiteTestCase(CMSTestCase):
+    """Keeps the benchmark harness working without running the full benchmark"""
+
+    def test_run_smallest_variants(self):
+        results = suite.run(sizes=(5,), repeat=1)
+
+        self.assertEqual(len(results), len(suite.SCENARIOS) * 4)
+        for key in suite.SCENARIOS:
+            result = results[f"{key}/5-fields-selects-captcha"]
+            self.assertGreater(result["time_ms"], 0)
+            self.assertGreater(result["peak_alloc_kb"], 0)
+        self.assertGreater(results["submit/5-fields-selects-captcha"]["queries"], 0)
+        # Validating needs no queries
+        self.assertEqual(results["validate/5-fields-selects-captcha"]["queries"], 0)
+        # Choices are materialized in the select's config and need no queries
+        self.assertEqual(
+            results["submit/5-fields-selects"]["queries"],
+            results["submit/5-fields"]["queries"],
+        )
+
+    def test_compare_reports_regressions(self):
+        baseline = {
+            "submit/5-fields": {"queries": 10, "time_ms": 10.0, "peak_alloc_kb": 100.0}
+        }
+        within = {
+            "submit/5-fields": {"queries": 10, "time_ms": 19.0, "peak_alloc_kb": 120.0}
+        }
+        worse = {
+            "submit/5-fields": {"queries": 11, "time_ms": 21.0, "peak_alloc_kb": 130.0},
+            "submit/50-fields": {"queries": 99, "time_ms": 1.0, "peak_alloc_kb": 1.0},
+        }
+
+        self.assertEqual(suite.compare(within, baseline), [])
+        regressions = suite.compare(worse, baseline)
+        self.assertEqual(len(regressions), 3)
+        self.assertTrue(all(r.startswith("submit/5-fields:") for r in regressions))
@@ -0,0 +1,111 @@
+from unittest.mock import patch
+
+from cms.api import add_plugin
+from cms.test_utils.testcases import CMSTestCase
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+
+from djangocms_form_builder import choices
+from djangocms_form_builder.forms import SelectFieldForm
+from djangocms_form_builder.models import Select
+
+from .fixtures import TestFixture
+
+
+class ChoiceProviderTestCase(TestFixture, CMSTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        Group.objects.create(name="Editors")
+        Group.objects.create(name="Authors")
+        choices.register_choices(
+            Group.objects.order_by("name"), value_field="name", label_field="name"
+        )
+        self.provider = choices.get_choice_provider(
+            choices.QuerySetChoiceProvider(Group.objects.all()).hash
+        )
+        self.addCleanup(choices.unregister_choices, self.provider.hash)
+
+    def create_select(self, **config):
+        select = add_plugin(
+            placeholder=self.placeholder,
+            plugin_type="SelectPlugin",
+            language=self.language,
+            config={
+                "field_name": "group",
+                "field_select": "select",
+                "field_required": True,
+                "field_choices_source": self.provider.hash,
+                **config,
+            },
+        )
+        return Select.objects.get(pk=select.pk)
+
+    def test_registration(self):
+        self.assertEqual(self.provider.models, (Group,))
+        self.assertIn(
+            (self.provider.hash, "groups"), choices.get_registered_choice_providers()
+        )
+
+        @choices.register_choices(verbose_name="Numbers", timeout=10)
+        def numbers():
+            return [(1, "One")]
+
+        provider = choices.get_choice_provider(
+            choices.CallableChoiceProvider(numbers).hash
+        )
+        self.addCleanup(choices.unregister_choices, provider.hash)
+        self.assertEqual(provider.verbose_name, "Numbers")
+        self.assertEqual(provider.timeout, 10)
+        self.assertEqual(provider.get_cached_choices(), [("1", "One")])
+
+    def test_choices_are_cached(self):
+        select = self.create_select()
+        with self.assertNumQueries(1):
+            _, field = select.get_form_field()
+        self.assertEqual(
+            list(field.choices), [("Authors", "Authors"), ("Editors", "Editors")]
+        )
+
+        select = Select.objects.get(pk=select.pk)
+        with self.assertNumQueries(0):
+            _, field = select.get_form_field()
+        self.assertEqual(len(field.choices), 2)
+
+    def test_model_changes_invalidate_choices(self):
+        select = self.create_select()
+        select.get_choices()
+        version = self.provider.get_version()
+
+        Group.objects.create(name="Admins")
+
+        self.assertNotEqual(self.provider.get_version(), version)
+        select = Select.objects.get(pk=select.pk)
+        self.assertEqual(select.get_choices()[0], ("Admins", "Admins"))
+        Group.objects.get(name="Admins").delete()
+        select = Select.objects.get(pk=select.pk)
+        self.assertEqual(len(select.get_choices()), 2)
+
+    def test_timeout(self):
+        with patch.object(cache, "set", wraps=cache.set) as cache_set:
+            self.provider.get_cached_choices()
+        self.assertEqual(cache_set.call_args.args[2], 300)
+
+    def test_remote_select_index(self):
+        select = self.create_select(field_select="remote")
+        index = choices.get_choice_index(select)
+
+        self.assertIn("Editors", index)
+        self.assertIs(choices.get_choice_index(select), index)
+        Group.objects.create(name="Admins")
+        self.assertIn("Admins", choices.get_choice_index(select))
+
+    def test_admin_form(self):
+        select = self.create_select()
+        form = SelectFieldForm(instance=select)
+        self.assertEqual(form.fields["field_choices"].initial, [])
+        self.assertFalse(form.fields["field_choices"].required)
+
+        choices.unregister_choices(self.provider.hash)
+        form = SelectFieldForm(instance=select)
+        self.assertTrue(form.fields["field_choices"].required)
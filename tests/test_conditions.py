@@ -0,0 +1,219 @@
+import json
+import re
+
+from cms.api import add_plugin
+from cms.test_utils.testcases import CMSTestCase
+from django import forms
+from django.contrib.auth.models import AnonymousUser
+from django.http import QueryDict
+from django.test import SimpleTestCase
+from django.urls import reverse
+
+from djangocms_form_builder import actions, cms_plugins, validation
+from djangocms_form_builder.conditions import Conditions, get_conditions
+from djangocms_form_builder.forms import SimpleFrontendForm
+from djangocms_form_builder.models import FormEntry
+from djangocms_form_builder.validation import get_validator
+
+from .fixtures import TestFixture
+
+
+class OrderForm(SimpleFrontendForm):
+    class Meta:
+        options = {
+            "form_name": "order",
+            "conditions": {
+                "company": {
+                    "field": "customer_type",
+                    "value": "business",
+                    "effect": "show",
+                },
+                "vat_id": {
+                    "field": "company",
+                    "operator": "not_empty",
+                    "effect": "require",
+                },
+                "reason": {"field": "newsletter", "operator": "empty"},
+            },
+        }
+
+    customer_type = forms.ChoiceField(
+        choices=[("private", "Private"), ("business", "Business")]
+    )
+    company = forms.CharField(max_length=5)
+    vat_id = forms.CharField(required=False, min_length=4)
+    newsletter = forms.BooleanField(required=False)
+    reason = forms.CharField(required=False)
+
+
+class ConditionsTestCase(SimpleTestCase):
+    def evaluate(self, rules, values):
+        return Conditions(rules).evaluate(values.get)
+
+    def test_operators(self):
+        rules = {"b": {"field": "a", "operator": "not_equals", "value": "x"}}
+        self.assertEqual(self.evaluate(rules, {"a": "x"}), ({"b"}, set()))
+        self.assertEqual(self.evaluate(rules, {"a": ["y", "x"]}), ({"b"}, set()))
+        self.assertEqual(self.evaluate(rules, {}), (set(), set()))
+
+        rules = {"b": {"field": "a", "value": "on", "effect": "require"}}
+        self.assertEqual(self.evaluate(rules, {"a": True}), (set(), {"b"}))
+        self.assertEqual(self.evaluate(rules, {"a": False}), (set(), set()))
+
+    def test_hidden_source_is_empty(self):
+        rules = {
+            "b": {"field": "a", "value": "x"},
+            "c": {"field": "b", "operator": "not_empty"},
+        }
+        self.assertEqual(self.evaluate(rules, {"b": "y"}), ({"b", "c"}, set()))
+        self.assertEqual(self.evaluate(rules, {"a": "x", "b": "y"}), (set(), set()))
+
+    def test_invalid_rules_and_cycles(self):
+        conditions = Conditions(
+            {
+                "a": {"field": "a", "value": "x"},
+                "b": {"field": "c", "operator": "like"},
+                "c": {"field": "d", "effect": "hide"},
+            }
+        )
+        self.assertFalse(conditions)
+
+        rules = {"a": {"field": "b", "value": "x"}, "b": {"field": "a", "value": "x"}}
+        self.assertEqual(self.evaluate(rules, {"a": "x", "b": "x"}), (set(), set()))
+
+    def test_compiled_once(self):
+        conditions = get_conditions(OrderForm)
+        self.assertIs(get_conditions(OrderForm), conditions)
+        self.assertEqual(set(conditions.rules), {"company", "vat_id", "reason"})
+        self.assertFalse(get_conditions(SimpleFrontendForm))
+
+
+class ConditionalValidationTestCase(CMSTestCase):
+    def assertSameResult(self, data):
+        data = QueryDict(data)
+        request = self.get_request("/")
+        request.user = AnonymousUser()
+        form = OrderForm(data, request=request)
+        form.is_valid()
+
+        cleaned_data, errors = get_validator(OrderForm).validate(request, data)
+
+        self.assertEqual(cleaned_data, form.cleaned_data)
+        self.assertEqual(errors, form.errors)
+        return cleaned_data, errors
+
+    def test_hidden_fields_are_not_validated(self):
+        cleaned_data, errors = self.assertSameResult(
+            "customer_type=private&company=Too+long&newsletter=on&reason=x"
+        )
+        self.assertEqual(errors, {})
+        self.assertEqual(set(cleaned_data), {"customer_type", "vat_id", "newsletter"})
+
+    def test_shown_fields_are_validated(self):
+        _, errors = self.assertSameResult("customer_type=business&company=Too+long")
+        self.assertEqual(set(errors), {"company", "vat_id"})
+
+        _, errors = self.assertSameResult("customer_type=business")
+        self.assertEqual(errors["company"], ["This field is required."])
+
+    def test_required_by_condition(self):
+        _, errors = self.assertSameResult("customer_type=business&company=ACME")
+        self.assertEqual(errors["vat_id"], ["This field is required."])
+
+        _, errors = self.assertSameResult(
+            "customer_type=business&company=ACME&vat_id=12"
+        )
+        self.assertEqual(set(errors), {"vat_id"})  # Validators still apply
+
+        cleaned_data, errors = self.assertSameResult(
+            "customer_type=business&company=ACME&vat_id=1234&reason=Spam"
+        )
+        self.assertEqual(errors, {})
+        self.assertEqual(cleaned_data["reason"], "Spam")
+
+
+class ConditionalFormPluginTestCase(TestFixture, CMSTestCase):
+    def setUp(self):
+        super().setUp()
+        self.form_plugin = add_plugin(
+            placeholder=self.placeholder,
+            plugin_type=cms_plugins.FormPlugin.__name__,
+            language=self.language,
+            form_name="conditional",
+            captcha_widget="",
+            form_actions=f'["{actions.SAVE_TO_DB_ACTION}"]',
+        )
+        for plugin, config in (
+            (cms_plugins.BooleanFieldPlugin, {"field_name": "contact"}),
+            (
+                cms_plugins.EmailFieldPlugin,
+                {
+                    "field_name": "email",
+                    "field_required": True,
+                    "field_condition": "contact",
+                    "field_condition_operator": "equals",
+                    "field_condition_value": "on",
+                    "field_condition_effect": "show",
+                },
+            ),
+        ):
+            add_plugin(
+                placeholder=self.placeholder,
+                plugin_type=plugin.__name__,
+                target=self.form_plugin,
+                language=self.language,
+                config=config,
+            )
+        self.publish(self.page, self.language)
+        validation.clear_cache()
+
+    def post(self, data):
+        return self.client.post(
+            reverse(
+                "form_builder:ajaxview", kwargs={"instance_id": self.form_plugin.pk}
+            ),
+            data=data,
+            content_type="application/x-www-form-urlencoded",
+            headers={
+                "accept": "application/json",
+                "user-agent": "test",
+                "referer": "/",
+            },
+        ).json()
+
+    def test_submission(self):
+        self.assertEqual(self.post("email=jane")["result"], "success")
+        self.assertEqual(
+            FormEntry.objects.get(form_name="conditional").entry_data,
+            {"contact": False},
+        )
+
+        result = self.post("contact=on&email=jane")
+        self.assertEqual(
+            result["field_errors"],
+            {f"email{self.form_plugin.pk}": ["Enter a valid email address."]},
+        )
+
+    def test_client_rules_are_rendered(self):
+        with self.login_user_context(self.superuser):
+            content = self.client.get(self.request_url).content.decode()
+
+        match = re.search(
+            r'<script id="(conditions[^"]+)" type="application/json">(.*?)</script>',
+            content,
+        )
+        self.assertIn(f'data-conditions="{match[1]}"', content)
+        self.assertIn(f'data-condition="email{self.form_plugin.pk}"', content)
+        self.assertEqual(
+            json.loads(match[2]),
+            {
+                f"email{self.form_plugin.pk}": {
+                    "name": "email",
+                    "field": "contact",
+                    "source": f"contact{self.form_plugin.pk}",
+                    "operator": "equals",
+                    "value": "on",
+                    "effect": "show",
+                }
+            },
+        )
@@ -0,0 +1,96 @@
+from cms.api import add_plugin
+from cms.test_utils.testcases import CMSTestCase
+from django.urls import reverse
+
+from djangocms_form_builder import actions, cms_plugins, validation
+from djangocms_form_builder.models import FormDraft, FormEntry
+
+from .fixtures import TestFixture
+
+
+class FormDraftTestCase(TestFixture, CMSTestCase):
+    def setUp(self):
+        super().setUp()
+        self.form_plugin = add_plugin(
+            placeholder=self.placeholder,
+            plugin_type=cms_plugins.FormPlugin.__name__,
+            language=self.language,
+            form_name="survey",
+            form_drafts=True,
+            captcha_widget="",
+            form_actions=f'["{actions.SAVE_TO_DB_ACTION}"]',
+        )
+        for name, plugin in (
+            ("name", cms_plugins.CharFieldPlugin),
+            ("email", cms_plugins.EmailFieldPlugin),
+            ("newsletter", cms_plugins.BooleanFieldPlugin),
+        ):
+            add_plugin(
+                placeholder=self.placeholder,
+                plugin_type=plugin.__name__,
+                target=self.form_plugin,
+                language=self.language,
+                config={"field_name": name, "field_required": name == "name"},
+            )
+        self.publish(self.page, self.language)
+        validation.clear_cache()
+
+    def url(self, parameter=None):
+        kwargs = {"instance_id": self.form_plugin.pk}
+        if parameter:
+            kwargs["parameter"] = parameter
+        return reverse("form_builder:ajaxview", kwargs=kwargs)
+
+    def post(self, url, data):
+        return self.client.post(
+            url,
+            data=data,
+            content_type="application/x-www-form-urlencoded",
+            headers={
+                "accept": "application/json",
+                "user-agent": "test",
+                "referer": "/",
+            },
+        )
+
+    def test_patches_are_merged(self):
+        result = self.post(self.url("draft=name"), "name=Jane&email=ignored").json()
+        self.assertEqual(result, {"result": "draft", "fields": ["name"]})
+        self.post(self.url("draft=email+newsletter+unknown"), "email=jane@")
+
+        draft = FormDraft.objects.get(form_name="survey")
+        self.assertEqual(draft.owner, f"session:{self.client.session.session_key}")
+        self.assertEqual(
+            draft.draft_data, {"name": "Jane", "email": "jane@", "newsletter": False}
+        )
+
+        self.post(self.url("draft=name"), "name=Joe")
+        draft.refresh_from_db()
+        self.assertEqual(draft.draft_data["name"], "Joe")
+        self.assertEqual(draft.draft_data["email"], "jane@")
+
+    def test_draft_is_restored_and_discarded(self):
+        with self.login_user_context(self.superuser):
+            self.post(self.url("draft=name+newsletter"), "name=Jane&newsletter=on")
+            self.assertEqual(
+                FormDraft.objects.get(form_name="survey").owner,
+                f"user:{self.superuser.pk}",
+            )
+            content = self.client.get(self.request_url).content.decode()
+            self.assertIn('data-draft="true"', content)
+            self.assertIn('value="Jane"', content)
+
+            result = self.post(self.url(), "name=Jane").json()
+            self.assertEqual(result["result"], "success")
+        self.assertTrue(FormEntry.objects.filter(form_name="survey").exists())
+        self.assertFalse(FormDraft.objects.exists())
+
+    def test_drafts_disabled(self):
+        self.form_plugin.form_drafts = False
+        self.form_plugin.save()
+        validation.clear_cache()
+
+        self.assertEqual(
+            self.post(self.url("draft=name"), "name=Jane").status_code, 404
+        )
+        self.assertFalse(FormDraft.objects.exists())
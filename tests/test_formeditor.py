@@ -26,6 +26,7 @@ class FormEditorTestCase(TestFixture, CMSTestCase):
                 and issubclass(cls, FormElementPlugin)
                 and not issubclass(cls, cms_plugins.ChoicePlugin)
                 and cls is not cms_plugins.SubmitPlugin
+                and cls is not cms_plugins.FormStepPlugin
             ):
                 field = add_plugin(
                     placeholder=self.placeholder,
@@ -53,6 +54,7 @@ class FormEditorTestCase(TestFixture, CMSTestCase):
                 and issubclass(cls, FormElementPlugin)
                 and not issubclass(cls, cms_plugins.ChoicePlugin)
                 and cls is not cms_plugins.SubmitPlugin
+                and cls is not cms_plugins.FormStepPlugin
             ):
                 self.assertContains(response, f'name="field_{item}"')
 
@@ -2,8 +2,13 @@ from decimal import Decimal
 from types import SimpleNamespace
 from unittest.mock import patch
 
+from django import forms
+from django.contrib.auth.models import Group, Permission
 from django.db.models import ObjectDoesNotExist
-from django.test import SimpleTestCase
+from django.template import Context, Template
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.utils import translation
+from django.utils.translation import gettext_lazy, ngettext_lazy
 
 from djangocms_form_builder import helpers
 from djangocms_form_builder import settings as app_settings
@@ -50,6 +55,9 @@ class HelpersTests(SimpleTestCase):
                     return self._store[pk]
                 raise ObjectDoesNotExist()
 
+            def in_bulk(self, pks):
+                return {pk: self._store[pk] for pk in pks if pk in self._store}
+
         class FakeModel:
             objects = Manager({1: SimpleNamespace(pk=1), 2: SimpleNamespace(pk=2)})
 
@@ -168,6 +176,21 @@ class HelpersTests(SimpleTestCase):
         helpers.add_plugin(PHv3(), orphan)
         self.assertEqual(orphan.position, 0)
 
+    def test_add_plugins_falls_back_without_cms_internals(self):
+        class Placeholder:
+            _state = SimpleNamespace(db="default")
+
+            def get_last_plugin_position(self, language):
+                return 0
+
+            def _recalculate_plugin_positions(self, language, base):
+                pass  # But no _shift_plugin_positions
+
+        plugins = [object(), object()]
+        with patch.object(helpers, "add_plugin") as add_plugin:
+            helpers.add_plugins(Placeholder(), plugins)
+        self.assertEqual([call.args[1] for call in add_plugin.call_args_list], plugins)
+
     def test_delete_plugin_delegates(self):
         class Placeholder:
             def delete_plugin(self, plugin):
@@ -187,3 +210,74 @@ class HelpersTests(SimpleTestCase):
         self.assertEqual(helpers.coerce_decimal("1.23"), Decimal("1.23"))
         self.assertIsNone(helpers.coerce_decimal(None))
         # A non-numeric string would raise InvalidOperation (not caught), so we don't test it
+
+    def test_resolve_strings(self):
+        field = forms.ChoiceField(
+            label=gettext_lazy("No selection"),
+            choices=[("", gettext_lazy("No selection")), ("a", "A")],
+            widget=forms.Select(attrs={"title": gettext_lazy("More choices")}),
+        )
+        plural = ngettext_lazy("%(max)d file", "%(max)d files", "max")
+        field.error_messages["plural"] = plural
+        with translation.override("de"):
+            helpers.resolve_strings(field)
+
+        self.assertEqual(field.label, "Keine Auswahl")
+        self.assertIs(type(field.label), str)
+        self.assertEqual(field.choices, [("", "Keine Auswahl"), ("a", "A")])
+        self.assertEqual(field.widget.choices, field.choices)
+        self.assertIs(type(field.error_messages["required"]), str)
+        self.assertIs(field.error_messages["plural"], plural)  # Needs its number
+        self.assertIs(type(field.widget.attrs["title"]), str)
+
+
+class RelatedObjectsTests(TestCase):
+    def setUp(self):
+        self.groups = [Group.objects.create(name=f"Group {i}") for i in range(3)]
+        self.permission = Permission.objects.first()
+        self.scope = {
+            **{
+                f"group{i}": {"model": "auth.Group", "pk": group.pk}
+                for i, group in enumerate(self.groups)
+            },
+            "permission": {"model": "auth.permission", "pk": str(self.permission.pk)},
+            "missing": {"model": "auth.Group", "pk": 0},
+            "unknown": {"model": "app.Unknown", "pk": 1},
+            "name": "Jane",
+        }
+
+    def test_one_query_per_model(self):
+        with self.assertNumQueries(2):
+            objects = helpers.get_related_objects(self.scope)
+
+        self.assertEqual(objects["group2"], self.groups[2])
+        self.assertEqual(objects["permission"], self.permission)
+        self.assertIsNone(objects["missing"])
+        self.assertIsNone(objects["unknown"])
+        self.assertNotIn("name", objects)
+
+    def test_request_memo(self):
+        request = RequestFactory().get("/")
+        with self.assertNumQueries(1):
+            helpers.get_related_objects(self.scope, ["group0", "group1"], request)
+        with self.assertNumQueries(1):  # Only group2 is missing
+            self.assertEqual(
+                helpers.get_related_objects(self.scope, ["group1", "group2"], request),
+                {"group1": self.groups[1], "group2": self.groups[2]},
+            )
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                helpers.get_related_object(self.scope, "group0", request),
+                self.groups[0],
+            )
+            self.assertIsNone(helpers.get_related_object(self.scope, "name", request))
+
+    def test_template_tag(self):
+        template = Template(
+            "{% load form_builder_tags %}{% related_objects data as objects %}"
+            "{{ objects.group0.name }}, {{ objects.group1.name }}"
+        )
+        request = RequestFactory().get("/")
+        with self.assertNumQueries(2):
+            content = template.render(Context({"data": self.scope, "request": request}))
+        self.assertEqual(content, "Group 0, Group 1")
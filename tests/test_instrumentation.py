@@ -0,0 +1,175 @@
+from unittest import mock, skipIf
+
+from cms import __version__ as cms_version
+from cms.api import add_plugin
+from cms.test_utils.testcases import CMSTestCase
+from django.test import SimpleTestCase
+from django.urls import reverse
+
+from djangocms_form_builder import actions, cms_plugins
+from djangocms_form_builder import settings as form_builder_settings
+from djangocms_form_builder.instrumentation import (
+    StageMetrics,
+    log_stage,
+    measure,
+    metrics,
+    stage_finished,
+)
+
+from .fixtures import TestFixture
+
+
+class MeasureTestCase(SimpleTestCase):
+    def test_measure_sends_signal_with_tags(self):
+        received = []
+
+        def receiver(sender, **kwargs):
+            received.append(kwargs)
+
+        stage_finished.connect(receiver)
+        try:
+            with measure("action", form_name="contact", action="SendMailAction"):
+                pass
+            with measure("plugin_lookup") as tags:
+                tags["form_name"] = "late"
+        finally:
+            stage_finished.disconnect(receiver)
+
+        self.assertEqual(len(received), 2)
+        self.assertEqual(received[0]["stage"], "action")
+        self.assertEqual(received[0]["form_name"], "contact")
+        self.assertEqual(received[0]["action"], "SendMailAction")
+        self.assertEqual(received[0]["queries"], 0)
+        self.assertGreaterEqual(received[0]["duration"], 0)
+        self.assertEqual(received[1]["form_name"], "late")
+
+    def test_log_stage(self):
+        with self.assertLogs("djangocms_form_builder.instrumentation", "INFO") as logs:
+            log_stage(None, "validation", 0.0125, 3, form_name="contact")
+        self.assertIn(
+            "validation form=contact action=- duration=12.50ms", logs.output[0]
+        )
+        self.assertIn("queries=3", logs.output[0])
+
+    def test_metrics_export(self):
+        sink = StageMetrics()
+        sink(None, "action", 0.5, 2, form_name="contact", action="SaveToDBAction")
+        sink(None, "action", 0.25, 1, form_name="contact", action="SaveToDBAction")
+        sink(None, "validation", 0.1, 0, form_name='say "hi"')
+
+        export = sink.export()
+
+        labels = 'stage="action",form_name="contact",action="SaveToDBAction"'
+        self.assertIn(
+            f"djangocms_form_builder_stage_duration_seconds_count{{{labels}}} 2", export
+        )
+        self.assertIn(
+            f"djangocms_form_builder_stage_duration_seconds_sum{{{labels}}} 0.750000",
+            export,
+        )
+        self.assertIn(
+            f"djangocms_form_builder_stage_queries_total{{{labels}}} 3", export
+        )
+        self.assertIn('form_name="say \\"hi\\""', export)
+        sink.reset()
+        self.assertEqual(sink.snapshot(), {})
+
+
+@skipIf(cms_version < "4", "Form rendering tests require django CMS 4 or higher")
+class SubmissionInstrumentationTestCase(TestFixture, CMSTestCase):
+    def setUp(self):
+        super().setUp()
+        self.received = []
+        stage_finished.connect(self.receiver)
+
+    def tearDown(self):
+        stage_finished.disconnect(self.receiver)
+        super().tearDown()
+
+    def receiver(self, sender, **kwargs):
+        self.received.append(kwargs)
+
+    def test_submission_emits_all_stages(self):
+        form_plugin = add_plugin(
+            placeholder=self.placeholder,
+            plugin_type=cms_plugins.FormPlugin.__name__,
+            language=self.language,
+            form_name="instrumented",
+            captcha_widget="",
+            form_actions=f'["{actions.SAVE_TO_DB_ACTION}"]',
+        )
+        add_plugin(
+            placeholder=self.placeholder,
+            plugin_type=cms_plugins.CharFieldPlugin.__name__,
+            target=form_plugin,
+            language=self.language,
+            config={"field_name": "name", "field_label": "Name"},
+        )
+        self.publish(self.page, self.language)
+
+        url = reverse("form_builder:ajaxview", kwargs={"instance_id": form_plugin.pk})
+        response = self.client.post(
+            url,
+            data="name=Jane",
+            content_type="application/x-www-form-urlencoded",
+            headers={
+                "accept": "application/json",
+                "user-agent": "test",
+                "referer": "/",
+            },
+        )
+
+        self.assertEqual(response.json()["result"], "success")
+        stages = {item["stage"]: item for item in self.received}
+        self.assertEqual(
+            set(stages),
+            {"plugin_lookup", "form_class", "validation", "action", "response"},
+        )
+        for item in self.received:
+            self.assertEqual(item["form_name"], "instrumented")
+        self.assertEqual(stages["action"]["action"], "SaveToDBAction")
+        self.assertGreater(stages["action"]["queries"], 0)
+        self.assertGreater(stages["form_class"]["queries"], 0)
+
+
+class MetricsViewTestCase(CMSTestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = reverse("form_builder:metrics")
+        metrics.reset()
+        metrics(None, "validation", 0.1, 1, form_name="contact")
+
+    def tearDown(self):
+        metrics.reset()
+        super().tearDown()
+
+    def test_disabled(self):
+        with mock.patch.object(form_builder_settings, "INSTRUMENTATION", ()):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 404)
+
+    def test_access(self):
+        with mock.patch.object(form_builder_settings, "INSTRUMENTATION", ("metrics",)):
+            with mock.patch.object(form_builder_settings, "METRICS_TOKEN", "secret"):
+                response = self.client.get(self.url)
+                self.assertEqual(response.status_code, 403)
+
+                response = self.client.get(
+                    self.url, headers={"authorization": "Bearer secreT"}
+                )
+                self.assertEqual(response.status_code, 403)
+
+                response = self.client.get(
+                    self.url, headers={"authorization": "Bearer secret"}
+                )
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(
+                    response["Content-Type"], "text/plain; version=0.0.4; charset=utf-8"
+                )
+                self.assertIn(
+                    'stage="validation",form_name="contact"', response.content.decode()
+                )
+
+            with self.login_user_context(self.get_superuser()):
+                response = self.client.get(self.url)
+            self.assertEqual(response.status_code, 200)
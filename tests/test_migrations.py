@@ -1,10 +1,17 @@
 # original from
 # http://tech.octopus.energy/news/2016/01/21/testing-for-missing-migrations-in-django.html
+from importlib import import_module
 from io import StringIO
+from unittest.mock import Mock, patch
 
+from django.apps import apps
+from django.contrib.auth.models import User
 from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase, override_settings
 
+from djangocms_form_builder.models import Form, FormEntry
+
 
 class MigrationTestCase(TestCase):
     @override_settings(MIGRATION_MODULES={})
@@ -27,3 +34,30 @@ class MigrationTestCase(TestCase):
 
         if status_code == "1":
             self.fail(f"There are missing migrations:\n {output.getvalue()}")
+
+    def test_dedupe_unique_entries(self):
+        migration = import_module(
+            "djangocms_form_builder.migrations.0009_dedupe_unique_entries"
+        )
+        Form.objects.create(
+            form_name="unique", form_unique=True, form_login_required=True
+        )
+        users = [User.objects.create(username=f"user{i}") for i in range(3)]
+        for user in users:
+            for i in range(3):
+                FormEntry.objects.create(
+                    form_name="unique", form_user=user, entry_data={"i": i}
+                )
+                FormEntry.objects.create(form_name="other", form_user=user)
+        FormEntry.objects.create(form_name="unique")
+
+        with patch.object(migration, "CHUNK_SIZE", 2):
+            migration.dedupe_unique_entries(apps, Mock(connection=connection))
+
+        entries = FormEntry.objects.filter(form_name="unique", form_user__isnull=False)
+        self.assertEqual(entries.count(), 3)
+        for entry in entries:
+            self.assertEqual(entry.unique_user, entry.form_user)
+            self.assertEqual(entry.entry_data, {"i": 2})
+        self.assertEqual(FormEntry.objects.filter(form_name="other").count(), 9)
+        self.assertEqual(FormEntry.objects.filter(form_user__isnull=True).count(), 1)
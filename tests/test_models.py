@@ -3,6 +3,7 @@ from decimal import Decimal
 from cms.api import add_plugin
 from cms.test_utils.testcases import CMSTestCase
 from django import forms
+from django.contrib.auth.models import User
 from django.test import TestCase
 
 from djangocms_form_builder.models import (
@@ -40,6 +41,17 @@ class FormsModelTestCase(TestCase):
         entry = FormEntry.objects.create(form_name=instance.form_name)
         self.assertEqual(str(entry), "my-test-form (1)")
 
+    def test_form_entry_latest_for(self):
+        user = User.objects.create(username="entry-user")
+        FormEntry.objects.create(form_name="a", form_user=user, entry_data={"x": 1})
+        FormEntry.objects.create(form_name="a", form_user=user, entry_data={"x": 2})
+        FormEntry.objects.create(form_name="b", form_user=user, entry_data={"x": 3})
+
+        with self.assertNumQueries(1):
+            entry = FormEntry.objects.latest_for("a", user)
+            self.assertEqual(entry.entry_data, {"x": 2})
+        self.assertIsNone(FormEntry.objects.latest_for("c", user))
+
 
 class FormFieldModelTests(TestFixture, CMSTestCase):
     """Test FormField base class functionality"""
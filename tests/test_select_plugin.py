@@ -1,10 +1,20 @@
+from cms import operations
 from cms.api import add_plugin
 from cms.plugin_pool import plugin_pool
 from cms.test_utils.testcases import CMSTestCase
+from cms.test_utils.util.fuzzy_int import FuzzyInt
 from django.contrib.admin.sites import AdminSite
+from django.core.exceptions import ValidationError
 from django.http import QueryDict
-
-from djangocms_form_builder.cms_plugins.form_plugins import SelectPlugin
+from django.urls import reverse
+
+from djangocms_form_builder import choices
+from djangocms_form_builder.cms_plugins.form_plugins import (
+    ChoicePlugin,
+    SelectPlugin,
+    update_choices_after_operation,
+)
+from djangocms_form_builder.helpers import delete_plugin
 from djangocms_form_builder.models import Select
 
 from .fixtures import TestFixture
@@ -334,3 +344,190 @@ class SelectPluginTests(TestFixture, CMSTestCase):
         self.assertEqual(len(initial_choices), 2)
         self.assertIn(("opt1", "Option 1"), initial_choices)
         self.assertIn(("opt2", "Option 2"), initial_choices)
+
+    def test_save_model_materializes_choices(self):
+        """Test that save_model stores the ordered choices in the config"""
+        select_instance = self._create_select_plugin()
+        self._create_choice_plugin(select_instance, "opt1", "Option 1")
+        choices_data = [("opt1", "Option 1"), ("opt2", "Option 2")]
+        form = self._get_form_with_choices(select_instance, choices_data)
+        self.assertTrue(form.is_valid(), form.errors)
+
+        SelectPlugin(self.plugin_class.model, self.admin_site).save_model(
+            request=self.get_request("/"), obj=select_instance, form=form, change=True
+        )
+
+        select_instance = Select.objects.get(pk=select_instance.pk)
+        self.assertEqual(
+            select_instance.config["_choices"],
+            [["opt1", "Option 1"], ["opt2", "Option 2"]],
+        )
+        with self.assertNumQueries(0):
+            _, field = select_instance.get_form_field()
+        self.assertEqual(list(field.choices)[1:], choices_data)
+
+    def test_choice_changes_update_materialized_choices(self):
+        """Test that saving, moving, and deleting choices updates the parent's choices"""
+        select_instance = self._create_select_plugin()
+        first = self._create_choice_plugin(select_instance, "first", "First")
+        second = self._create_choice_plugin(select_instance, "second", "Second")
+        select_instance.update_choices()
+
+        first.config["verbose"] = "Changed"
+        ChoicePlugin(ChoicePlugin.model, self.admin_site).save_model(
+            request=self.get_request("/"), obj=first, form=None, change=True
+        )
+        self.assertEqual(
+            Select.objects.get(pk=select_instance.pk).get_choices(),
+            [("first", "Changed"), ("second", "Second")],
+        )
+
+        self.placeholder.move_plugin(
+            second, first.position, target_plugin=select_instance
+        )
+        update_choices_after_operation(
+            None,
+            operation=operations.MOVE_PLUGIN,
+            source_parent_id=select_instance.pk,
+            target_parent_id=select_instance.pk,
+        )
+        self.assertEqual(
+            Select.objects.get(pk=select_instance.pk).get_choices(),
+            [("second", "Second"), ("first", "Changed")],
+        )
+
+        second.refresh_from_db()
+        delete_plugin(second)
+        update_choices_after_operation(
+            None, operation=operations.DELETE_PLUGIN, plugin=second
+        )
+        self.assertEqual(
+            Select.objects.get(pk=select_instance.pk).get_choices(),
+            [("first", "Changed")],
+        )
+
+    def test_save_model_syncs_choices_in_bulk(self):
+        """Test that many choices are added, updated, and deleted in bulk"""
+        select_instance = self._create_select_plugin()
+        trailing = add_plugin(
+            placeholder=self.placeholder,
+            plugin_type="CharFieldPlugin",
+            language=self.language,
+            config={"field_name": "trailing"},
+        )
+        self._create_choice_plugin(select_instance, "keep", "Keep")
+        self._create_choice_plugin(select_instance, "remove", "Remove")
+        choices_data = [("keep", "Kept")] + [
+            (f"c{i}", f"Choice {i}") for i in range(250)
+        ]
+        form = self._get_form_with_choices(select_instance, choices_data)
+        self.assertTrue(form.is_valid(), form.errors)
+        plugin_instance = SelectPlugin(self.plugin_class.model, self.admin_site)
+
+        # Constant number of queries (adding choices one by one took > 1000)
+        with self.assertNumQueries(FuzzyInt(1, 60)):
+            plugin_instance.save_model(
+                request=self.get_request("/"),
+                obj=select_instance,
+                form=form,
+                change=True,
+            )
+
+        self.assertEqual(
+            Select.objects.get(pk=select_instance.pk).get_child_choices(),
+            choices_data,
+        )
+        positions = list(
+            self.placeholder.get_plugins(self.language)
+            .order_by("position")
+            .values_list("position", flat=True)
+        )
+        self.assertEqual(positions, list(range(1, len(positions) + 1)))
+        trailing.refresh_from_db()
+        self.assertEqual(trailing.position, positions[-1])
+        self.assertIsNone(trailing.parent_id)
+        choice = select_instance.get_children().last()
+        self.assertEqual(choice.get_plugin_instance()[0].ui_item, "Choice")
+
+    def _create_remote_select(self, count=120, **config_kwargs):
+        select_instance = self._create_select_plugin(
+            field_select="remote", **config_kwargs
+        )
+        for i in range(count):
+            self._create_choice_plugin(select_instance, f"c{i}", f"Choice {i}")
+        select_instance.update_choices()
+        return Select.objects.get(pk=select_instance.pk)
+
+    def test_remote_select_renders_selected_option_only(self):
+        """Test that a searchable drop down does not render all choices"""
+        select_instance = self._create_remote_select()
+
+        with self.assertNumQueries(0):
+            name, field = select_instance.get_form_field()
+        html = field.widget.render(name, "c42")
+
+        self.assertIn(
+            f'data-remote-url="/@form-builder/{select_instance.pk}/choices"', html
+        )
+        self.assertIn('<option value="c42" selected>Choice 42</option>', html)
+        self.assertIn('<option value="">No selection</option>', html)
+        self.assertNotIn("Choice 41", html)
+
+    def test_remote_select_validates_membership(self):
+        select_instance = self._create_remote_select()
+        _, field = select_instance.get_form_field()
+
+        self.assertEqual(field.clean("c119"), "c119")
+        with self.assertRaises(ValidationError):
+            field.clean("c120")
+
+    def test_remote_select_index_is_cached_per_version(self):
+        select_instance = self._create_remote_select(count=2)
+        index = choices.get_choice_index(select_instance)
+
+        self.assertIs(
+            choices.get_choice_index(Select.objects.get(pk=select_instance.pk)), index
+        )
+        self._create_choice_plugin(select_instance, "new", "New")
+        select_instance.update_choices()
+        index = choices.get_choice_index(select_instance)
+        self.assertIn("new", index)
+        self.assertEqual(len(index), 3)
+
+    def test_remote_select_ajax_get(self):
+        select_instance = self._create_remote_select()
+        url = reverse(
+            "form_builder:ajaxview",
+            kwargs={"instance_id": select_instance.pk, "parameter": "choices"},
+        )
+
+        response = self.client.get(
+            url, {"q": "CHOICE 1"}, headers={"accept": "application/json"}
+        )
+        data = response.json()
+        # "Choice 1", "Choice 10" - "Choice 19", and "Choice 100" - "Choice 119"
+        self.assertEqual(len(data["results"]), 31)
+        self.assertEqual(data["results"][1], {"value": "c10", "label": "Choice 10"})
+        self.assertFalse(data["more"])
+
+        response = self.client.get(url, headers={"accept": "application/json"})
+        data = response.json()
+        self.assertEqual(len(data["results"]), 50)
+        self.assertEqual(data["results"][0], {"value": "c0", "label": "Choice 0"})
+        self.assertTrue(data["more"])
+
+        response = self.client.get(
+            url, {"page": 3}, headers={"accept": "application/json"}
+        )
+        data = response.json()
+        self.assertEqual(len(data["results"]), 20)
+        self.assertFalse(data["more"])
+
+    def test_ajax_get_requires_remote_select(self):
+        select_instance = self._create_select_plugin()
+        url = reverse(
+            "form_builder:ajaxview",
+            kwargs={"instance_id": select_instance.pk, "parameter": "choices"},
+        )
+        response = self.client.get(url, headers={"accept": "application/json"})
+        self.assertEqual(response.status_code, 404)
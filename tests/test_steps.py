@@ -0,0 +1,136 @@
+from unittest import mock
+
+from cms.api import add_plugin
+from cms.test_utils.testcases import CMSTestCase
+from django import forms
+from django.test import SimpleTestCase
+from django.urls import reverse
+
+from djangocms_form_builder import actions, cms_plugins, steps, validation
+from djangocms_form_builder.forms import SimpleFrontendForm
+from djangocms_form_builder.models import FormEntry
+
+from .fixtures import TestFixture
+
+
+class StepsTestCase(SimpleTestCase):
+    def test_steps_from_fieldsets(self):
+        class ApplicationForm(SimpleFrontendForm):
+            class Meta:
+                options = {"steps": True}
+                fieldsets = (
+                    ("Person", {"fields": ["name"]}),
+                    ("Job", {"fields": ["position"]}),
+                )
+
+            name = forms.CharField()
+            position = forms.CharField()
+            comment = forms.CharField()
+
+        self.assertEqual(
+            steps.get_steps(ApplicationForm), [["name"], ["position", "comment"]]
+        )
+        ApplicationForm.Meta.options = {}
+        self.assertEqual(steps.get_steps(ApplicationForm), [])
+
+    def test_token(self):
+        token = steps.dumps("1", 2, {"name": ["Jane"]})
+        self.assertEqual(steps.loads(token, "1"), (2, {"name": ["Jane"]}))
+        self.assertEqual(steps.loads(token, "2"), (0, {}))
+        self.assertEqual(steps.loads(token[:-1], "1"), (0, {}))
+        self.assertEqual(steps.loads("", "1"), (0, {}))
+
+
+class MultiStepFormTestCase(TestFixture, CMSTestCase):
+    def setUp(self):
+        super().setUp()
+        self.form_plugin = add_plugin(
+            placeholder=self.placeholder,
+            plugin_type=cms_plugins.FormPlugin.__name__,
+            language=self.language,
+            form_name="application",
+            captcha_widget="",
+            form_actions=f'["{actions.SAVE_TO_DB_ACTION}"]',
+        )
+        for title, name, plugin in (
+            ("Person", "name", cms_plugins.CharFieldPlugin),
+            ("Contact", "email", cms_plugins.EmailFieldPlugin),
+        ):
+            step = add_plugin(
+                placeholder=self.placeholder,
+                plugin_type=cms_plugins.FormStepPlugin.__name__,
+                target=self.form_plugin,
+                language=self.language,
+                config={"step_title": title},
+            )
+            add_plugin(
+                placeholder=self.placeholder,
+                plugin_type=plugin.__name__,
+                target=step,
+                language=self.language,
+                config={"field_name": name, "field_required": True},
+            )
+        self.publish(self.page, self.language)
+        validation.clear_cache()
+
+    def post(self, step, data):
+        return self.client.post(
+            reverse(
+                "form_builder:ajaxview",
+                kwargs={
+                    "instance_id": self.form_plugin.pk,
+                    "parameter": f"step={step}",
+                },
+            ),
+            data=data,
+            headers={
+                "accept": "application/json",
+                "user-agent": "test",
+                "referer": "/",
+            },
+        )
+
+    def test_rendering(self):
+        with self.login_user_context(self.superuser):
+            content = self.client.get(self.request_url).content.decode()
+
+        self.assertIn('data-steps="2"', content)
+        self.assertEqual(content.count('<fieldset class="form-step">'), 2)
+        self.assertIn("<legend>Contact</legend>", content)
+
+    def test_steps_are_validated_separately(self):
+        with mock.patch.object(SimpleFrontendForm, "__init__") as init:
+            result = self.post(0, {}).json()
+            self.assertEqual(result["result"], "invalid form")
+            self.assertEqual(
+                list(result["field_errors"]), [f"name{self.form_plugin.pk}"]
+            )
+
+            result = self.post(0, {"name": "Jane"}).json()
+            self.assertEqual(result["result"], "step")
+            self.assertEqual(result["step"], 1)
+        init.assert_not_called()
+        self.assertFalse(FormEntry.objects.exists())
+
+        result = self.post(
+            1, {"email": "jane@example.com", "form_step_token": result["token"]}
+        ).json()
+        self.assertEqual(result["result"], "success", result)
+        self.assertEqual(
+            FormEntry.objects.get(form_name="application").entry_data,
+            {"name": "Jane", "email": "jane@example.com"},
+        )
+
+    def test_steps_cannot_be_skipped(self):
+        result = self.post(1, {"email": "jane@example.com"}).json()
+        self.assertEqual(result["result"], "step")
+        self.assertEqual(result["step"], 0)
+
+        token = steps.dumps(str(self.form_plugin.pk), 1, {"name": ["Jane"]})
+        result = self.post(1, {"email": "jane", "form_step_token": token}).json()
+        self.assertEqual(result["result"], "invalid form")
+        self.assertEqual(list(result["field_errors"]), [f"email{self.form_plugin.pk}"])
+        self.assertFalse(FormEntry.objects.exists())
+
+        self.assertEqual(self.post(2, {}).status_code, 404)
+        self.assertEqual(self.post("x", {}).status_code, 404)
@@ -0,0 +1,361 @@
+import os
+import posixpath
+import tempfile
+from unittest import mock
+
+from cms.api import add_plugin
+from cms.test_utils.testcases import CMSTestCase
+from django.core import mail
+from django.core.files.storage import storages
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import DatabaseError
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+
+from djangocms_form_builder import actions, cms_plugins, uploads
+from djangocms_form_builder import settings as form_builder_settings
+from djangocms_form_builder.entry_model import FormEntry
+from djangocms_form_builder.models import UploadField
+
+from .fixtures import TestFixture
+
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.InMemoryStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+
+
+def upload(name="cv.pdf", size=10, content_type="application/pdf"):
+    return SimpleUploadedFile(name, b"x" * size, content_type=content_type)
+
+
+def list_stored_files(path=""):
+    directories, files = storages["default"].listdir(path)
+    return [posixpath.join(path, name) for name in files] + [
+        file
+        for directory in directories
+        for file in list_stored_files(posixpath.join(path, directory))
+    ]
+
+
+class UploadFieldTestCase(SimpleTestCase):
+    def test_single_file(self):
+        field = UploadField(accept=".pdf, image/*", max_size=100)
+        self.assertEqual(field.widget.attrs["accept"], ".pdf,image/*")
+        self.assertFalse(field.widget.allow_multiple_selected)
+
+        file = upload()
+        self.assertIs(field.clean(file), file)
+        self.assertEqual(
+            field.clean(upload("a.png", content_type="image/png")).name, "a.png"
+        )
+        with self.assertRaisesMessage(
+            Exception, "a.exe is not of an accepted file type."
+        ):
+            field.clean(upload("a.exe", content_type="application/octet-stream"))
+        with self.assertRaisesMessage(Exception, "cv.pdf is larger than 100"):
+            field.clean(upload(size=101))
+        with self.assertRaisesMessage(Exception, "This field is required."):
+            field.clean(None)
+
+    def test_multiple_files(self):
+        field = UploadField(max_files=2, required=False)
+        self.assertTrue(field.widget.allow_multiple_selected)
+
+        self.assertEqual(field.clean([]), [])
+        self.assertEqual(len(field.clean([upload(), upload("b.pdf")])), 2)
+        with self.assertRaisesMessage(Exception, "Please upload at most 2 files."):
+            field.clean([upload(), upload(), upload()])
+
+
+@override_settings(STORAGES=STORAGES)
+class UploadSubmissionTestCase(TestFixture, CMSTestCase):
+    def setUp(self):
+        super().setUp()
+        self.form_plugin = add_plugin(
+            placeholder=self.placeholder,
+            plugin_type=cms_plugins.FormPlugin.__name__,
+            language=self.language,
+            form_name="application",
+            captcha_widget="",
+            form_actions=(
+                f'["{actions.SAVE_TO_DB_ACTION}", '
+                f'"{actions.get_hash(actions.SendMailAction)}"]'
+            ),
+        )
+        self.form_plugin.action_parameters = {
+            "sendemail_recipients": "hr@example.com",
+            "sendemail_template": "default",
+        }
+        self.form_plugin.save()
+        add_plugin(
+            placeholder=self.placeholder,
+            plugin_type=cms_plugins.FileFieldPlugin.__name__,
+            target=self.form_plugin,
+            language=self.language,
+            config={
+                "field_name": "documents",
+                "field_required": True,
+                "field_accept": ".pdf",
+                "field_max_size": 1,
+                "field_max_files": 2,
+            },
+        )
+        self.publish(self.page, self.language)
+        self.url = reverse(
+            "form_builder:ajaxview", kwargs={"instance_id": self.form_plugin.pk}
+        )
+
+    def post(self, data):
+        return self.client.post(
+            self.url,
+            data=data,
+            headers={
+                "accept": "application/json",
+                "user-agent": "test",
+                "referer": "/",
+            },
+        ).json()
+
+    def test_files_are_stored_and_referenced(self):
+        with (
+            mock.patch.object(actions, "MAIL_ATTACHMENTS_MAX_SIZE", 15),
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            result = self.post({"documents": [upload(), upload("letter.pdf")]})
+        self.assertEqual(result["result"], "success", result)
+
+        documents = FormEntry.objects.get(form_name="application").entry_data[
+            "documents"
+        ]
+        self.assertEqual([file["name"] for file in documents], ["cv.pdf", "letter.pdf"])
+        self.assertEqual(documents[0]["size"], 10)
+        self.assertEqual(documents[0]["content_type"], "application/pdf")
+        with storages["default"].open(documents[1]["path"]) as file:
+            self.assertEqual(file.read(), b"x" * 10)
+
+        # The second file exceeds the attachment budget and is only listed
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["hr@example.com"])
+        self.assertEqual(
+            mail.outbox[0].attachments, [("cv.pdf", b"x" * 10, "application/pdf")]
+        )
+        self.assertIn("cv.pdf, letter.pdf", mail.outbox[0].body)
+
+    def test_invalid_files_are_not_stored(self):
+        result = self.post({"documents": [upload("cv.exe")]})
+
+        self.assertEqual(result["result"], "invalid form")
+        self.assertEqual(
+            result["field_errors"],
+            {
+                f"documents{self.form_plugin.pk}": [
+                    "cv.exe is not of an accepted file type."
+                ]
+            },
+        )
+        self.assertEqual(storages["default"].listdir("")[1], [])
+        self.assertFalse(FormEntry.objects.exists())
+
+    def test_files_are_deleted_if_actions_fail(self):
+        stored_before = len(list_stored_files())
+
+        def execute(form, request):
+            self.assertEqual(len(list_stored_files()), stored_before + 2)
+            raise DatabaseError
+
+        with mock.patch.object(actions.SaveToDBAction, "execute", side_effect=execute):
+            with self.assertRaises(DatabaseError):
+                self.post({"documents": [upload(), upload("letter.pdf")]})
+
+        self.assertEqual(len(list_stored_files()), stored_before)
+
+    def test_body_limit_covers_uploads(self):
+        plugin = self.form_plugin.get_plugin_class_instance()
+        with mock.patch.object(form_builder_settings, "MAX_BODY_SIZE", 1000):
+            self.assertEqual(
+                plugin.get_max_body_size(None, self.form_plugin),
+                1000 + 2 * 1024 * 1024,
+            )
+            result = self.post({"documents": [upload(size=2000)]})
+        self.assertEqual(result["result"], "success", result)
+
+
+@override_settings(STORAGES=STORAGES)
+class ResumableUploadTestCase(TestFixture, CMSTestCase):
+    def setUp(self):
+        super().setUp()
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        for name, value in (
+            ("UPLOAD_TEMP_DIR", temp_dir.name),
+            ("UPLOAD_CHUNK_SIZE", 4),
+        ):
+            patcher = mock.patch.object(form_builder_settings, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.temp_dir = temp_dir.name
+
+        self.form_plugin = add_plugin(
+            placeholder=self.placeholder,
+            plugin_type=cms_plugins.FormPlugin.__name__,
+            language=self.language,
+            form_name="video",
+            captcha_widget="",
+            form_actions=f'["{actions.SAVE_TO_DB_ACTION}"]',
+        )
+        add_plugin(
+            placeholder=self.placeholder,
+            plugin_type=cms_plugins.FileFieldPlugin.__name__,
+            target=self.form_plugin,
+            language=self.language,
+            config={
+                "field_name": "video",
+                "field_required": True,
+                "field_accept": "video/*",
+                "field_max_size": 1,
+                "field_max_files": 1,
+                "field_resumable": True,
+            },
+        )
+        self.publish(self.page, self.language)
+
+    def url(self, parameter=None):
+        kwargs = {"instance_id": self.form_plugin.pk}
+        if parameter:
+            kwargs["parameter"] = parameter
+        return reverse("form_builder:ajaxview", kwargs=kwargs)
+
+    def post(self, url, data):
+        return self.client.post(
+            url,
+            data=data,
+            headers={
+                "accept": "application/json",
+                "user-agent": "test",
+                "referer": "/",
+            },
+        )
+
+    def start(self, name="clip.mp4", size=10, content_type="video/mp4"):
+        return self.post(
+            self.url("upload=video"),
+            {"name": name, "size": size, "content_type": content_type},
+        ).json()
+
+    def send_chunk(self, upload_id, number, content):
+        return self.post(
+            self.url(f"upload=video,id={upload_id},chunk={number}"),
+            {"chunk": SimpleUploadedFile("blob", content)},
+        )
+
+    def test_chunked_upload(self):
+        status = self.start()
+        self.assertEqual(status["result"], "upload")
+        self.assertEqual(status["chunks"], 3)
+        self.assertEqual(status["received"], [])
+        upload_id = status["id"]
+
+        # Chunks can arrive in any order and be repeated
+        self.assertEqual(self.send_chunk(upload_id, 2, b"89").json()["received"], [2])
+        self.assertEqual(self.send_chunk(upload_id, 2, b"89").json()["received"], [2])
+        self.assertEqual(self.send_chunk(upload_id, 1, b"456").status_code, 400)
+        self.assertEqual(self.send_chunk(upload_id, 3, b"").status_code, 400)
+        self.send_chunk(upload_id, 0, b"0123")
+        # Resuming: the status lists the received chunks
+        status = self.post(self.url(f"upload=video,id={upload_id}"), {}).json()
+        self.assertEqual(status["received"], [0, 2])
+        self.assertFalse(status["complete"])
+        status = self.send_chunk(upload_id, 1, b"4567").json()
+        self.assertTrue(status["complete"])
+
+        result = self.post(self.url(), {"video": upload_id}).json()
+        self.assertEqual(result["result"], "success", result)
+        reference = FormEntry.objects.get(form_name="video").entry_data["video"]
+        self.assertEqual(reference["name"], "clip.mp4")
+        self.assertEqual(reference["content_type"], "video/mp4")
+        with storages["default"].open(reference["path"]) as file:
+            self.assertEqual(file.read(), b"0123456789")
+        self.assertEqual(os.listdir(self.temp_dir), [])
+
+    def test_assembled_file_is_opened_when_read(self):
+        upload_id = self.start()["id"]
+        for number, content in enumerate((b"0123", b"4567", b"89")):
+            self.send_chunk(upload_id, number, content)
+
+        (file,) = uploads.get_uploaded_files([upload_id], "video")
+        self.assertTrue(file.closed)
+        self.assertEqual(file.size, 10)
+        self.assertEqual(file.read(), b"0123456789")
+        file.close()
+        self.assertTrue(file.closed)
+        with file.open() as file:
+            self.assertEqual(b"".join(file.chunks()), b"0123456789")
+        self.assertTrue(file.closed)
+
+    def test_open_uploads_are_limited_per_client(self):
+        with mock.patch.object(form_builder_settings, "UPLOAD_MAX_OPEN", 2):
+            self.assertEqual(self.start()["result"], "upload")
+            self.assertEqual(self.start()["result"], "upload")
+            response = self.post(
+                self.url("upload=video"),
+                {"name": "clip.mp4", "size": 10, "content_type": "video/mp4"},
+            )
+            self.assertEqual(response.status_code, 429)
+            self.assertEqual(
+                list(response.json()["field_errors"]),
+                [f"video{self.form_plugin.pk}"],
+            )
+            self.assertEqual(len(os.listdir(self.temp_dir)), 2)
+
+            # Other clients are not affected
+            response = self.client.post(
+                self.url("upload=video"),
+                {"name": "clip.mp4", "size": 10, "content_type": "video/mp4"},
+                headers={"accept": "application/json"},
+                REMOTE_ADDR="192.0.2.1",
+            )
+            self.assertEqual(response.json()["result"], "upload")
+
+    def test_files_are_checked_before_upload(self):
+        status = self.start(name="clip.exe", content_type="application/octet-stream")
+        self.assertEqual(
+            status["field_errors"],
+            {
+                f"video{self.form_plugin.pk}": [
+                    "clip.exe is not of an accepted file type."
+                ]
+            },
+        )
+        status = self.start(size=2 * 1024 * 1024)
+        self.assertEqual(status["result"], "invalid form")
+        self.assertEqual(
+            self.post(self.url("upload=video"), {"size": "x"}).status_code, 400
+        )
+        self.assertEqual(
+            self.post(self.url("upload=name"), {"size": 1}).status_code, 404
+        )
+        self.assertEqual(os.listdir(self.temp_dir), [])
+
+    def test_incomplete_and_expired_uploads(self):
+        upload_id = self.start()["id"]
+        errors = {
+            f"video{self.form_plugin.pk}": [
+                "The upload has expired. Please select the file again."
+            ]
+        }
+
+        result = self.post(self.url(), {"video": upload_id}).json()
+        self.assertEqual(result["field_errors"], errors)
+        result = self.post(self.url(), {"video": "../../etc/passwd"}).json()
+        self.assertEqual(result["field_errors"], errors)
+
+        directory = os.path.join(self.temp_dir, upload_id)
+        self.assertEqual(uploads.delete_expired_uploads(), 0)
+        for name in os.listdir(directory):
+            os.utime(os.path.join(directory, name), (0, 0))
+        self.assertEqual(
+            self.post(self.url(f"upload=video,id={upload_id}"), {}).status_code, 404
+        )
+        self.assertEqual(uploads.delete_expired_uploads(), 1)
+        self.assertFalse(os.path.exists(directory))
@@ -0,0 +1,374 @@
+import json
+import re
+from unittest import mock
+
+from cms import operations
+from cms.api import add_plugin
+from cms.test_utils.testcases import CMSTestCase
+from django import forms
+from django.contrib.auth.models import AnonymousUser
+from django.http import QueryDict
+from django.urls import reverse
+from django.utils import translation
+
+from djangocms_form_builder import actions, cms_plugins, validation
+from djangocms_form_builder import settings as form_builder_settings
+from djangocms_form_builder.cms_plugins.form_plugins import (
+    update_choices_after_operation,
+)
+from djangocms_form_builder.forms import SimpleFrontendForm
+from djangocms_form_builder.models import FormEntry
+from djangocms_form_builder.validation import (
+    CompiledValidator,
+    get_client_schema,
+    get_validator,
+)
+
+from .fixtures import TestFixture
+
+
+class ContactForm(SimpleFrontendForm):
+    class Meta:
+        options = {"form_name": "contact"}
+
+    name = forms.CharField(max_length=5)
+    email = forms.EmailField()
+    age = forms.IntegerField(required=False, min_value=18)
+    topics = forms.MultipleChoiceField(choices=[("a", "A"), ("b", "B")])
+    newsletter = forms.BooleanField(required=False)
+
+
+class CompiledValidatorTestCase(CMSTestCase):
+    def get_request(self, user=None):
+        request = super().get_request("/")
+        request.user = user or AnonymousUser()
+        return request
+
+    def assertSameResult(self, form_class, data):
+        data = QueryDict(data)
+        request = self.get_request()
+        form = form_class(data, request=request)
+        form.is_valid()
+
+        cleaned_data, errors = get_validator(form_class).validate(request, data)
+
+        self.assertEqual(cleaned_data, form.cleaned_data)
+        self.assertEqual(errors, form.errors)
+        return errors
+
+    def test_same_result_as_form(self):
+        errors = self.assertSameResult(
+            ContactForm, "name=Jane&email=jane@example.com&age=42&topics=a&topics=b"
+        )
+        self.assertEqual(errors, {})
+        errors = self.assertSameResult(
+            ContactForm, "name=Johnny&email=john&age=12&topics=c&newsletter=on"
+        )
+        self.assertEqual(set(errors), {"name", "email", "age", "topics"})
+
+    def test_login_required(self):
+        class LoginForm(ContactForm):
+            class Meta:
+                options = {"login_required": True}
+
+        errors = self.assertSameResult(LoginForm, "")
+        self.assertEqual(
+            errors["__all__"], ["Please login before submitting this form."]
+        )
+
+    def test_custom_validation_is_not_compiled(self):
+        class CleanFieldForm(ContactForm):
+            def clean_name(self):
+                return self.cleaned_data["name"].upper()
+
+        class CleanForm(ContactForm):
+            def clean(self):
+                return super().clean()
+
+        class InitForm(ContactForm):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                self.fields["email"].required = False
+
+        class DjangoForm(forms.Form):
+            name = forms.CharField()
+
+        self.assertTrue(CompiledValidator.can_compile(ContactForm))
+        self.assertIsNone(get_validator(CleanFieldForm))
+        self.assertIsNone(get_validator(CleanForm))
+        self.assertIsNone(get_validator(InitForm))
+        self.assertIsNone(get_validator(DjangoForm))
+
+    def test_prefix(self):
+        cleaned_data, errors = get_validator(ContactForm, prefix="p").validate(
+            self.get_request(),
+            QueryDict("p-name=Jane&p-email=jane@example.com&p-topics=a"),
+        )
+        self.assertEqual(errors, {})
+        self.assertEqual(cleaned_data["name"], "Jane")
+
+    def test_from_cleaned_data(self):
+        data = QueryDict("name=Jane&email=jane@example.com&topics=a")
+        request = self.get_request()
+        cleaned_data, _ = get_validator(ContactForm).validate(request, data)
+
+        with mock.patch.object(ContactForm, "full_clean") as full_clean:
+            form = ContactForm.from_cleaned_data(request, data, cleaned_data)
+            self.assertTrue(form.is_valid())
+        full_clean.assert_not_called()
+
+        self.assertEqual(form.cleaned_data["topics"], ["a"])
+        self.assertEqual(form["name"].value(), "Jane")
+
+        # The fields are the form's own: changing them leaves the class alone
+        form.fields["name"].widget.attrs["class"] = "changed"
+        form.fields["topics"].choices = []
+        self.assertNotIn("class", ContactForm.base_fields["name"].widget.attrs)
+        self.assertNotEqual(ContactForm.base_fields["topics"].choices, [])
+
+    def test_client_schema(self):
+        class PriceForm(ContactForm):
+            price = forms.DecimalField(max_digits=5, decimal_places=2, min_value=0)
+            hidden = forms.CharField(widget=forms.HiddenInput)
+
+        schema = get_client_schema(
+            PriceForm(prefix="p", request=self.get_request()), "7"
+        )
+
+        self.assertEqual(
+            list(schema),
+            ["name7", "email7", "age7", "topics7", "newsletter7", "price7"],
+        )
+        self.assertEqual(schema["name7"]["name"], "p-name")
+        self.assertEqual(schema["name7"]["max_length"], 5)
+        self.assertEqual(
+            schema["name7"]["messages"]["max_length"],
+            "Ensure this value has at most 5 characters (it has {value}).",
+        )
+        self.assertEqual(schema["email7"]["type"], "email")
+        self.assertEqual(schema["age7"]["type"], "integer")
+        self.assertFalse(schema["age7"]["required"])
+        self.assertEqual(schema["age7"]["min_value"], 18)
+        self.assertEqual(schema["topics7"]["type"], "multiple")
+        self.assertEqual(schema["topics7"]["choices"], ["a", "b"])
+        self.assertEqual(
+            schema["topics7"]["messages"]["invalid_choice"],
+            "Select a valid choice. {value} is not one of the available choices.",
+        )
+        self.assertEqual(schema["newsletter7"]["type"], "boolean")
+        self.assertEqual(schema["price7"]["type"], "decimal")
+        self.assertEqual(schema["price7"]["max_digits"], 5)
+        self.assertEqual(schema["price7"]["decimal_places"], 2)
+        self.assertEqual(
+            schema["price7"]["messages"]["max_whole_digits"],
+            "Ensure that there are no more than 3 digits before the decimal point.",
+        )
+
+
+class AjaxValidationTestCase(TestFixture, CMSTestCase):
+    def setUp(self):
+        super().setUp()
+        self.form_plugin = add_plugin(
+            placeholder=self.placeholder,
+            plugin_type=cms_plugins.FormPlugin.__name__,
+            language=self.language,
+            form_name="compiled",
+            captcha_widget="",
+            form_actions=f'["{actions.SAVE_TO_DB_ACTION}"]',
+        )
+        for name, plugin in (
+            ("name", cms_plugins.CharFieldPlugin),
+            ("email", cms_plugins.EmailFieldPlugin),
+        ):
+            add_plugin(
+                placeholder=self.placeholder,
+                plugin_type=plugin.__name__,
+                target=self.form_plugin,
+                language=self.language,
+                config={"field_name": name, "field_required": True},
+            )
+        self.publish(self.page, self.language)
+        self.url = reverse(
+            "form_builder:ajaxview", kwargs={"instance_id": self.form_plugin.pk}
+        )
+        validation.clear_cache()
+
+    def post(self, data, url=None):
+        return self.client.post(
+            url or self.url,
+            data=data,
+            content_type="application/x-www-form-urlencoded",
+            headers={
+                "accept": "application/json",
+                "user-agent": "test",
+                "referer": "/",
+            },
+        )
+
+    def post_json(self, data, url=None):
+        return self.post(data, url).json()
+
+    def test_valid_submission_does_not_build_form(self):
+        with mock.patch.object(SimpleFrontendForm, "__init__") as init:
+            result = self.post_json("name=Jane&email=jane@example.com")
+
+        init.assert_not_called()
+        self.assertEqual(result["result"], "success")
+        self.assertEqual(
+            FormEntry.objects.get(form_name="compiled").entry_data,
+            {"name": "Jane", "email": "jane@example.com"},
+        )
+
+    def test_invalid_submission_matches_form_validation(self):
+        compiled = self.post_json("name=Jane&email=jane")
+        with mock.patch.object(form_builder_settings, "COMPILED_VALIDATION", False):
+            uncompiled = self.post_json("name=Jane&email=jane")
+
+        self.assertEqual(compiled["result"], "invalid form")
+        self.assertEqual(
+            compiled["field_errors"],
+            {f"email{self.form_plugin.pk}": ["Enter a valid email address."]},
+        )
+        self.assertEqual(compiled, uncompiled)
+        self.assertFalse(FormEntry.objects.exists())
+
+    def test_invalid_submission_renders_errors_only(self):
+        with mock.patch.object(SimpleFrontendForm, "__init__") as init:
+            result = self.post_json("name=Jane")
+        init.assert_not_called()
+        self.assertEqual(result["result"], "invalid form")
+        self.assertEqual(
+            result["field_errors"],
+            {f"email{self.form_plugin.pk}": ["This field is required."]},
+        )
+        self.assertNotIn("html", result)
+
+        with mock.patch.object(form_builder_settings, "RENDER_INVALID_FORM", True):
+            result = self.post_json("name=Jane")
+        self.assertIn(f'id="email{self.form_plugin.pk}"', result["html"])
+
+    def test_validation_schema_is_rendered(self):
+        with self.login_user_context(self.superuser):
+            content = self.client.get(self.request_url).content.decode()
+
+        match = re.search(
+            r'<script id="(validation[^"]+)" type="application/json">(.*?)</script>',
+            content,
+        )
+        self.assertIn(f'data-validation="{match[1]}"', content)
+        schema = json.loads(match[2])
+        self.assertEqual(
+            list(schema), [f"name{self.form_plugin.pk}", f"email{self.form_plugin.pk}"]
+        )
+        self.assertTrue(schema[f"email{self.form_plugin.pk}"]["required"])
+
+        with mock.patch.object(form_builder_settings, "CLIENT_VALIDATION", False):
+            with self.login_user_context(self.superuser):
+                content = self.client.get(self.request_url).content.decode()
+        self.assertNotIn("data-validation", content)
+
+    def test_validate_single_field(self):
+        url = reverse(
+            "form_builder:ajaxview",
+            kwargs={"instance_id": self.form_plugin.pk, "parameter": "validate=email"},
+        )
+        with mock.patch.object(
+            cms_plugins.FormPlugin,
+            "create_form_class_from_plugins",
+            autospec=True,
+            side_effect=cms_plugins.FormPlugin.create_form_class_from_plugins,
+        ) as create_form_class:
+            result = self.post_json("email=jane", url)
+            self.assertEqual(
+                result,
+                {
+                    "result": "invalid form",
+                    "fields": [f"email{self.form_plugin.pk}"],
+                    "field_errors": {
+                        f"email{self.form_plugin.pk}": ["Enter a valid email address."]
+                    },
+                },
+            )
+            result = self.post_json("email=jane@example.com", url)
+            self.assertEqual(result["result"], "valid")
+            self.assertEqual(result["field_errors"], {})
+        create_form_class.assert_called_once()
+        self.assertFalse(FormEntry.objects.exists())
+
+        url = url.replace("validate=email", "validate=name+email")
+        result = self.post_json("email=jane@example.com", url)
+        self.assertEqual(list(result["field_errors"]), [f"name{self.form_plugin.pk}"])
+
+    def test_validate_field_after_change(self):
+        url = reverse(
+            "form_builder:ajaxview",
+            kwargs={"instance_id": self.form_plugin.pk, "parameter": "validate=email"},
+        )
+        self.assertEqual(self.post_json("", url)["result"], "invalid form")
+
+        email = self.form_plugin.get_children().get(
+            plugin_type=cms_plugins.EmailFieldPlugin.__name__
+        )
+        email = email.get_plugin_instance()[0]
+        email.config["field_required"] = False
+        email.save()
+        self.assertEqual(self.post_json("", url)["result"], "valid")
+
+    def test_validate_unknown_field(self):
+        url = reverse(
+            "form_builder:ajaxview",
+            kwargs={"instance_id": self.form_plugin.pk, "parameter": "validate=age"},
+        )
+        self.assertEqual(self.post("age=12", url).status_code, 404)
+
+    def test_submission_after_moving_choice(self):
+        selects = {}
+        for name, choices in (("color", ["red"]), ("size", ["large"])):
+            selects[name] = add_plugin(
+                placeholder=self.placeholder,
+                plugin_type=cms_plugins.SelectPlugin.__name__,
+                target=self.form_plugin,
+                language=self.language,
+                config={"field_name": name, "field_select": "select"},
+            )
+            for value in choices:
+                add_plugin(
+                    placeholder=self.placeholder,
+                    plugin_type=cms_plugins.ChoicePlugin.__name__,
+                    target=selects[name],
+                    language=self.language,
+                    config={"value": value, "verbose": value.title()},
+                )
+            selects[name].update_choices()
+        data = "name=Jane&email=jane@example.com&color=large"
+        self.assertEqual(self.post_json(data)["result"], "invalid form")
+
+        red, large = (select.get_children().get() for select in selects.values())
+        self.placeholder.move_plugin(
+            large, red.position, target_plugin=selects["color"]
+        )
+        update_choices_after_operation(
+            None,
+            operation=operations.MOVE_PLUGIN,
+            source_parent_id=selects["size"].pk,
+            target_parent_id=selects["color"].pk,
+        )
+        self.assertEqual(self.post_json(data)["result"], "success")
+        self.assertEqual(
+            FormEntry.objects.get(form_name="compiled").entry_data["color"], "large"
+        )
+
+    def test_form_class_per_language(self):
+        plugin = self.form_plugin.get_plugin_class_instance()
+        plugin.instance = self.form_plugin
+        plugin.request = self.get_request("/")
+
+        with translation.override("de"):
+            form_class = plugin.get_compiled_form_class()
+            self.assertIs(plugin.get_compiled_form_class(), form_class)
+        with translation.override("en"):
+            self.assertIsNot(plugin.get_compiled_form_class(), form_class)
+
+        message = form_class.base_fields["email"].error_messages["required"]
+        self.assertIs(type(message), str)
+        self.assertEqual(message, "Dieses Feld ist zwingend erforderlich.")
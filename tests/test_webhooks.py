@@ -0,0 +1,204 @@
+import http.client
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import Mock, patch
+
+from cms.api import add_plugin
+from cms.test_utils.testcases import CMSTestCase
+from django.contrib.auth.models import AnonymousUser
+from django.core.management import call_command
+from django.db import connection
+from django.utils.timezone import now
+
+from djangocms_form_builder import actions, webhooks
+from djangocms_form_builder import settings as form_builder_settings
+from djangocms_form_builder.entry_model import WebhookDelivery
+from djangocms_form_builder.test_utils import WebhookTestServer
+
+from .fixtures import TestFixture
+
+
+class WebhookTestCase(TestFixture, CMSTestCase):
+    def setUp(self):
+        super().setUp()
+        self.server = WebhookTestServer().start()
+        self.addCleanup(self.server.stop)
+        self.addCleanup(webhooks.pool.clear)
+
+    def get_form(self, batch=False):
+        plugin_instance = add_plugin(
+            placeholder=self.placeholder,
+            plugin_type="FormPlugin",
+            language=self.language,
+            form_name="webhook_form",
+        )
+        plugin_instance.form_actions = f'["{actions.get_hash(actions.WebhookAction)}"]'
+        plugin_instance.action_parameters = {
+            "webhook_url": self.server.url,
+            "webhook_batch": batch,
+        }
+        plugin_instance.save()
+        add_plugin(
+            placeholder=self.placeholder,
+            plugin_type="CharFieldPlugin",
+            language=self.language,
+            target=plugin_instance,
+            config={"field_name": "name"},
+        )
+        plugin = plugin_instance.get_plugin_class_instance()
+        plugin.instance = plugin_instance
+
+        request = self.get_request("/")
+        request.user = AnonymousUser()
+        form = plugin.get_form_class()({}, request=request)
+        form.cleaned_data = {"name": "Jane"}
+        return form
+
+    def create_delivery(self, batch=False, **kwargs):
+        return WebhookDelivery.objects.create(
+            url=self.server.url, batch=batch, payload=kwargs
+        )
+
+    def test_action_sends_after_commit(self):
+        form = self.get_form()
+        # Run the delivery synchronously instead of in the thread pool
+        executor = Mock(submit=lambda func, pk: webhooks.send_now(pk))
+
+        with patch.object(webhooks, "get_executor", return_value=executor):
+            with self.captureOnCommitCallbacks(execute=True):
+                form.save()
+                self.assertEqual(self.server.requests, [])
+
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertEqual(self.server.requests[0]["form_name"], "webhook_form")
+        self.assertEqual(self.server.requests[0]["data"], {"name": "Jane"})
+        delivery = WebhookDelivery.objects.get()
+        self.assertEqual(delivery.status, WebhookDelivery.DELIVERED)
+        self.assertEqual(delivery.attempts, 1)
+        self.assertIsNotNone(delivery.delivered_at)
+
+    def test_batched_action_only_queues(self):
+        form = self.get_form(batch=True)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            form.save()
+
+        self.assertEqual(callbacks, [])
+        delivery = WebhookDelivery.objects.get()
+        self.assertTrue(delivery.batch)
+        self.assertEqual(delivery.status, WebhookDelivery.PENDING)
+
+    def test_failed_delivery_is_retried_with_backoff(self):
+        delivery = self.create_delivery(name="Jane")
+        self.server.status = 500
+
+        self.assertEqual(webhooks.send_pending(), 0)
+
+        delivery.refresh_from_db()
+        self.assertEqual(delivery.status, WebhookDelivery.PENDING)
+        self.assertEqual(delivery.attempts, 1)
+        self.assertTrue(delivery.last_error.startswith("HTTP 500"))
+        backoff = delivery.next_attempt_at - now()
+        self.assertGreater(backoff, timedelta(seconds=25))
+        self.assertLessEqual(backoff, timedelta(seconds=30))
+        # Not due yet
+        self.assertEqual(webhooks.send_pending(), 0)
+        self.assertEqual(len(self.server.requests), 1)
+
+        self.server.status = 200
+        WebhookDelivery.objects.update(next_attempt_at=now())
+        self.assertEqual(webhooks.send_pending(), 1)
+        delivery.refresh_from_db()
+        self.assertEqual(delivery.status, WebhookDelivery.DELIVERED)
+        self.assertEqual(delivery.attempts, 2)
+
+    def test_backoff(self):
+        self.assertEqual(webhooks.get_backoff(1), timedelta(seconds=30))
+        self.assertEqual(webhooks.get_backoff(3), timedelta(seconds=120))
+        self.assertEqual(webhooks.get_backoff(20), timedelta(hours=6))
+
+    def test_delivery_fails_after_max_attempts(self):
+        delivery = self.create_delivery(name="Jane")
+        WebhookDelivery.objects.update(attempts=2)
+        self.server.status = 400
+
+        with patch.object(form_builder_settings, "WEBHOOK_MAX_ATTEMPTS", 3):
+            webhooks.send_pending()
+
+        delivery.refresh_from_db()
+        self.assertEqual(delivery.status, WebhookDelivery.FAILED)
+        self.assertEqual(delivery.attempts, 3)
+
+    def test_timeout(self):
+        delivery = self.create_delivery(name="Jane")
+        self.server.delay = 1
+
+        with patch.object(form_builder_settings, "WEBHOOK_TIMEOUT", 0.1):
+            webhooks.send_pending()
+
+        delivery.refresh_from_db()
+        self.assertEqual(delivery.attempts, 1)
+        self.assertIn("timed out", delivery.last_error)
+
+    def test_http_exception_is_recorded(self):
+        delivery = self.create_delivery(name="Jane")
+
+        with patch.object(
+            webhooks.pool, "request", side_effect=http.client.IncompleteRead(b"")
+        ):
+            self.assertEqual(webhooks.send_pending(), 0)
+
+        delivery.refresh_from_db()
+        self.assertEqual(delivery.status, WebhookDelivery.PENDING)
+        self.assertEqual(delivery.attempts, 1)
+        self.assertIn("IncompleteRead", delivery.last_error)
+
+    def test_unexpected_error_does_not_block_queue(self):
+        failing = self.create_delivery(index=0)
+        self.create_delivery(index=1)
+
+        with patch.object(
+            webhooks, "post", side_effect=[TypeError("Not serializable"), None]
+        ):
+            with self.assertLogs("djangocms_form_builder.webhooks", "ERROR"):
+                self.assertEqual(webhooks.send_pending(), 1)
+
+        self.assertEqual(
+            WebhookDelivery.objects.get(status=WebhookDelivery.PENDING), failing
+        )
+
+    def test_deliveries_are_sent_outside_of_transactions(self):
+        delivery = self.create_delivery(name="Jane")
+        atomic_blocks = len(connection.atomic_blocks)  # Of the test case
+
+        def post(url, payload):
+            self.assertEqual(len(connection.atomic_blocks), atomic_blocks)
+            claimed = WebhookDelivery.objects.get(pk=delivery.pk)
+            self.assertGreater(claimed.next_attempt_at, now() + timedelta(minutes=1))
+
+        with patch.object(webhooks, "post", side_effect=post) as mock_post:
+            self.assertEqual(webhooks.send_pending(), 1)
+            webhooks.send_now(delivery.pk)  # Delivered: not sent again
+
+        mock_post.assert_called_once()
+        delivery.refresh_from_db()
+        self.assertEqual(delivery.status, WebhookDelivery.DELIVERED)
+
+    def test_batches_share_pooled_connection(self):
+        for i in range(3):
+            self.create_delivery(batch=True, index=i)
+        self.create_delivery(index=3)
+
+        with patch.object(form_builder_settings, "WEBHOOK_BATCH_SIZE", 2):
+            out = StringIO()
+            call_command("send_webhooks", stdout=out)
+
+        self.assertIn("Delivered 4 submission(s).", out.getvalue())
+        self.assertEqual(
+            self.server.requests,
+            [[{"index": 0}, {"index": 1}], [{"index": 2}], {"index": 3}],
+        )
+        self.assertEqual(len(self.server.connections), 1)
+        self.assertFalse(
+            WebhookDelivery.objects.exclude(status=WebhookDelivery.DELIVERED).exists()
+        )